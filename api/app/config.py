@@ -24,6 +24,17 @@ class Settings(BaseSettings):
     # Search settings
     search_external_timeout: int = 10
     max_external_results: int = 5
+    # Бюджет времени /bot/search по умолчанию (секунды); запрос может задать свой
+    bot_search_budget: float = 1.5
+    # Кэш ответов /bot/search: время жизни (секунды) и число записей
+    bot_search_cache_ttl: float = 300.0
+    # «Ничего не найдено» держим недолго: OMDB мог еще не знать о новинке
+    bot_search_cache_not_found_ttl: float = 30.0
+    bot_search_cache_size: int = 1000
+    # /content/search: до скольких совпадений (по оценке планировщика) считаем COUNT(*) точно
+    content_count_exact_limit: int = 10000
+    # Догнать схему поиска (pg_trgm, search_vector, индексы) на старте API
+    schema_upgrade_on_startup: bool = True
     
     class Config:
         env_file = ".env"
@@ -1,8 +1,11 @@
 # api/app/main.py
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import logging
-import asyncio
 
 
 from app.routers import (
@@ -12,15 +15,53 @@ from app.routers import (
 
 # Импортируем роутер для бота
 from app.routers.bot_content import router as bot_content_router
+from app import metrics
+from app.serialization import FastJSONResponse
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.schema_upgrade import upgrade_schema
+from app.services.search_cache import search_cache
+from app.services.title_index import title_index
+from app.services.worker_adapter import worker_adapter
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Открываем клиент Worker и строим индекс названий на старте, закрываем при остановке"""
+    if settings.schema_upgrade_on_startup:
+        await upgrade_schema(engine)
+    await worker_adapter.start()
+    # Индекс строится в фоне: пока он не готов, поиск идет через базу
+    title_index_task = asyncio.create_task(title_index.warm_up(AsyncSessionLocal))
+    try:
+        yield
+    finally:
+        title_index_task.cancel()
+        try:
+            # Дожидаемся отмены: снимок не должен сохраняться посреди построения
+            await title_index_task
+        except asyncio.CancelledError:
+            pass
+        try:
+            await title_index.save_snapshot()
+        finally:
+            await worker_adapter.close()
+
+
+metrics.REGISTRY.register(metrics.WorkerClientCollector(worker_adapter))
+metrics.REGISTRY.register(metrics.SearchCacheCollector(search_cache))
+metrics.REGISTRY.register(metrics.TitleIndexCollector(title_index))
+
 app = FastAPI(
     title="Movie Tracker API",
     description="API для отслеживания фильмов и сериалов",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 
@@ -52,10 +93,7 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
-# Добавляем обработку graceful shutdown
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Закрытие соединений при выключении"""
-    from app.services.worker_adapter import worker_adapter
-    await worker_adapter.close()
-    logger.info("Worker adapter closed")
\ No newline at end of file
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Метрики Prometheus: пул соединений к Worker, кэш и индекс поиска"""
+    return Response(generate_latest(metrics.REGISTRY), media_type=CONTENT_TYPE_LATEST)
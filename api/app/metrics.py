@@ -0,0 +1,104 @@
+# api/app/metrics.py
+from typing import Any, Iterator
+
+from prometheus_client import CollectorRegistry
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Отдельный реестр: в /metrics только метрики API
+REGISTRY = CollectorRegistry()
+
+
+class WorkerClientCollector:
+    """Загрузка пула соединений API → Worker (читается в момент запроса /metrics)"""
+
+    def __init__(self, worker_adapter: Any):
+        self.worker_adapter = worker_adapter
+
+    def collect(self) -> Iterator[Any]:
+        stats = self.worker_adapter.stats()
+        yield GaugeMetricFamily(
+            "api_worker_requests_in_flight",
+            "Requests from the API to the worker currently in flight",
+            value=stats["in_flight"],
+        )
+        yield GaugeMetricFamily(
+            "api_worker_requests_in_flight_peak",
+            "Peak number of concurrent requests to the worker",
+            value=stats["peak_in_flight"],
+        )
+        yield GaugeMetricFamily(
+            "api_worker_pool_max_connections",
+            "Connection pool limit for the worker client",
+            value=stats["max_connections"],
+        )
+        yield CounterMetricFamily(
+            "api_worker_requests",
+            "Requests sent from the API to the worker",
+            value=stats["requests"],
+        )
+        yield CounterMetricFamily(
+            "api_worker_pool_saturated",
+            "Requests that started while every pooled connection was busy",
+            value=stats["saturated"],
+        )
+        timeouts = CounterMetricFamily(
+            "api_worker_timeouts",
+            "Requests to the worker that ran out of time",
+            labels=["kind"],
+        )
+        timeouts.add_metric(["pool"], stats["pool_timeouts"])
+        timeouts.add_metric(["total"], stats["total_timeouts"])
+        yield timeouts
+
+
+class SearchCacheCollector:
+    """Кэш ответов /bot/search: попадания, промахи, сбросы и размер"""
+
+    def __init__(self, search_cache: Any):
+        self.search_cache = search_cache
+
+    def collect(self) -> Iterator[Any]:
+        stats = self.search_cache.stats()
+        requests = CounterMetricFamily(
+            "api_search_cache_requests",
+            "Bot search responses by origin: cached or freshly computed",
+            labels=["result"],
+        )
+        requests.add_metric(["cached"], stats["hits"])
+        requests.add_metric(["fresh"], stats["misses"])
+        yield requests
+        yield CounterMetricFamily(
+            "api_search_cache_invalidations",
+            "Cached searches dropped because matching content changed",
+            value=stats["invalidations"],
+        )
+        yield CounterMetricFamily(
+            "api_search_cache_evictions",
+            "Cached searches evicted by the size limit",
+            value=stats["evictions"],
+        )
+        yield GaugeMetricFamily(
+            "api_search_cache_entries", "Cached bot search responses", value=stats["entries"]
+        )
+
+
+class TitleIndexCollector:
+    """Индекс названий в памяти: готовность, размер и число поисков"""
+
+    def __init__(self, title_index: Any):
+        self.title_index = title_index
+
+    def collect(self) -> Iterator[Any]:
+        stats = self.title_index.stats()
+        yield GaugeMetricFamily(
+            "api_title_index_ready", "Whether the in-memory title index is built", value=int(stats["ready"])
+        )
+        yield GaugeMetricFamily(
+            "api_title_index_documents", "Content rows in the title index", value=stats["documents"]
+        )
+        yield CounterMetricFamily(
+            "api_title_index_searches", "Lookups served by the title index", value=stats["searches"]
+        )
+        yield GaugeMetricFamily(
+            "api_title_index_build_seconds", "Duration of the last full index build", value=stats["build_seconds"]
+        )
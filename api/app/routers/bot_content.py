@@ -1,10 +1,15 @@
 # api/app/api/endpoints/bot_content.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Dict, List, Optional
 
 from app.database import get_db
+from app.serialization import ndjson_line
 from app.services.content_service import ContentService
+from app.services.title_index import title_index
+from app.services.worker_adapter import worker_adapter
 
 router = APIRouter()
 
@@ -12,12 +17,23 @@ router = APIRouter()
 async def bot_search_content(
     title: str,
     content_type: Optional[str] = None,
+    summary: bool = False,
+    cursor: Optional[str] = None,
+    budget: Optional[float] = Query(None, gt=0, le=30),
     db: AsyncSession = Depends(get_db)
 ):
-    """Поиск контента для бота (сначала в БД, потом в OMDB через Worker)"""
+    """Поиск контента для бота (БД и OMDB через Worker параллельно)
+
+    summary=true отдает результаты OMDB без деталей, их можно догрузить
+    через /bot/details/{imdb_id}. Следующая порция выдачи — с cursor=next_cursor
+    из предыдущего ответа. budget — сколько секунд ждать Worker; если он не
+    успел, ответ помечен partial=true и содержит то, что уже пришло.
+    """
     content_service = ContentService(db)
     
-    result = await content_service.search_omdb_direct(title, content_type)
+    result = await content_service.search_omdb_direct(
+        title, content_type, summary_only=summary, cursor=cursor, budget=budget
+    )
     
     if result["source"] == "not_found":
         raise HTTPException(
@@ -27,6 +43,88 @@ async def bot_search_content(
     
     return result
 
+@router.get("/bot/search/stream")
+async def bot_search_content_stream(
+    title: str,
+    content_type: Optional[str] = None,
+    summary: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Потоковый поиск для бота (NDJSON): карточки приходят по мере готовности"""
+    content_service = ContentService(db)
+
+    async def generate():
+        async for event in content_service.search_omdb_direct_stream(
+            title, content_type, summary_only=summary
+        ):
+            yield ndjson_line(event)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/bot/suggest")
+async def bot_suggest(
+    q: str = Query(..., min_length=1),
+    content_type: Optional[str] = Query(None, regex="^(movie|series)$"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Подсказки по названию из индекса в памяти (без запроса к базе, с опечатками)"""
+    return {
+        "ready": title_index.ready,
+        "data": title_index.suggest(q, limit=limit, content_type=content_type),
+    }
+
+@router.get("/bot/details/{imdb_id}")
+async def bot_content_details(
+    imdb_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Полная карточка по IMDb ID (вторая фаза ленивого поиска)"""
+    content_service = ContentService(db)
+
+    result = await content_service.get_bot_details(imdb_id)
+
+    if result["source"] == "not_found":
+        raise HTTPException(
+            status_code=404,
+            detail=result["message"]
+        )
+
+    return result
+
+class PosterCheckRequest(BaseModel):
+    imdb_ids: List[str] = []
+    # {imdb_id: poster_url} из уже полученных карточек — Worker не запрашивает детали OMDB
+    poster_urls: Dict[str, str] = {}
+
+@router.get("/bot/posters/{imdb_id}")
+async def bot_poster(imdb_id: str, request: Request, source_url: Optional[str] = None):
+    """Миниатюра постера из кэша Worker (ETag и Cache-Control передаются как есть)"""
+    response = await worker_adapter.get_poster(
+        imdb_id, request.headers.get("if-none-match"), source_url
+    )
+    if response is None:
+        raise HTTPException(status_code=503, detail="Сервис постеров недоступен")
+
+    headers = {
+        key: response.headers[key]
+        for key in ("ETag", "Cache-Control")
+        if key in response.headers
+    }
+    if response.status_code == 304:
+        return Response(status_code=304, headers=headers)
+    if response.status_code != 200:
+        raise HTTPException(status_code=response.status_code, detail=f"Постер для {imdb_id} недоступен")
+
+    return Response(content=response.content, media_type="image/jpeg", headers=headers)
+
+@router.post("/bot/posters/check")
+async def bot_check_posters(request: PosterCheckRequest):
+    """Какие постеры есть, а каких нет — до отправки карточек"""
+    result = await worker_adapter.check_posters(request.imdb_ids, request.poster_urls)
+    if result is None:
+        raise HTTPException(status_code=503, detail="Сервис постеров недоступен")
+    return result
+
 @router.post("/bot/add-from-omdb")
 async def bot_add_from_omdb(
     title: str,
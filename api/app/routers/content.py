@@ -3,7 +3,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.database import get_db
-from app.schemas.content import ContentResponse, ContentCreate, ContentUpdate, ContentSearchResponse
+from app.schemas.content import (
+    ContentResponse, ContentCreate, ContentUpdate, ContentSearchResponse,
+    ContentRefreshRequest, ContentRefreshResponse
+)
 from app.services.content_service import ContentService
 
 router = APIRouter(prefix="/content", tags=["content"])
@@ -13,19 +16,33 @@ async def search_content(
     query: str = Query(..., min_length=1, description="Search query for content"),
     content_type: Optional[str] = Query(None, regex="^(movie|series)$", description="Filter by content type"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    year_from: Optional[int] = Query(None, ge=1800, le=2100, description="Minimum release year"),
+    year_to: Optional[int] = Query(None, ge=1800, le=2100, description="Maximum release year"),
+    min_rating: Optional[float] = Query(None, ge=0, le=10, description="Minimum IMDb rating"),
+    max_rating: Optional[float] = Query(None, ge=0, le=10, description="Maximum IMDb rating"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(20, ge=1, le=100, description="Number of items to return"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Search for content in database and external APIs.
-    
-    First searches in the local database. If no results found,
-    searches in external APIs (OMDb) and saves results to database.
+    Search the local catalog.
+
+    Matches title/original title substrings, similar titles (pg_trgm) and words
+    from titles and descriptions, ordered by relevance. For large result sets
+    `total` is the planner estimate and `total_estimated` is true.
     """
     content_service = ContentService(db)
-    result = await content_service.search_content(query, content_type, category_id, skip, limit)
-    return result
+    return await content_service.search_content(
+        query,
+        content_type=content_type,
+        category_id=category_id,
+        skip=skip,
+        limit=limit,
+        year_from=year_from,
+        year_to=year_to,
+        min_rating=min_rating,
+        max_rating=max_rating,
+    )
 
 @router.get("/", response_model=ContentSearchResponse)
 async def get_content(
@@ -33,14 +50,40 @@ async def get_content(
     limit: int = Query(20, ge=1, le=100),
     content_type: Optional[str] = Query(None, regex="^(movie|series)$"),
     category_id: Optional[int] = None,
+    year_from: Optional[int] = Query(None, ge=1800, le=2100),
+    year_to: Optional[int] = Query(None, ge=1800, le=2100),
+    min_rating: Optional[float] = Query(None, ge=0, le=10),
+    max_rating: Optional[float] = Query(None, ge=0, le=10),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get content list with optional filtering"""
+    """Get content list with optional filtering (newest first)"""
     content_service = ContentService(db)
-    
-    # Используем поиск с пустым запросом для получения всего контента
-    result = await content_service.search_content("", content_type, category_id, skip, limit)
-    return result
+    return await content_service.search_content(
+        "",
+        content_type=content_type,
+        category_id=category_id,
+        skip=skip,
+        limit=limit,
+        year_from=year_from,
+        year_to=year_to,
+        min_rating=min_rating,
+        max_rating=max_rating,
+    )
+
+@router.get("/refresh/candidates", response_model=List[str])
+async def get_refresh_candidates(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """IMDb IDs of the least recently refreshed content (used by the worker refresher)"""
+    content_service = ContentService(db)
+    return await content_service.get_refresh_candidates(limit)
+
+@router.post("/refresh", response_model=ContentRefreshResponse)
+async def refresh_content(request: ContentRefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Apply fresh OMDb data pushed by the worker refresher"""
+    content_service = ContentService(db)
+    return await content_service.apply_omdb_refresh(request.items)
 
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content_by_id(content_id: int, db: AsyncSession = Depends(get_db)):
@@ -77,10 +120,9 @@ async def create_content(content_data: ContentCreate, db: AsyncSession = Depends
 async def create_content_from_imdb(imdb_id: str, db: AsyncSession = Depends(get_db)):
     """Create content from IMDb ID"""
     content_service = ContentService(db)
-    imdb_service = content_service.imdb_service
     
-    # Получаем данные из OMDb
-    imdb_data = await imdb_service.get_content_by_imdb_id(imdb_id)
+    # Получаем данные из OMDb через Worker
+    imdb_data = await content_service.get_omdb_details(imdb_id)
     if not imdb_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
+from app.serialization import trusted_response
 from app.schemas.view_history import (
     ViewHistoryResponse,
     ViewHistoryCreate,
@@ -23,7 +24,8 @@ async def get_user_view_history(
     """Получить историю просмотров пользователя"""
     history_service = ViewHistoryService(db)
     history = await history_service.get_user_view_history_with_content(user_id, skip, limit)
-    return history
+    # Строки ORM уже в форме схемы — без повторной валидации Pydantic
+    return trusted_response(history)
 
 @router.get("/{history_id}", response_model=ViewHistoryResponse)
 async def get_view_history(history_id: int, db: AsyncSession = Depends(get_db)):
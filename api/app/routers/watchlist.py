@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
+from app.serialization import trusted_response
 from app.schemas.watchlist import (
     WatchlistResponse,
     WatchlistCreate,
@@ -23,7 +24,8 @@ async def get_user_watchlist(
     """Получить watchlist пользователя"""
     watchlist_service = WatchlistService(db)
     watchlist = await watchlist_service.get_user_watchlist_with_content(user_id, skip, limit)
-    return watchlist
+    # Строки ORM уже в форме схемы — без повторной валидации Pydantic
+    return trusted_response(watchlist)
 
 @router.get("/{watchlist_id}", response_model=WatchlistResponse)
 async def get_watchlist_item(watchlist_id: int, db: AsyncSession = Depends(get_db)):
@@ -0,0 +1,78 @@
+# api/app/schema_upgrade.py
+"""Идемпотентное обновление схемы для поиска по каталогу
+
+init.sql выполняется только на пустом томе PostgreSQL, а поиск
+(/bot/search, /content/search) опирается на pg_trgm, колонку search_vector
+и индексы из него. Эти же операторы API выполняет на старте
+(settings.schema_upgrade_on_startup), так что уже работающая база
+догоняет схему без ручных шагов. Повторный запуск ничего не меняет.
+
+Вручную, например до выкладки на большой таблице (добавление search_vector
+переписывает content под блокировкой):
+    cd api && python -m app.schema_upgrade
+"""
+import asyncio
+import logging
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Держать в согласии с init.sql
+SEARCH_SCHEMA: List[str] = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE content ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(original_title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_content_title_trgm ON content USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_content_original_title_trgm ON content USING GIN (original_title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_content_search_vector ON content USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_content_type_id ON content(content_type, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_content_category_id_id ON content(category_id, id DESC)",
+    """
+    CREATE INDEX IF NOT EXISTS idx_content_refresh_queue
+        ON content ((coalesce(updated_at, created_at)) ASC NULLS FIRST, id)
+        WHERE imdb_id IS NOT NULL
+    """,
+]
+
+
+async def upgrade_schema(engine: AsyncEngine) -> bool:
+    """Выполнить SEARCH_SCHEMA; False, если какой-то оператор не прошел
+
+    Каждый оператор в своей транзакции: например, без прав на CREATE EXTENSION
+    остальные шаги все равно выполнятся, а ошибка попадет в лог.
+    """
+    ok = True
+    for statement in SEARCH_SCHEMA:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(statement))
+        except Exception as e:
+            ok = False
+            logger.error(f"💥 Обновление схемы не выполнено: {' '.join(statement.split())[:80]}...: {e}")
+    if ok:
+        logger.info("🗄 Схема поиска по каталогу актуальна")
+    return ok
+
+
+async def _main() -> None:
+    from app.database import engine
+
+    try:
+        if not await upgrade_schema(engine):
+            raise SystemExit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
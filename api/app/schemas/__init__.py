@@ -1,5 +1,8 @@
 from .user import UserResponse, UserCreate, UserUpdate
-from .content import ContentResponse, ContentCreate, ContentUpdate, ContentSearchResponse
+from .content import (
+    ContentResponse, ContentCreate, ContentUpdate, ContentSearchResponse,
+    ContentRefreshRequest, ContentRefreshResponse
+)
 from .view_history import ViewHistoryResponse, ViewHistoryCreate, ViewHistoryUpdate
 from .watchlist import WatchlistResponse, WatchlistCreate, WatchlistUpdate
 from .analytics import UserStatsResponse, ContentStatsResponse, TimelineStatsResponse
@@ -8,6 +11,7 @@ from .category import CategoryResponse, CategoryCreate, CategoryUpdate
 __all__ = [
     "UserResponse", "UserCreate", "UserUpdate",
     "ContentResponse", "ContentCreate", "ContentUpdate", "ContentSearchResponse",
+    "ContentRefreshRequest", "ContentRefreshResponse",
     "ViewHistoryResponse", "ViewHistoryCreate", "ViewHistoryUpdate", 
     "WatchlistResponse", "WatchlistCreate", "WatchlistUpdate",
     "UserStatsResponse", "ContentStatsResponse", "TimelineStatsResponse",
@@ -48,8 +48,24 @@ class ContentInDB(ContentBase):
 class ContentResponse(ContentInDB):
     pass
 
+class ContentRefresh(BaseModel):
+    """Свежие данные OMDB для существующего контента (от фонового обновления Worker)"""
+    imdb_id: str
+    imdb_rating: Optional[float] = None
+    poster_url: Optional[str] = None
+    total_seasons: Optional[int] = None
+
+class ContentRefreshRequest(BaseModel):
+    items: List[ContentRefresh]
+
+class ContentRefreshResponse(BaseModel):
+    updated: int
+    missing: List[str] = []
+
 class ContentSearchResponse(BaseModel):
     results: List[ContentResponse]
     total: int
+    # True — total взят из оценки планировщика PostgreSQL, а не из COUNT(*)
+    total_estimated: bool = False
     page: int
     size: int
\ No newline at end of file
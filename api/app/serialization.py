@@ -0,0 +1,61 @@
+# api/app/serialization.py
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+loads = orjson.loads
+
+# Держать в согласии с worker/codec.py (API и воркер собираются из разных каталогов).
+# OPT_UTC_Z: даты в UTC с суффиксом Z, как их выводит Pydantic
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые orjson не сериализует сам"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+def _default_or_str(value: Any) -> Any:
+    try:
+        return _default(value)
+    except TypeError:
+        return str(value)
+
+
+def ndjson_line(event: Any) -> bytes:
+    """Строка NDJSON-потока (неизвестные типы — строкой, как json.dumps(default=str))"""
+    return orjson.dumps(
+        event, default=_default_or_str, option=OPTIONS | orjson.OPT_APPEND_NEWLINE
+    )
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Ответ API по умолчанию: orjson вместо json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+
+def trusted_response(content: Any, status_code: int = 200) -> FastJSONResponse:
+    """Отдать данные без повторной валидации через response_model
+
+    Только для словарей, которые сервис собрал из строк ORM ровно в форме
+    схемы маршрута (поля и типы гарантирует схема БД): тогда ответ совпадает
+    с выводом response_model (tests/test_serialization.py). response_model
+    у маршрута остается для документации OpenAPI.
+    """
+    return FastJSONResponse(content, status_code=status_code)
@@ -1,14 +1,148 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-from typing import Optional, List, Dict, Any
+from sqlalchemy import select, func, or_, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+import asyncio
+import json
 import logging
 
+from app.config import settings
 from app.models.content import Content
-from app.schemas.content import ContentCreate, ContentUpdate
+from app.schemas.content import ContentCreate, ContentUpdate, ContentRefresh
+from app.services.search_cache import search_cache
+from app.services.title_index import title_index
 from app.services.worker_adapter import worker_adapter  # Используем Worker вместо IMDbService
 
 logger = logging.getLogger(__name__)
 
+# Генерируемая колонка tsvector (title, original_title — вес A, description — C),
+# см. init.sql; в модели не объявлена, чтобы не грузить ее с каждой строкой
+SEARCH_VECTOR = literal_column("content.search_vector")
+SEARCH_CONFIG = "simple"
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def title_match(query: str):
+    """Условие и ранг текстового поиска по контенту
+
+    Совпадение — подстрока названия (ILIKE), похожее название (pg_trgm %)
+    или слова запроса в tsvector. Все условия покрыты GIN-индексами из
+    init.sql. Ранг — триграммная похожесть названия плюс ts_rank.
+    """
+    pattern = _like_pattern(query)
+    ts_query = func.plainto_tsquery(SEARCH_CONFIG, query)
+    original_title = func.coalesce(Content.original_title, "")
+
+    condition = or_(
+        Content.title.ilike(pattern),
+        Content.original_title.ilike(pattern),
+        Content.title.op("%")(query),
+        Content.original_title.op("%")(query),
+        SEARCH_VECTOR.op("@@")(ts_query),
+    )
+    rank = (
+        func.greatest(func.similarity(Content.title, query), func.similarity(original_title, query))
+        + func.ts_rank(SEARCH_VECTOR, ts_query)
+    )
+    return condition, rank
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) для запроса SQLAlchemy: оценка числа строк планировщиком"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+# Карточек в порции выдачи бота (в первой — вместе с совпадением из базы)
+BOT_PORTION_SIZE = 5
+
+# Запросы к Worker, которые не уложились в бюджет поиска, дорабатывают в фоне:
+# Worker успевает положить ответ OMDB в кэш, и следующая порция приходит быстро
+_background_tasks: set = set()
+
+
+class _WorkerPortion:
+    """Порция выдачи Worker, которая копится по мере прихода карточек
+
+    failed отличает сбой Worker/OMDB (событие error, порция None) от
+    честного «ничего не найдено».
+    """
+
+    def __init__(self, cursor: Optional[str]):
+        self.cursor = cursor
+        # позиция в выдаче OMDB → карточка
+        self.items: Dict[int, Dict[str, Any]] = {}
+        self.next_cursor: Optional[str] = None
+        self.failed = False
+        self.error: Optional[str] = None
+        # Взводится на каждое событие потока (потоковая выдача ждет новых карточек)
+        self.updated = asyncio.Event()
+
+    async def collect(self, title: str, content_type: Optional[str], summary_only: bool) -> None:
+        if self.cursor is None:
+            # Первая порция — потоком, чтобы по истечении бюджета отдать уже пришедшие карточки
+            async for event in worker_adapter.search_omdb_stream(
+                title, content_type, summary_only=summary_only
+            ):
+                if event.get("type") == "item":
+                    self.items[event.get("index", len(self.items))] = event.get("data") or {}
+                elif event.get("type") == "done":
+                    self.next_cursor = event.get("next_cursor")
+                elif event.get("type") == "error":
+                    self.failed = True
+                    self.error = event.get("error")
+                self.updated.set()
+            return
+
+        page = await worker_adapter.search_omdb_page(
+            title, content_type, cursor=self.cursor, limit=BOT_PORTION_SIZE, summary_only=summary_only
+        )
+        if page is None:
+            self.failed = True
+            self.error = "Worker недоступен"
+            return
+        self.items = dict(enumerate(page.get("data") or []))
+        self.next_cursor = page.get("next_cursor")
+
+    def indexed(self, start: int = 0, complete: bool = True) -> List[Tuple[int, Dict[str, Any]]]:
+        """(позиция, карточка) начиная со start: все пришедшие или только до первой дыры"""
+        if complete:
+            return [(index, self.items[index]) for index in sorted(self.items) if index >= start]
+        return [(index, self.items[index]) for index in range(start, self._received_until())]
+
+    def _received_until(self) -> int:
+        offset = 0
+        while offset in self.items:
+            offset += 1
+        return offset
+
+    def received(self) -> List[Dict[str, Any]]:
+        """Карточки недошедшей порции до первой дыры
+
+        Карточки после дыры придут еще раз с resume_cursor, поэтому сейчас их
+        не отдаем, чтобы «Показать еще» не повторял их.
+        """
+        return [item for _, item in self.indexed(complete=False)]
+
+    def resume_cursor(self) -> str:
+        """Курсор для порции, которая не дошла целиком: с первой недостающей позиции"""
+        if self.cursor is not None:
+            return self.cursor
+        return worker_adapter.page_cursor(self._received_until())
+
 class ContentService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -45,93 +179,352 @@ class ContentService:
         self.db.add(content)
         await self.db.commit()
         await self.db.refresh(content)
+        self._index_title(content)
+        self._invalidate_search_cache(content.content_type)
         logger.info(f"Created new content: {content.title}")
         return content
 
-    async def search_omdb_direct(
-        self,
-        title: str,
-        content_type: str = None
-    ) -> Dict[str, Any]:
-        """Упрощенная версия поиска для бота
+    def _index_title(self, content: Content) -> None:
+        title_index.add(content.id, content.title, content.original_title, content.content_type)
 
-        Если контент уже есть в базе (просмотренный), возвращаем его первым,
-        а далее добавляем до четырех результатов из OMDB, чтобы бот показал
-        до пяти карточек.
+    def _invalidate_search_cache(self, *content_types: Optional[str]) -> None:
+        """Сбросить кэш /bot/search, в который могла попасть измененная запись"""
+        search_cache.invalidate(content_types)
+
+    async def _find_in_database(self, title: str, content_type: str = None) -> Optional[Dict[str, Any]]:
+        """Лучшее совпадение по названию в базе в формате карточки бота
+
+        Кандидатов сначала дает индекс названий в памяти (title_index): тогда
+        из базы читаются только строки по первичному ключу и выбирается лучшая
+        по тому же рангу (title_match), что и при поиске в базе. Если индекс не
+        готов или уверенного совпадения по названию нет, ищем в базе (pg_trgm
+        и tsvector).
+
+        Индекс знает только названия, поэтому совпадение лишь по описанию
+        находится только в базе. Уверенное совпадение по названию (score не
+        ниже min_score) выигрывает у него и в базе: основной вклад в ранг дает
+        сходство названия, а слова описания (вес C в tsvector) — сотые доли.
         """
-        try:
-            # 1. Простой поиск в базе
-            stmt = select(Content).where(Content.title.ilike(f"%{title}%"))
+        query = title.strip()
+        if not query:
+            return None
 
+        content = await self._find_in_title_index(query, content_type)
+        if content is None:
+            condition, rank = title_match(query)
+            stmt = select(Content).where(condition)
             if content_type:
                 stmt = stmt.where(Content.content_type == content_type)
+            stmt = stmt.order_by(rank.desc(), Content.id).limit(1)
 
             result = await self.db.execute(stmt)
-            # Если найдено несколько записей, берем первую, чтобы не падать с ошибкой
             content = result.scalars().first()
+        if not content:
+            return None
 
-            db_item = None
-            if content:
-                db_item = {
-                    **self._content_to_dict(content),
-                    "source": "database",
-                    # Не помечаем как уже просмотренный, чтобы бот не блокировал добавление
-                    # в историю, если фильм лишь найден в нашей базе (например, после
-                    # добавления в watchlist без отметки просмотра).
-                    "already_watched": False,
-                }
+        return {
+            **self._content_to_dict(content),
+            "source": "database",
+            # Не помечаем как уже просмотренный, чтобы бот не блокировал добавление
+            # в историю, если фильм лишь найден в нашей базе (например, после
+            # добавления в watchlist без отметки просмотра).
+            "already_watched": False,
+        }
 
-            # 2. Ищем через Worker (получаем список до 5 элементов)
-            worker_result = await worker_adapter.search_omdb(title, content_type) or []
+    async def _find_in_title_index(self, query: str, content_type: str = None) -> Optional[Content]:
+        candidates = [
+            (content_id, score)
+            for content_id, score in title_index.search(query, limit=5, content_type=content_type)
+            if score >= title_index.min_score
+        ]
+        if not candidates:
+            return None
 
-            omdb_items = []
-            seen_imdb_ids = set()
+        _, rank = title_match(query)
+        result = await self.db.execute(
+            select(Content)
+            .where(Content.id.in_([content_id for content_id, _ in candidates]))
+            .order_by(rank.desc(), Content.id)
+            .limit(1)
+        )
+        return result.scalars().first()
 
-            if db_item and db_item.get("imdb_id"):
-                seen_imdb_ids.add(db_item["imdb_id"])
+    async def search_omdb_direct(
+        self,
+        title: str,
+        content_type: str = None,
+        summary_only: bool = False,
+        cursor: Optional[str] = None,
+        budget: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Упрощенная версия поиска для бота
 
-            # Берем столько результатов, чтобы всего карточек было до пяти
-            max_omdb_items = 5 - (1 if db_item else 0)
+        Если контент уже есть в базе (просмотренный), возвращаем его первым,
+        а далее порцию выдачи OMDB (до пяти карточек). Следующая порция
+        запрашивается с курсором next_cursor из ответа; совпадение из базы
+        показывается только в первой порции. При summary_only=True результаты
+        OMDB приходят без деталей (details_loaded=False), их подгружает
+        get_bot_details.
+
+        База и Worker опрашиваются параллельно в пределах budget секунд
+        (по умолчанию settings.bot_search_budget). Если Worker не успел,
+        отдаем совпадение из базы и уже пришедшие карточки с partial=True,
+        а next_cursor указывает на недостающую часть порции.
+
+        Полные ответы кэшируются (search_cache) по нормализованному запросу,
+        not_found — на короткий срок, сбои Worker — нет; поле cached
+        показывает, откуда ответ.
+        """
+        cache_key = search_cache.key(title, content_type, summary_only, cursor)
+        # До поиска: invalidate во время поиска не даст сохранить устаревший ответ
+        generation = search_cache.generation(cache_key)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        response = await self._search_omdb_direct(title, content_type, summary_only, cursor, budget)
+        # Частичные ответы и сбои Worker кэш не примет, not_found — ненадолго
+        search_cache.set(cache_key, response, generation)
+        return {**response, "cached": False}
+
+    async def _search_omdb_direct(
+        self,
+        title: str,
+        content_type: Optional[str],
+        summary_only: bool,
+        cursor: Optional[str],
+        budget: Optional[float],
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (budget or settings.bot_search_budget)
 
-            for item in worker_result:
-                imdb_id = item.get("imdb_id")
-                if imdb_id and imdb_id in seen_imdb_ids:
-                    continue
-                if imdb_id:
-                    seen_imdb_ids.add(imdb_id)
-                omdb_items.append({**item, "source": "omdb", "already_watched": False})
+        portion = _WorkerPortion(cursor)
+        worker_task = asyncio.create_task(portion.collect(title, content_type, summary_only))
 
-                if len(omdb_items) >= max_omdb_items:
-                    break
+        try:
+            db_item = None
+            if cursor is None:
+                # 1. Простой поиск в базе (пока Worker уже ищет в OMDB)
+                db_item = await self._find_in_database(title, content_type)
+
+            # 2. Порция выдачи OMDB через Worker — сколько успеет до дедлайна
+            remaining = deadline - loop.time()
+            if remaining > 0:
+                await asyncio.wait({worker_task}, timeout=remaining)
+
+            partial = not worker_task.done()
+            if partial:
+                logger.info(f"⏱ Бюджет поиска '{title}' исчерпан, Worker отдал {len(portion.items)} карточек")
+                _background_tasks.add(worker_task)
+                worker_task.add_done_callback(_background_tasks.discard)
+            elif portion.failed:
+                logger.warning(f"⚠️ Worker не отдал выдачу для '{title}': {portion.error}")
+                # Сбой — как недошедшая порция: отдаем полученное, курсор повторит остальное
+                partial = bool(db_item or portion.items)
+
+            # 3. Составляем итоговый список (не длиннее порции вместе с совпадением из базы)
+            seen_imdb_ids = {db_item["imdb_id"]} if db_item and db_item.get("imdb_id") else set()
+            entries = portion.indexed(complete=not partial)
+            room = BOT_PORTION_SIZE - bool(db_item) if cursor is None else len(entries)
+            omdb_items, stopped_at = self._omdb_cards(entries, seen_imdb_ids, room)
+            return self._portion_response(title, portion, db_item, omdb_items, partial, stopped_at)
 
-            # 3. Составляем итоговый список (до 5 элементов)
-            combined: list = []
-            if db_item:
-                combined.append(db_item)
+        except Exception as e:
+            logger.error(f"Error in search_omdb_direct: {e}")
+            worker_task.cancel()
+            return {
+                "source": "error",
+                "data": None,
+                "message": f"Ошибка поиска: {str(e)}"
+            }
 
-            combined.extend(omdb_items)
+    @staticmethod
+    def _omdb_cards(
+        entries: List[Tuple[int, Dict[str, Any]]], seen_imdb_ids: set, room: int
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Карточки OMDB для бота без повторов, не больше room (seen_imdb_ids пополняется)
 
-            if combined:
-                return {
-                    "source": "mixed" if db_item and omdb_items else (db_item and "database") or "omdb",
-                    "data": combined,
-                    "message": "Найдены результаты поиска"
-                }
+        Второе значение — позиция первой строки выдачи OMDB, не поместившейся
+        в порцию (None — поместились все): с нее продолжит следующая порция.
+        """
+        cards = []
+        for index, item in entries:
+            imdb_id = item.get("imdb_id")
+            if imdb_id and imdb_id in seen_imdb_ids:
+                continue
+            if len(cards) >= room:
+                return cards, index
+            if imdb_id:
+                seen_imdb_ids.add(imdb_id)
+            cards.append({**item, "source": "omdb", "already_watched": False})
+        return cards, None
+
+    @staticmethod
+    def _portion_response(
+        title: str,
+        portion: _WorkerPortion,
+        db_item: Optional[Dict[str, Any]],
+        omdb_items: List[Dict[str, Any]],
+        partial: bool,
+        stopped_at: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Ответ /bot/search для порции: совпадение из базы и карточки OMDB
 
+        stopped_at — первая строка выдачи, не вошедшая в порцию: порция
+        полная, и курсор продолжения указывает на эту строку.
+        """
+        if stopped_at is not None:
+            partial = False
+            next_cursor = worker_adapter.page_cursor(stopped_at)
+        else:
+            next_cursor = portion.resume_cursor() if partial else portion.next_cursor
+
+        combined: list = []
+        if db_item:
+            combined.append(db_item)
+        combined.extend(omdb_items)
+
+        if portion.failed and not combined:
             return {
-                "source": "not_found",
+                "source": "error",
                 "data": None,
-                "message": f"'{title}' не найден в OMDB"
+                "partial": False,
+                "next_cursor": portion.cursor,
+                "message": f"Поиск в OMDB временно недоступен: {portion.error}",
             }
 
-        except Exception as e:
-            logger.error(f"Error in search_omdb_direct: {e}")
+        if combined or partial:
             return {
-                "source": "error",
-                "data": None,
-                "message": f"Ошибка поиска: {str(e)}"
+                "source": "mixed" if db_item and omdb_items else (db_item and "database") or "omdb",
+                "data": combined,
+                "partial": partial,
+                "next_cursor": next_cursor,
+                "message": "Найдены результаты поиска" if combined else "Поиск в OMDB еще идет",
             }
 
+        return {
+            "source": "not_found",
+            "data": None,
+            "partial": False,
+            "next_cursor": None,
+            "message": f"'{title}' не найден в OMDB"
+        }
+
+    async def search_omdb_direct_stream(
+        self,
+        title: str,
+        content_type: str = None,
+        summary_only: bool = False,
+        budget: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоковая версия search_omdb_direct для бота
+
+        Отдает события по мере готовности: сначала совпадение из базы, затем
+        первую порцию карточек OMDB от Worker. Формат событий:
+        {"type": "item", "data": {...}}, в конце {"type": "done", "count": N,
+        "next_cursor": ..., "partial": ...} или {"type": "not_found"/"error",
+        "message": "..."}. Продолжение выдачи — search_omdb_direct с курсором.
+
+        Поток Worker открывается сразу, параллельно с поиском в базе, и
+        ограничен тем же бюджетом, что и search_omdb_direct: по его истечении
+        поток завершается с partial=True и курсором на недостающую часть порции.
+
+        Собранная первая порция кэшируется в search_cache под тем же ключом,
+        что и у search_omdb_direct без курсора; из кэша поток отдается сразу.
+        """
+        cache_key = search_cache.key(title, content_type, summary_only, None)
+        generation = search_cache.generation(cache_key)
+        cached = search_cache.get(cache_key)
+        if cached is not None:
+            for item in cached.get("data") or []:
+                yield {"type": "item", "data": item}
+            yield self._stream_end(cached, cached=True)
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (budget or settings.bot_search_budget)
+
+        portion = _WorkerPortion(None)
+        worker_task = asyncio.create_task(portion.collect(title, content_type, summary_only))
+
+        try:
+            # 1. Поиск в базе, пока Worker уже ищет в OMDB
+            try:
+                db_item = await self._find_in_database(title, content_type)
+            except Exception as e:
+                logger.error(f"Error in search_omdb_direct_stream (db): {e}")
+                db_item = None
+
+            seen_imdb_ids = {db_item["imdb_id"]} if db_item and db_item.get("imdb_id") else set()
+            if db_item:
+                yield {"type": "item", "data": db_item}
+
+            # 2. Карточки OMDB по порядку выдачи — сколько успеет до дедлайна и влезет в порцию
+            omdb_items: List[Dict[str, Any]] = []
+            room = BOT_PORTION_SIZE - bool(db_item)
+            position = 0
+            stopped_at = None
+            while True:
+                portion.updated.clear()
+                entries = portion.indexed(position, complete=worker_task.done() and not portion.failed)
+                if entries:
+                    position = entries[-1][0] + 1
+                cards, stopped_at = self._omdb_cards(entries, seen_imdb_ids, room - len(omdb_items))
+                for card in cards:
+                    omdb_items.append(card)
+                    yield {"type": "item", "data": card}
+
+                remaining = deadline - loop.time()
+                if stopped_at is not None or worker_task.done() or remaining <= 0:
+                    break
+                updated = asyncio.create_task(portion.updated.wait())
+                try:
+                    await asyncio.wait(
+                        {worker_task, updated}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    updated.cancel()
+
+            partial = not worker_task.done()
+            if partial:
+                if stopped_at is None:
+                    logger.info(f"⏱ Бюджет поиска '{title}' исчерпан, Worker отдал {len(portion.items)} карточек")
+                _background_tasks.add(worker_task)
+                worker_task.add_done_callback(_background_tasks.discard)
+            elif portion.failed:
+                logger.warning(f"Stream search for '{title}' failed: {portion.error}")
+                partial = bool(db_item or omdb_items)
+
+            response = self._portion_response(title, portion, db_item, omdb_items, partial, stopped_at)
+            search_cache.set(cache_key, response, generation)
+
+        except Exception as e:
+            logger.error(f"Error in search_omdb_direct_stream: {e}")
+            worker_task.cancel()
+            yield {"type": "error", "message": f"Ошибка поиска: {str(e)}"}
+            return
+        finally:
+            # Клиент отключился посреди потока — запрос к Worker больше никому не нужен
+            if not worker_task.done() and worker_task not in _background_tasks:
+                worker_task.cancel()
+
+        yield self._stream_end(response, cached=False)
+
+    @staticmethod
+    def _stream_end(response: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+        """Последнее событие потока по ответу порции (карточки уже отданы)"""
+        if response["source"] == "error":
+            return {"type": "error", "message": response["message"]}
+        if response["source"] == "not_found":
+            return {"type": "not_found", "message": response["message"]}
+        return {
+            "type": "done",
+            "count": len(response["data"]),
+            "next_cursor": response["next_cursor"],
+            "partial": response["partial"],
+            "cached": cached,
+        }
+
     async def add_from_omdb(
         self,
         title: str,
@@ -177,6 +570,34 @@ class ContentService:
                 "content": None
             }
 
+    async def get_omdb_details(self, imdb_id: str) -> Optional[Dict[str, Any]]:
+        """Получить данные OMDB по IMDb ID через Worker"""
+        return await worker_adapter.get_by_imdb_id(imdb_id)
+
+    async def get_bot_details(self, imdb_id: str) -> Dict[str, Any]:
+        """Полная карточка для бота по IMDb ID: сначала из базы, затем из OMDB"""
+        content = await self.get_content_by_imdb_id(imdb_id)
+        if content:
+            return {
+                "source": "database",
+                "data": {**self._content_to_dict(content), "source": "database", "already_watched": False},
+                "message": "Найдено в базе"
+            }
+
+        details = await self.get_omdb_details(imdb_id)
+        if details:
+            return {
+                "source": "omdb",
+                "data": {**details, "source": "omdb", "already_watched": False},
+                "message": "Получено из OMDB"
+            }
+
+        return {
+            "source": "not_found",
+            "data": None,
+            "message": f"'{imdb_id}' не найден в OMDB"
+        }
+
     def _content_to_dict(self, content: Content) -> Dict[str, Any]:
         """Конвертировать Content в словарь"""
         if not content:
@@ -201,10 +622,102 @@ class ContentService:
 
     # УДАЛЕННЫЕ МЕТОДЫ (лишнее):
     # - _search_in_database (не используется ботом)
-    # - search_content (не используется ботом)
     # - _search_in_external_api (заменен на worker_adapter)
     # - _save_external_results (интегрировано в add_from_omdb)
-    # - imdb_service в __init__ (заменен на worker_adapter)
+    # - imdb_service в __init__ (заменен на worker_adapter, см. get_omdb_details)
+
+    async def search_content(
+        self,
+        query: str = "",
+        content_type: Optional[str] = None,
+        category_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Поиск и список каталога для /content/search и /content/
+
+        С запросом — текстовое совпадение (title_match) по рангу, без запроса —
+        новые записи первыми. Фильтры покрыты B-tree индексами из init.sql,
+        список по типу/категории — составными (content_type, id) и (category_id, id).
+        total точный, если выдача короткая или совпадений немного, иначе это
+        оценка планировщика (total_estimated=True): COUNT(*) по миллионам
+        строк стоил бы дороже самой страницы.
+        """
+        conditions = []
+        if content_type:
+            conditions.append(Content.content_type == content_type)
+        if category_id is not None:
+            conditions.append(Content.category_id == category_id)
+        if year_from is not None:
+            conditions.append(Content.release_year >= year_from)
+        if year_to is not None:
+            conditions.append(Content.release_year <= year_to)
+        if min_rating is not None:
+            conditions.append(Content.imdb_rating >= min_rating)
+        if max_rating is not None:
+            conditions.append(Content.imdb_rating <= max_rating)
+
+        query = (query or "").strip()
+        stmt = select(Content)
+        if query:
+            condition, rank = title_match(query)
+            conditions.append(condition)
+            stmt = stmt.where(*conditions).order_by(rank.desc(), Content.id)
+        else:
+            stmt = stmt.where(*conditions).order_by(Content.id.desc())
+
+        result = await self.db.execute(stmt.offset(skip).limit(limit))
+        rows = result.scalars().all()
+
+        total, estimated = await self._count_content(conditions, skip, limit, len(rows))
+        return {
+            "results": [self._content_to_response(content) for content in rows],
+            "total": total,
+            "total_estimated": estimated,
+            "page": skip // limit + 1,
+            "size": limit,
+        }
+
+    async def _count_content(
+        self, conditions: List[Any], skip: int, limit: int, returned: int
+    ) -> Tuple[int, bool]:
+        """(total, оценка ли это) для search_content"""
+        # Неполная страница — значит, это конец выдачи и total известен без COUNT
+        if returned < limit and (returned or skip == 0):
+            return skip + returned, False
+
+        ids = select(Content.id).where(*conditions)
+        estimate = await self._estimate_rows(ids)
+        if estimate is None or estimate <= settings.content_count_exact_limit:
+            count = await self.db.execute(select(func.count()).select_from(ids.subquery()))
+            return count.scalar_one(), False
+
+        return max(estimate, skip + returned), True
+
+    async def _estimate_rows(self, stmt) -> Optional[int]:
+        """Число строк по оценке планировщика (EXPLAIN), None — если оценить не удалось"""
+        try:
+            # Savepoint: упавший EXPLAIN не должен прерывать транзакцию запроса,
+            # иначе и запасной COUNT(*) получит "current transaction is aborted"
+            async with self.db.begin_nested():
+                plan = (await self.db.execute(_Explain(stmt))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Could not estimate content count: {e}")
+            return None
+
+    def _content_to_response(self, content: Content) -> Dict[str, Any]:
+        """Строка content в форме ContentResponse (cast хранится в actors_cast)"""
+        return {
+            **{column.key: getattr(content, column.key) for column in Content.__table__.columns},
+            "cast": content.actors_cast,
+        }
 
     async def update_content(self, content_id: int, content_data: ContentUpdate) -> Optional[Content]:
         """Обновить данные контента"""
@@ -212,6 +725,7 @@ class ContentService:
         if not content:
             return None
 
+        old_content_type = content.content_type
         update_data = content_data.model_dump(exclude_unset=True)
         cast = update_data.pop("cast", None)
 
@@ -223,6 +737,8 @@ class ContentService:
 
         await self.db.commit()
         await self.db.refresh(content)
+        self._index_title(content)
+        self._invalidate_search_cache(old_content_type, content.content_type)
         logger.info(f"Updated content: {content.title}")
         return content
 
@@ -234,9 +750,55 @@ class ContentService:
 
         await self.db.delete(content)
         await self.db.commit()
+        title_index.remove(content_id)
+        self._invalidate_search_cache(content.content_type)
         logger.info(f"Deleted content: {content.title}")
         return True
 
+    async def get_refresh_candidates(self, limit: int = 50) -> List[str]:
+        """IMDb ID контента, который дольше всего не обновлялся"""
+        result = await self.db.execute(
+            select(Content.imdb_id)
+            .where(Content.imdb_id.isnot(None))
+            .order_by(
+                func.coalesce(Content.updated_at, Content.created_at).asc().nulls_first(),
+                Content.id.asc(),
+            )
+            .limit(limit)
+        )
+        return [imdb_id for imdb_id in result.scalars().all()]
+
+    async def apply_omdb_refresh(self, items: List[ContentRefresh]) -> Dict[str, Any]:
+        """Записать свежие данные OMDB; updated_at обновляется даже без изменений,
+        чтобы запись ушла в конец очереди на обновление"""
+        updated = 0
+        missing = []
+        content_types = set()
+        refreshed = []
+
+        for item in items:
+            content = await self.get_content_by_imdb_id(item.imdb_id)
+            if not content:
+                missing.append(item.imdb_id)
+                continue
+
+            content_types.add(content.content_type)
+            refreshed.append(content)
+            refresh_data = item.model_dump(exclude={"imdb_id"}, exclude_none=True)
+            for field, value in refresh_data.items():
+                setattr(content, field, value)
+
+            content.updated_at = func.now()
+            updated += 1
+
+        await self.db.commit()
+        for content in refreshed:
+            self._index_title(content)
+        if content_types:
+            self._invalidate_search_cache(*content_types)
+        logger.info(f"Refreshed {updated} content items from OMDB")
+        return {"updated": updated, "missing": missing}
+
     async def get_content_by_category(self, category_id: int, skip: int = 0, limit: int = 20) -> List[Content]:
         """Получить контент по категории"""
         result = await self.db.execute(
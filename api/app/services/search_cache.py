@@ -0,0 +1,118 @@
+# api/app/services/search_cache.py
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.config import settings
+
+# (нормализованное название, тип, summary, курсор)
+CacheKey = Tuple[str, Optional[str], bool, Optional[str]]
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Регистр и лишние пробелы не влияют на ключ"""
+    return " ".join((title or "").casefold().split())
+
+
+class SearchResultCache:
+    """LRU-кэш готовых ответов /bot/search с TTL
+
+    Первая порция ответа зависит от совпадения в базе, поэтому при создании,
+    изменении или удалении контента ContentService вызывает invalidate.
+    Кэш живет в процессе API.
+
+    Поиск, начатый до invalidate, мог прочитать базу до изменения. Поэтому
+    поколение ключа (generation) запоминается до поиска и передается в set:
+    если с тех пор ключ сбрасывался, устаревший ответ не сохраняется.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 300.0, not_found_ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "stale_sets": 0}
+        # Счетчики invalidate по типу контента; None — любой invalidate (сбрасывает и ключи без типа)
+        self._generations: Dict[Optional[str], int] = {}
+
+    @staticmethod
+    def key(
+        title: str, content_type: Optional[str], summary_only: bool, cursor: Optional[str]
+    ) -> CacheKey:
+        return normalize_title(title), content_type or None, summary_only, cursor
+
+    def generation(self, key: CacheKey) -> int:
+        """Поколение ключа: меняется каждым invalidate, который сбросил бы этот ключ"""
+        if key[3] is not None:
+            # Продолжения выдачи invalidate не трогает
+            return 0
+        return self._generations.get(key[1], 0)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.counters["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.counters["hits"] += 1
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: CacheKey, response: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """Запомнить ответ; not_found живет not_found_ttl, ошибки не кэшируются
+
+        generation — поколение ключа до поиска; если оно сменилось, ответ
+        устарел (контент изменился во время поиска) и не сохраняется.
+        """
+        source = response.get("source")
+        if source == "error" or response.get("partial"):
+            return
+        if generation is not None and generation != self.generation(key):
+            self.counters["stale_sets"] += 1
+            return
+        ttl = self.not_found_ttl if source == "not_found" else self.ttl
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(response))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def invalidate(self, content_types: Iterable[Optional[str]]) -> int:
+        """Сбросить первые порции выдачи, в которые могла попасть измененная запись
+
+        Совпадение из базы бывает только в первой порции (без курсора), а поиск
+        нечеткий (триграммы, описание), поэтому по названию запись не отследить —
+        сбрасываются все первые порции того же типа и без фильтра по типу.
+        """
+        types = set(content_types)
+        self._generations[None] = self._generations.get(None, 0) + 1
+        for content_type in types - {None}:
+            self._generations[content_type] = self._generations.get(content_type, 0) + 1
+
+        stale = [
+            key
+            for key in self._entries
+            if key[3] is None and (key[1] is None or key[1] in types)
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.counters["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+search_cache = SearchResultCache(
+    max_entries=settings.bot_search_cache_size,
+    ttl=settings.bot_search_cache_ttl,
+    not_found_ttl=settings.bot_search_cache_not_found_ttl,
+)
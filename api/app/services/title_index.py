@@ -0,0 +1,478 @@
+# api/app/services/title_index.py
+import asyncio
+import heapq
+import logging
+import os
+import pickle
+import re
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+
+from app.models.content import Content
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+
+# Слова короче ищем только точно: у коротких слов опечатки дают слишком много кандидатов
+_MIN_FUZZY_LEN = 4
+
+Row = Tuple[int, str, Optional[str], str]
+
+
+def normalize(text: Optional[str]) -> str:
+    """Регистр, ё/е, пунктуация и лишние пробелы не влияют на поиск"""
+    text = unicodedata.normalize("NFKC", text or "").casefold().replace("ё", "е")
+    return " ".join(_WORD_RE.findall(text))
+
+
+def _insert(postings: Dict[Any, array], key: Any, value: int) -> None:
+    """Добавить id в отсортированный posting-список (array('I'))"""
+    posting = postings.get(key)
+    if posting is None:
+        postings[key] = array("I", (value,))
+        return
+    if posting[-1] < value:
+        posting.append(value)
+        return
+    index = bisect_left(posting, value)
+    if index == len(posting) or posting[index] != value:
+        posting.insert(index, value)
+
+
+def _discard(postings: Dict[Any, array], key: Any, value: int) -> None:
+    posting = postings.get(key)
+    if posting is None:
+        return
+    index = bisect_left(posting, value)
+    if index < len(posting) and posting[index] == value:
+        del posting[index]
+        if not posting:
+            del postings[key]
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """Варианты слова без 1..distance символов (SymSpell), включая само слово"""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        variants = set()
+        for item in frontier:
+            if len(item) > 1:
+                variants.update(item[:i] + item[i + 1:] for i in range(len(item)))
+        frontier = variants - result
+        result |= frontier
+    return result
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Расстояние Дамерау — Левенштейна (OSA); limit + 1, если больше limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class _State:
+    """Структуры индекса; строится целиком (в потоке) или обновляется по одной записи"""
+
+    def __init__(self, ngram: int, max_edit_distance: int):
+        self.ngram = ngram
+        self.max_edit_distance = max_edit_distance
+        # id → (title, original_title, content_type, нормализованный текст)
+        self.docs: Dict[int, Tuple[str, Optional[str], str, str]] = {}
+        # n-грамма → отсортированные id контента
+        self.grams: Dict[str, array] = {}
+        # слово → отсортированные id контента
+        self.word_docs: Dict[str, array] = {}
+        # словарь слов: слово ↔ номер (в SymSpell-удалениях хранятся номера)
+        self.word_ids: Dict[str, int] = {}
+        self.words: List[str] = []
+        self.deletes: Dict[str, array] = {}
+
+    def grams_of(self, text: str) -> Set[str]:
+        padded = f" {text} "
+        if len(padded) < self.ngram:
+            return {padded}
+        return {padded[i:i + self.ngram] for i in range(len(padded) - self.ngram + 1)}
+
+    def add(self, content_id: int, title: str, original_title: Optional[str], content_type: str) -> None:
+        if content_id in self.docs:
+            self.remove(content_id)
+
+        text = normalize(f"{title} {original_title or ''}")
+        self.docs[content_id] = (title, original_title, content_type, text)
+        for gram in self.grams_of(text):
+            _insert(self.grams, gram, content_id)
+
+        for word in set(text.split()):
+            if word not in self.word_docs and len(word) >= _MIN_FUZZY_LEN:
+                self._add_word(word)
+            _insert(self.word_docs, word, content_id)
+
+    def _add_word(self, word: str) -> None:
+        word_id = self.word_ids.get(word)
+        if word_id is not None:
+            return
+        word_id = len(self.words)
+        self.word_ids[word] = word_id
+        self.words.append(word)
+        for variant in _deletes(word, self.max_edit_distance):
+            _insert(self.deletes, variant, word_id)
+
+    def remove(self, content_id: int) -> None:
+        doc = self.docs.pop(content_id, None)
+        if doc is None:
+            return
+        text = doc[3]
+        for gram in self.grams_of(text):
+            _discard(self.grams, gram, content_id)
+        # Слово остается в словаре SymSpell: без документов оно просто ничего не найдет
+        for word in set(text.split()):
+            _discard(self.word_docs, word, content_id)
+
+    def correct(self, token: str) -> List[Tuple[str, int]]:
+        """Слова словаря на расстоянии не больше max_edit_distance (SymSpell lookup)"""
+        if len(token) < _MIN_FUZZY_LEN:
+            return [(token, 0)] if token in self.word_docs else []
+
+        found: Dict[str, int] = {}
+        for variant in _deletes(token, self.max_edit_distance):
+            for word_id in self.deletes.get(variant, ()):
+                word = self.words[word_id]
+                if word in found or word not in self.word_docs:
+                    continue
+                distance = _edit_distance(token, word, self.max_edit_distance)
+                if distance <= self.max_edit_distance:
+                    found[word] = distance
+        return list(found.items())
+
+
+class TitleIndex:
+    """Нечеткий индекс названий контента в памяти процесса API
+
+    n-граммы названий (title + original_title) → отсортированные списки id
+    в array('I'); слова → списки id и словарь удалений SymSpell для поиска
+    с опечатками. Кандидаты берутся из самых редких n-грамм запроса и из
+    исправленных слов, затем ранжируются по коэффициенту Дайса n-грамм.
+
+    Строится на старте из таблицы content, обновляется из ContentService
+    при записи и при желании сохраняется на диск (snapshot_path), чтобы
+    после перезапуска догружать только изменения.
+    """
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(
+        self,
+        ngram: int = 3,
+        max_edit_distance: int = 1,
+        max_candidates: int = 100,
+        min_score: float = 0.5,
+        snapshot_path: Optional[str] = None,
+    ):
+        self.ngram = ngram
+        self.max_edit_distance = max_edit_distance
+        self.max_candidates = max_candidates
+        # Ниже этого score совпадение считается случайным (для выбора лучшей записи)
+        self.min_score = min_score
+        self.snapshot_path = snapshot_path
+        self._state = _State(ngram, max_edit_distance)
+        self.ready = False
+        # Изменения, пришедшие во время построения, применяются после него
+        self._building = False
+        self._pending: List[Tuple[str, tuple]] = []
+        # Самое позднее created_at/updated_at среди загруженных строк (для снимка)
+        self.watermark: Optional[datetime] = None
+        self.counters = {"searches": 0, "builds": 0, "updates": 0}
+        self.build_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "TitleIndex":
+        return cls(
+            ngram=int(os.getenv("TITLE_INDEX_NGRAM", "3")),
+            max_edit_distance=int(os.getenv("TITLE_INDEX_MAX_EDIT", "1")),
+            max_candidates=int(os.getenv("TITLE_INDEX_MAX_CANDIDATES", "100")),
+            min_score=float(os.getenv("TITLE_INDEX_MIN_SCORE", "0.5")),
+            snapshot_path=os.getenv("TITLE_INDEX_SNAPSHOT") or None,
+        )
+
+    # --- изменения ---
+
+    def add(self, content_id: int, title: str, original_title: Optional[str], content_type: str) -> None:
+        if self._building:
+            self._pending.append(("add", (content_id, title, original_title, content_type)))
+            return
+        self._state.add(content_id, title, original_title, content_type)
+        self.counters["updates"] += 1
+
+    def remove(self, content_id: int) -> None:
+        if self._building:
+            self._pending.append(("remove", (content_id,)))
+            return
+        self._state.remove(content_id)
+        self.counters["updates"] += 1
+
+    def _build_state(self, rows: Iterable[Row]) -> _State:
+        state = _State(self.ngram, self.max_edit_distance)
+        for row in rows:
+            state.add(*row)
+        return state
+
+    async def build(self, rows: List[Row], watermark: Optional[datetime] = None) -> None:
+        """Построить индекс заново (в отдельном потоке, чтобы не блокировать цикл событий)"""
+        self._building = True
+        started = time.perf_counter()
+        state = await asyncio.to_thread(self._build_state, rows)
+        self._swap(state, watermark)
+        self.build_seconds = time.perf_counter() - started
+        self.counters["builds"] += 1
+        logger.info(f"🔎 Индекс названий построен: {len(state.docs)} записей за {self.build_seconds:.1f} с")
+
+    def _swap(self, state: _State, watermark: Optional[datetime]) -> None:
+        self._state = state
+        self.watermark = watermark
+        self._building = False
+        pending, self._pending = self._pending, []
+        for operation, args in pending:
+            getattr(self, operation)(*args)
+        self.ready = True
+
+    # --- поиск ---
+
+    def search(self, query: str, limit: int = 10, content_type: Optional[str] = None) -> List[Tuple[int, float]]:
+        """[(content_id, score)] по убыванию score; пусто, если индекс не готов"""
+        text = normalize(query)
+        if not self.ready or not text:
+            return []
+        self.counters["searches"] += 1
+        state = self._state
+
+        # 1. Слова запроса с опечатками → документы (вес 1 / (1 + расстояние))
+        word_scores: Counter = Counter()
+        for token in text.split():
+            best: Dict[int, float] = {}
+            for word, distance in state.correct(token):
+                posting = state.word_docs.get(word, ())
+                if len(posting) > self.max_candidates * 20:
+                    # Слишком частое слово ("the") кандидатов не отбирает — только n-граммы
+                    continue
+                weight = 1.0 / (1 + distance)
+                for content_id in posting:
+                    if best.get(content_id, 0.0) < weight:
+                        best[content_id] = weight
+            word_scores.update(best)
+
+        # 2. Самые редкие n-граммы запроса → документы (сколько из них содержит)
+        query_grams = state.grams_of(text)
+        postings = sorted(
+            (state.grams[gram] for gram in query_grams if gram in state.grams), key=len
+        )
+        gram_hits: Counter = Counter()
+        for posting in postings[:6]:
+            if gram_hits and len(posting) > self.max_candidates * 50:
+                break
+            gram_hits.update(posting)
+
+        pool = set(word_scores) | set(gram_hits)
+        if content_type:
+            # Фильтр по типу до отсечения max_candidates, иначе записи нужного
+            # типа могут не войти в кандидатов из-за записей другого
+            pool = {content_id for content_id in pool if state.docs[content_id][2] == content_type}
+        candidates = heapq.nlargest(
+            self.max_candidates,
+            pool,
+            key=lambda content_id: (word_scores[content_id], gram_hits[content_id]),
+        )
+
+        # 3. Ранжирование: коэффициент Дайса по n-граммам + вклад слов + точная подстрока
+        words_in_query = len(text.split())
+        scored = []
+        for content_id in candidates:
+            doc_text = state.docs[content_id][3]
+            doc_grams = state.grams_of(doc_text)
+            dice = 2 * len(query_grams & doc_grams) / (len(query_grams) + len(doc_grams))
+            score = dice + word_scores[content_id] / words_in_query
+            if text in doc_text:
+                score += 0.5
+            scored.append((content_id, round(score, 4)))
+
+        return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+    def suggest(self, query: str, limit: int = 10, content_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Подсказки по названию прямо из памяти, без запроса к базе"""
+        state = self._state
+        suggestions = []
+        for content_id, score in self.search(query, limit, content_type):
+            title, original_title, doc_type, _ = state.docs[content_id]
+            suggestions.append(
+                {
+                    "id": content_id,
+                    "title": title,
+                    "original_title": original_title,
+                    "content_type": doc_type,
+                    "score": score,
+                }
+            )
+        return suggestions
+
+    # --- загрузка из базы и снимок на диске ---
+
+    async def warm_up(self, session_factory: Callable[[], Any]) -> None:
+        """Загрузить индекс: из снимка с догрузкой изменений или целиком из базы"""
+        # С этого момента изменения копятся в _pending и применяются к новому индексу
+        self._building = True
+        try:
+            if await self._load_snapshot():
+                try:
+                    async with session_factory() as db:
+                        await self._catch_up(db)
+                    self.ready = True
+                    return
+                except Exception as e:
+                    # Снимок без догрузки неполон — строим индекс из базы целиком
+                    logger.warning(f"⚠️ Не удалось догрузить изменения к снимку, строим заново: {e}")
+                    self._building = True
+
+            async with session_factory() as db:
+                result = await db.execute(
+                    select(
+                        Content.id,
+                        Content.title,
+                        Content.original_title,
+                        Content.content_type,
+                        func.coalesce(Content.updated_at, Content.created_at),
+                    )
+                )
+                rows = result.all()
+
+            watermark = max((row[4] for row in rows if row[4] is not None), default=None)
+            await self.build([tuple(row[:4]) for row in rows], watermark)
+            await self.save_snapshot()
+        except Exception as e:
+            logger.error(f"💥 Не удалось построить индекс названий: {e}")
+            self._building = False
+            self._pending.clear()
+
+    async def _catch_up(self, db: Any) -> None:
+        """Догрузить строки, измененные после снимка, и убрать удаленные"""
+        changed_at = func.coalesce(Content.updated_at, Content.created_at)
+        stmt = select(Content.id, Content.title, Content.original_title, Content.content_type, changed_at)
+        if self.watermark is not None:
+            stmt = stmt.where(changed_at > self.watermark)
+        changed = (await db.execute(stmt)).all()
+        for content_id, title, original_title, content_type, updated in changed:
+            self._state.add(content_id, title, original_title, content_type)
+            if updated is not None and (self.watermark is None or updated > self.watermark):
+                self.watermark = updated
+
+        existing = set((await db.execute(select(Content.id))).scalars().all())
+        removed = [content_id for content_id in self._state.docs if content_id not in existing]
+        for content_id in removed:
+            self._state.remove(content_id)
+        logger.info(f"🔎 Индекс названий из снимка: +{len(changed)} изменено, -{len(removed)} удалено")
+
+    def _snapshot_payload(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            "version": self.SNAPSHOT_VERSION,
+            "ngram": state.ngram,
+            "max_edit_distance": state.max_edit_distance,
+            "watermark": self.watermark,
+            "docs": state.docs,
+            "grams": state.grams,
+            "word_docs": state.word_docs,
+            "words": state.words,
+            "deletes": state.deletes,
+        }
+
+    async def save_snapshot(self) -> None:
+        """Сохранить снимок на диск; ошибки только пишутся в лог
+
+        Индекс сериализуется в цикле событий, где выполняются и add/remove,
+        поэтому снимок согласован. В отдельном потоке — только запись файла.
+        """
+        if not self.snapshot_path or not self.ready:
+            return
+
+        def write(data: bytes) -> None:
+            directory = os.path.dirname(self.snapshot_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+
+        try:
+            data = pickle.dumps(self._snapshot_payload(), protocol=pickle.HIGHEST_PROTOCOL)
+            await asyncio.to_thread(write, data)
+            logger.info(f"💾 Снимок индекса названий сохранен: {self.snapshot_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить снимок индекса названий: {e}")
+
+    async def _load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+
+        def read() -> Dict[str, Any]:
+            with open(self.snapshot_path, "rb") as f:
+                return pickle.load(f)
+
+        try:
+            payload = await asyncio.to_thread(read)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"⚠️ Снимок индекса названий не прочитан: {e}")
+            return False
+
+        if (
+            payload.get("version") != self.SNAPSHOT_VERSION
+            or payload.get("ngram") != self.ngram
+            or payload.get("max_edit_distance") != self.max_edit_distance
+        ):
+            logger.info("🔎 Снимок индекса названий устарел — строим заново")
+            return False
+
+        state = _State(self.ngram, self.max_edit_distance)
+        state.docs = payload["docs"]
+        state.grams = payload["grams"]
+        state.word_docs = payload["word_docs"]
+        state.words = payload["words"]
+        state.word_ids = {word: word_id for word_id, word in enumerate(state.words)}
+        state.deletes = payload["deletes"]
+        self._swap(state, payload["watermark"])
+        # Готов после догрузки изменений из базы
+        self.ready = False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            **self.counters,
+            "ready": self.ready,
+            "documents": len(state.docs),
+            "grams": len(state.grams),
+            "words": len(state.word_docs),
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+
+title_index = TitleIndex.from_env()
@@ -1,35 +1,156 @@
 # api/app/services/worker_adapter.py
+import asyncio
 import httpx
 import logging
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
+
+from app.config import settings
+from app.serialization import loads
 
 logger = logging.getLogger(__name__)
 
 class WorkerAdapter:
-    """Адаптер для работы с Worker сервисом"""
-    
-    def __init__(self):
-        self.worker_url = os.getenv("WORKER_URL", "http://worker:8001")
-        self.client = httpx.AsyncClient(timeout=30.0)
+    """Единый клиент API → Worker
+
+    HTTP-клиент создается в lifespan приложения (start/close) с ограниченным
+    пулом keep-alive соединений. Таймауты раздельные: connect, read (из
+    search_external_timeout) и общий бюджет на запрос, включая ожидание
+    свободного соединения в пуле.
+    """
+
+    def __init__(
+        self,
+        worker_url: str,
+        timeout: httpx.Timeout,
+        limits: httpx.Limits,
+        total_timeout: float,
+    ):
+        self.worker_url = worker_url
+        self.timeout = timeout
+        self.limits = limits
+        self.total_timeout = total_timeout
+        self.client: Optional[httpx.AsyncClient] = None
+        # Загрузка пула: сколько запросов в полете и как часто упирались в лимит
+        self.pool_stats = {
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "requests": 0,
+            "saturated": 0,
+            "pool_timeouts": 0,
+            "total_timeouts": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "WorkerAdapter":
+        read_timeout = float(settings.search_external_timeout)
+        connect_timeout = float(os.getenv("WORKER_CONNECT_TIMEOUT", "2"))
+        pool_timeout = float(os.getenv("WORKER_POOL_TIMEOUT", "2"))
+        return cls(
+            worker_url=os.getenv("WORKER_URL", "http://worker:8001"),
+            timeout=httpx.Timeout(
+                read_timeout, connect=connect_timeout, pool=pool_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("WORKER_MAX_CONNECTIONS", "50")),
+                max_keepalive_connections=int(os.getenv("WORKER_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("WORKER_KEEPALIVE_EXPIRY", "30")),
+            ),
+            total_timeout=float(
+                os.getenv(
+                    "WORKER_TOTAL_TIMEOUT",
+                    str(read_timeout + connect_timeout + pool_timeout),
+                )
+            ),
+        )
+
+    async def start(self) -> None:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.worker_url, timeout=self.timeout, limits=self.limits
+            )
+            logger.info(
+                f"🔌 Клиент Worker: {self.worker_url}, "
+                f"пул {self.limits.max_connections}/{self.limits.max_keepalive_connections}"
+            )
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Worker adapter closed")
+
+    def _enter(self) -> None:
+        stats = self.pool_stats
+        if stats["in_flight"] >= self.limits.max_connections:
+            # Все соединения заняты — запрос ждет в очереди пула
+            stats["saturated"] += 1
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+
+    def _exit(self) -> None:
+        self.pool_stats["in_flight"] -= 1
+
+    async def _request(
+        self, method: str, path: str, total_timeout: Optional[float] = None, **kwargs
+    ) -> httpx.Response:
+        """Запрос к Worker в пределах общего бюджета времени"""
+        if self.client is None:
+            await self.start()
+
+        self._enter()
+        try:
+            async with asyncio.timeout(total_timeout or self.total_timeout):
+                return await self.client.request(method, path, **kwargs)
+        except httpx.PoolTimeout:
+            self.pool_stats["pool_timeouts"] += 1
+            raise
+        except TimeoutError:
+            self.pool_stats["total_timeouts"] += 1
+            raise
+        finally:
+            self._exit()
+
+    @staticmethod
+    def page_cursor(offset: int) -> str:
+        """Курсор Worker для позиции offset в выдаче OMDB (формат Worker: смещение строкой)"""
+        return str(offset)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.pool_stats,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
     
-    async def search_omdb(self, title: str, content_type: str = None) -> Optional[List[Dict[str, Any]]]:
-        """Поиск фильма/сериала через Worker (список результатов)"""
+    async def search_omdb(
+        self,
+        title: str,
+        content_type: str = None,
+        summary_only: bool = False
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Поиск фильма/сериала через Worker (список результатов)
+
+        summary_only=True возвращает только краткие строки OMDB без деталей,
+        детали затем запрашиваются через get_by_imdb_id.
+        """
         try:
             logger.info(f"🔍 WorkerAdapter ищет: {title}")
             
             payload = {
                 "title": title,
-                "content_type": content_type
+                "content_type": content_type,
+                "summary_only": summary_only
             }
             
-            response = await self.client.post(
-                f"{self.worker_url}/search",
+            response = await self._request(
+                "POST", "/search",
                 json=payload
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = loads(response.content)
 
                 if result.get("success"):
                     data = result.get("data")
@@ -46,8 +167,226 @@ class WorkerAdapter:
             logger.error(f"💥 Ошибка WorkerAdapter: {e}")
             return None
     
-    async def close(self):
-        await self.client.aclose()
+    async def search_omdb_page(
+        self,
+        title: str,
+        content_type: str = None,
+        cursor: Optional[str] = None,
+        limit: int = 5,
+        summary_only: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """Порция выдачи OMDB по курсору: {"data": [...], "next_cursor": ...}
+
+        Пустой data — совпадений (или продолжения выдачи) нет; None — Worker
+        или OMDB недоступны.
+        """
+        try:
+            response = await self._request(
+                "POST", "/search/page",
+                json={
+                    "title": title,
+                    "content_type": content_type,
+                    "cursor": cursor,
+                    "limit": limit,
+                    "summary_only": summary_only,
+                },
+            )
+
+            if response.status_code == 200:
+                result = loads(response.content)
+                if result.get("success"):
+                    return {"data": result.get("data") or [], "next_cursor": result.get("next_cursor")}
+
+                logger.warning(f"❌ WorkerAdapter page: {result.get('error')}")
+                return None
+
+            logger.error(f"❌ WorkerAdapter page error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (page): {e}")
+            return None
+
+    async def search_omdb_stream(
+        self,
+        title: str,
+        content_type: str = None,
+        summary_only: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоковый поиск через Worker: отдает события NDJSON по мере поступления"""
+        payload = {
+            "title": title,
+            "content_type": content_type,
+            "summary_only": summary_only
+        }
+
+        if self.client is None:
+            await self.start()
+
+        # Поток живет дольше общего бюджета запроса, его ограничивают только connect/read
+        self._enter()
+        try:
+            async with self.client.stream("POST", "/search/stream", json=payload) as response:
+                if response.status_code != 200:
+                    logger.error(f"❌ WorkerAdapter stream error: {response.status_code}")
+                    yield {"type": "error", "error": f"Worker error: {response.status_code}"}
+                    return
+
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        yield loads(line)
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (stream): {e}")
+            yield {"type": "error", "error": str(e)}
+        finally:
+            self._exit()
+
+    async def search_omdb_batch(
+        self, queries: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Пакетный поиск через Worker: queries = [{"title": ..., "content_type": ...}]"""
+        try:
+            response = await self._request(
+                "POST", "/search/batch",
+                json={"queries": queries}
+            )
+
+            if response.status_code == 200:
+                return loads(response.content).get("results")
+
+            logger.error(f"❌ WorkerAdapter batch search error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (batch search): {e}")
+            return None
+
+    async def get_details_batch(self, imdb_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Детали OMDB по списку imdbID через Worker (ненайденные отсутствуют в ответе)"""
+        try:
+            response = await self._request(
+                "POST", "/details/batch",
+                json={"imdb_ids": imdb_ids}
+            )
+
+            if response.status_code == 200:
+                return loads(response.content).get("data") or {}
+
+            logger.error(f"❌ WorkerAdapter details error: {response.status_code}")
+            return {}
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (details): {e}")
+            return {}
+
+    async def get_by_imdb_id(self, imdb_id: str) -> Optional[Dict[str, Any]]:
+        """Детали OMDB по одному imdbID"""
+        try:
+            response = await self._request("GET", f"/details/{imdb_id}")
+
+            if response.status_code == 200:
+                result = loads(response.content)
+                if result.get("success") and result.get("data"):
+                    return result["data"][0]
+
+                logger.warning(f"❌ WorkerAdapter не нашел {imdb_id}: {result.get('error')}")
+                return None
+
+            logger.error(f"❌ WorkerAdapter details error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (details): {e}")
+            return None
+
+    async def get_poster(
+        self, imdb_id: str, etag: Optional[str] = None, source_url: Optional[str] = None
+    ) -> Optional[httpx.Response]:
+        """Миниатюра постера из Worker (200/304/404 как есть), None — Worker недоступен"""
+        try:
+            headers = {"If-None-Match": etag} if etag else {}
+            params = {"source_url": source_url} if source_url else None
+            return await self._request(
+                "GET", f"/posters/{imdb_id}", headers=headers, params=params
+            )
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (poster): {e}")
+            return None
+
+    async def check_posters(
+        self, imdb_ids: List[str], poster_urls: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, List[str]]]:
+        """Подготовить постеры в Worker: {"available": [...], "missing": [...]}"""
+        try:
+            response = await self._request(
+                "POST",
+                "/posters/check",
+                json={"imdb_ids": imdb_ids, "poster_urls": poster_urls or {}},
+            )
+            if response.status_code == 200:
+                return loads(response.content)
+
+            logger.error(f"❌ WorkerAdapter posters check error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (posters check): {e}")
+            return None
+
+    async def submit_job(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: str = "interactive",
+        callback_url: Optional[str] = None,
+    ) -> Optional[str]:
+        """Поставить задачу в очередь Worker и вернуть ее id (результат — через get_job)"""
+        try:
+            response = await self._request(
+                "POST", "/jobs",
+                json={
+                    "kind": kind,
+                    "payload": payload,
+                    "priority": priority,
+                    "callback_url": callback_url,
+                },
+            )
+
+            if response.status_code == 202:
+                return loads(response.content).get("job_id")
+
+            logger.error(f"❌ WorkerAdapter job submit error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (job submit): {e}")
+            return None
+
+    async def get_job(self, job_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """Статус задачи Worker; wait > 0 — ждать завершения (long-poll)"""
+        try:
+            response = await self._request(
+                "GET",
+                f"/jobs/{job_id}",
+                total_timeout=wait + self.total_timeout,
+                params={"wait": wait},
+                timeout=httpx.Timeout(
+                    self.timeout.read + wait,
+                    connect=self.timeout.connect,
+                    pool=self.timeout.pool,
+                ),
+            )
+
+            if response.status_code == 200:
+                return loads(response.content)
+
+            logger.error(f"❌ WorkerAdapter job status error: {response.status_code}")
+            return None
+
+        except Exception as e:
+            logger.error(f"💥 Ошибка WorkerAdapter (job status): {e}")
+            return None
 
-# Создаем глобальный экземпляр
-worker_adapter = WorkerAdapter()
\ No newline at end of file
+# Глобальный экземпляр; HTTP-клиент открывается в lifespan приложения
+worker_adapter = WorkerAdapter.from_settings()
\ No newline at end of file
@@ -0,0 +1,150 @@
+# api/benchmarks/json_codec.py
+"""Сравнение путей сериализации для /view-history/user/{id} и /watchlist/user/{id}
+
+Запуск из каталога api: python -m benchmarks.json_codec [--rows 100] [--repeat 200]
+
+Пути:
+  pydantic+json    — как было: валидация response_model, jsonable, json.dumps
+  pydantic+orjson  — та же валидация, но рендер через orjson (ответ по умолчанию)
+  trusted+orjson   — строки ORM сразу в orjson (trusted_response)
+"""
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from app.schemas.view_history import ViewHistoryWithContent
+from app.schemas.watchlist import WatchlistWithContent
+from app.serialization import dumps, trusted_response
+
+_GENRES = ["Drama", "Comedy", "Sci-Fi", "Thriller", "Animation", "Crime"]
+
+
+def _content(index: int) -> Dict[str, Any]:
+    """Строка content в том виде, в каком ее отдает ORM"""
+    is_series = index % 3 == 0
+    return {
+        "id": index,
+        "title": f"Фильм номер {index}: длинное название",
+        "original_title": f"Movie number {index}",
+        "description": "Краткое описание сюжета. " * 8,
+        "content_type": "series" if is_series else "movie",
+        "release_year": 1970 + index % 55,
+        "duration_minutes": None if is_series else 90 + index % 60,
+        "total_seasons": 1 + index % 8 if is_series else None,
+        "total_episodes": 10 + index % 90 if is_series else None,
+        "imdb_id": f"tt{index:07d}",
+        "imdb_rating": round(random.uniform(3, 9.5), 1),
+        "poster_url": f"https://m.media-amazon.com/images/M/{index}.jpg",
+        "genre": ", ".join(random.sample(_GENRES, 2)),
+        "director": "Режиссер Фамилия",
+        "actors_cast": "Актер Один, Актер Два, Актер Три",
+        "language": "English",
+        "country": "USA",
+        "category_id": None,
+        "created_at": datetime(2024, 1, 1) + timedelta(days=index),
+        "updated_at": datetime(2024, 6, 1) + timedelta(hours=index),
+        "is_active": True,
+    }
+
+
+def history_rows(count: int) -> List[Dict[str, Any]]:
+    now = datetime(2025, 1, 1)
+    rows = []
+    for index in range(1, count + 1):
+        content = _content(index)
+        watched_at = now - timedelta(hours=index * 7)
+        rows.append(
+            {
+                "id": index,
+                "user_id": 1,
+                "content_id": content["id"],
+                "watched_at": watched_at,
+                "rating": float(index % 10 + 1),
+                "season": 1 if content["content_type"] == "series" else None,
+                "episode": index % 12 + 1 if content["content_type"] == "series" else None,
+                "episode_title": None,
+                "duration_watched": 95,
+                "rewatch": index % 5 == 0,
+                "notes": "Заметка пользователя" if index % 4 == 0 else None,
+                "created_at": watched_at,
+                "updated_at": None,
+                "content_title": content["title"],
+                "content_type": content["content_type"],
+                "content": content,
+            }
+        )
+    return rows
+
+
+def watchlist_rows(count: int) -> List[Dict[str, Any]]:
+    now = datetime(2025, 1, 1)
+    rows = []
+    for index in range(1, count + 1):
+        content = _content(index)
+        rows.append(
+            {
+                "id": index,
+                "user_id": 1,
+                "content_id": content["id"],
+                "added_at": now - timedelta(days=index),
+                "priority": index % 3 + 1,
+                "notes": None,
+                "content_title": content["title"],
+                "content_type": content["content_type"],
+                "content": content,
+            }
+        )
+    return rows
+
+
+def _paths(adapter: TypeAdapter, rows: List[Dict[str, Any]]) -> Dict[str, Callable[[], bytes]]:
+    def pydantic_json() -> bytes:
+        validated = adapter.validate_python(rows)
+        return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False).encode()
+
+    def pydantic_orjson() -> bytes:
+        validated = adapter.validate_python(rows)
+        return dumps(adapter.dump_python(validated, mode="json"))
+
+    def trusted_orjson() -> bytes:
+        return trusted_response(rows).body
+
+    return {
+        "pydantic+json": pydantic_json,
+        "pydantic+orjson": pydantic_orjson,
+        "trusted+orjson": trusted_orjson,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="строк в ответе (лимит эндпоинта — 100)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    payloads = {
+        "view-history": (TypeAdapter(List[ViewHistoryWithContent]), history_rows(args.rows)),
+        "watchlist": (TypeAdapter(List[WatchlistWithContent]), watchlist_rows(args.rows)),
+    }
+
+    for name, (adapter, rows) in payloads.items():
+        print(f"{name}: {args.rows} строк")
+        baseline = None
+        for label, fn in _paths(adapter, rows).items():
+            size = len(fn())
+            seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+            baseline = baseline or seconds
+            print(
+                f"  {label:<16} {seconds * 1000:8.3f} мс  {size / 1024:7.1f} КБ  "
+                f"x{baseline / seconds:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# api/benchmarks/title_search.py
+"""Задержка поиска по названию в PostgreSQL до и после индексов поиска
+
+Запуск из каталога api (нужна база с init.sql, по умолчанию DATABASE_URL):
+    python -m benchmarks.title_search [--rows 1000000] [--repeat 20] [--keep]
+
+В отдельной схеме content_bench создается копия таблицы content и
+заполняется синтетическими названиями. Запросы меряются дважды: только с
+B-tree по title (как было) и после GIN-индексов из init.sql.
+
+Запросы:
+  ilike   — как было: все строки title ILIKE '%...%', первая из них
+  ranked  — ContentService._find_in_database: ILIKE, pg_trgm и tsvector,
+            лучшая по рангу строка
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import settings
+from app.models.content import Content
+from app.services.content_service import title_match
+
+SCHEMA = "content_bench"
+
+_WORDS_EN = [
+    "dark", "night", "star", "wars", "matrix", "inception", "knight", "return", "king",
+    "lost", "city", "river", "silent", "hill", "game", "thrones", "breaking", "bad",
+    "house", "dragon", "last", "man", "earth", "ocean", "fire", "ice", "storm", "blade",
+    "runner", "ghost", "shell", "empire", "strikes", "back", "rising", "dawn", "planet",
+]
+_WORDS_RU = [
+    "темный", "рыцарь", "звездные", "войны", "матрица", "начало", "игра", "престолов",
+    "город", "река", "тихий", "холм", "последний", "человек", "земля", "океан", "огонь",
+    "лед", "буря", "призрак", "империя", "рассвет", "планета", "во", "все", "тяжкие",
+]
+
+QUERIES = ["matrix", "dark knight", "Игра престолов", "incepton", "blade runner 2", "рассвет планеты"]
+
+_SETUP = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    # Структура (вместе с генерируемой search_vector) без индексов и ограничений;
+    # без DEFAULTS, чтобы не расходовать последовательность id основной таблицы
+    f"CREATE TABLE {SCHEMA}.content (LIKE public.content INCLUDING GENERATED)",
+    f"CREATE INDEX ON {SCHEMA}.content (title)",
+    f"CREATE INDEX ON {SCHEMA}.content (content_type)",
+]
+
+_FILL = f"""
+INSERT INTO {SCHEMA}.content (id, title, original_title, description, content_type, release_year, imdb_id)
+SELECT
+    g,
+    initcap(ru[1 + floor(random() * array_length(ru, 1))::int] || ' ' ||
+            ru[1 + floor(random() * array_length(ru, 1))::int] ||
+            CASE WHEN g % 3 = 0 THEN ' ' || g % 10 ELSE '' END),
+    initcap(en[1 + floor(random() * array_length(en, 1))::int] || ' ' ||
+            en[1 + floor(random() * array_length(en, 1))::int] ||
+            CASE WHEN g % 2 = 0 THEN ' ' || en[1 + floor(random() * array_length(en, 1))::int] ELSE '' END),
+    'A story about the ' || en[1 + floor(random() * array_length(en, 1))::int] || ' and the ' ||
+        en[1 + floor(random() * array_length(en, 1))::int] || '. История про ' ||
+        ru[1 + floor(random() * array_length(ru, 1))::int] || '.',
+    CASE WHEN g % 4 = 0 THEN 'series' ELSE 'movie' END,
+    1950 + g % 75,
+    'tb' || lpad(g::text, 9, '0')
+FROM generate_series(:start, :stop) AS g,
+     (SELECT CAST(:en AS text[]) AS en, CAST(:ru AS text[]) AS ru) AS words
+"""
+
+_INDEXES = [
+    f"CREATE INDEX ON {SCHEMA}.content USING GIN (title gin_trgm_ops)",
+    f"CREATE INDEX ON {SCHEMA}.content USING GIN (original_title gin_trgm_ops)",
+    f"CREATE INDEX ON {SCHEMA}.content USING GIN (search_vector)",
+]
+
+
+async def _fill(conn: AsyncConnection, rows: int, batch: int = 100_000) -> None:
+    for start in range(1, rows + 1, batch):
+        stop = min(start + batch - 1, rows)
+        await conn.execute(
+            text(_FILL), {"start": start, "stop": stop, "en": _WORDS_EN, "ru": _WORDS_RU}
+        )
+        print(f"  заполнено {stop}/{rows}", end="\r", flush=True)
+    print()
+    await conn.execute(text(f"ANALYZE {SCHEMA}.content"))
+
+
+async def _measure(conn: AsyncConnection, repeat: int) -> Dict[str, Dict[str, List[float]]]:
+    timings: Dict[str, Dict[str, List[float]]] = {"ilike": {}, "ranked": {}}
+    for query in QUERIES:
+        condition, rank = title_match(query)
+        statements = {
+            "ilike": select(Content).where(Content.title.ilike(f"%{query}%")),
+            "ranked": select(Content).where(condition).order_by(rank.desc(), Content.id).limit(1),
+        }
+        for name, stmt in statements.items():
+            samples = []
+            for attempt in range(repeat + 2):
+                started = time.perf_counter()
+                (await conn.execute(stmt)).first()
+                if attempt >= 2:  # первые два прогона прогревают кэш страниц
+                    samples.append(time.perf_counter() - started)
+            timings[name][query] = samples
+    return timings
+
+
+def _report(phase: str, timings: Dict[str, Dict[str, List[float]]]) -> None:
+    print(f"\n{phase}")
+    print(f"  {'запрос':<20} {'вариант':<8} {'p50, мс':>10} {'p95, мс':>10}")
+    for query in QUERIES:
+        for name in ("ilike", "ranked"):
+            samples = sorted(timings[name][query])
+            p50 = statistics.median(samples) * 1000
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000
+            print(f"  {query:<20} {name:<8} {p50:>10.1f} {p95:>10.1f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help=f"не удалять схему {SCHEMA}")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", settings.database_url))
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url)
+    try:
+        async with engine.begin() as conn:
+            for statement in _SETUP:
+                await conn.execute(text(statement))
+            print(f"Заполняем {SCHEMA}.content: {args.rows} строк")
+            await _fill(conn, args.rows)
+
+        async with engine.connect() as conn:
+            # Запросы из ContentService обращаются к content без схемы
+            await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+            _report("Без индексов поиска (B-tree по title)", await _measure(conn, args.repeat))
+
+            for statement in _INDEXES:
+                await conn.execute(text(statement))
+            await conn.execute(text(f"ANALYZE {SCHEMA}.content"))
+            await conn.commit()
+            _report("С GIN-индексами pg_trgm и tsvector", await _measure(conn, args.repeat))
+
+        if not args.keep:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
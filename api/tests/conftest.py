@@ -0,0 +1,9 @@
+# api/tests/conftest.py
+import os
+import sys
+
+# Пакет app лежит в api/ (в контейнере это рабочий каталог)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Как в app.main: сначала app.database (Base), затем модели — иначе цикл импортов
+import app.database  # noqa: E402,F401
@@ -0,0 +1,72 @@
+# api/tests/test_content_count.py
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from app.config import settings
+from app.services.content_service import ContentService
+
+
+class FakeResult:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def scalar_one(self) -> int:
+        return self.value
+
+
+class FakeSession:
+    """Сессия, которая отвечает на COUNT(*) и запоминает число запросов"""
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.statements: List[object] = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.count)
+
+
+def make_service(monkeypatch, count: int, estimate: Optional[int]) -> ContentService:
+    async def estimate_rows(self, stmt):
+        return estimate
+
+    monkeypatch.setattr(ContentService, "_estimate_rows", estimate_rows)
+    return ContentService(db=FakeSession(count))
+
+
+def count(service: ContentService, skip: int, limit: int, returned: int):
+    return asyncio.run(service._count_content([], skip, limit, returned))
+
+
+def test_short_page_is_exact_without_queries(monkeypatch):
+    service = make_service(monkeypatch, count=0, estimate=None)
+    assert count(service, skip=40, limit=20, returned=7) == (47, False)
+    assert service.db.statements == []
+
+
+def test_small_estimate_runs_exact_count(monkeypatch):
+    service = make_service(monkeypatch, count=123, estimate=150)
+    assert count(service, skip=0, limit=20, returned=20) == (123, False)
+    assert len(service.db.statements) == 1
+
+
+def test_failed_estimate_falls_back_to_count(monkeypatch):
+    service = make_service(monkeypatch, count=321, estimate=None)
+    assert count(service, skip=0, limit=20, returned=20) == (321, False)
+
+
+def test_large_estimate_is_reported_as_estimated(monkeypatch):
+    estimate = settings.content_count_exact_limit * 10
+    service = make_service(monkeypatch, count=0, estimate=estimate)
+    assert count(service, skip=0, limit=20, returned=20) == (estimate, True)
+    assert service.db.statements == []
+
+
+def test_estimate_never_below_rows_already_seen(monkeypatch):
+    service = make_service(monkeypatch, count=0, estimate=settings.content_count_exact_limit + 1)
+    skip = settings.content_count_exact_limit * 2
+    total, estimated = count(service, skip=skip, limit=20, returned=20)
+    assert estimated
+    assert total == skip + 20
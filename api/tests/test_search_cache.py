@@ -0,0 +1,108 @@
+# api/tests/test_search_cache.py
+import pytest
+
+from app.services import search_cache as search_cache_module
+from app.services.search_cache import SearchResultCache
+
+FOUND = {"source": "omdb", "data": [{"imdb_id": "tt0133093"}], "partial": False}
+NOT_FOUND = {"source": "not_found", "data": None, "partial": False}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(search_cache_module.time, "monotonic", fake)
+    return fake
+
+
+def test_key_ignores_case_and_spaces():
+    assert SearchResultCache.key("  The  Matrix ", "", False, None) == SearchResultCache.key(
+        "the matrix", None, False, None
+    )
+
+
+def test_get_returns_copy():
+    cache = SearchResultCache()
+    key = cache.key("matrix", None, False, None)
+    cache.set(key, FOUND)
+    cache.get(key)["data"].append({"imdb_id": "tt0000001"})
+    assert cache.get(key) == FOUND
+
+
+def test_invalidate_drops_first_portions_of_type_and_untyped():
+    cache = SearchResultCache()
+    movie = cache.key("matrix", "movie", False, None)
+    untyped = cache.key("matrix", None, False, None)
+    series = cache.key("matrix", "series", False, None)
+    next_page = cache.key("matrix", "movie", False, "5")
+    for key in (movie, untyped, series, next_page):
+        cache.set(key, FOUND)
+
+    assert cache.invalidate(["movie"]) == 2
+
+    assert cache.get(movie) is None
+    assert cache.get(untyped) is None
+    # Другой тип и продолжения выдачи (без совпадения из базы) остаются
+    assert cache.get(series) == FOUND
+    assert cache.get(next_page) == FOUND
+
+
+def test_errors_and_partial_responses_are_not_cached():
+    cache = SearchResultCache()
+    error = cache.key("matrix", None, False, None)
+    partial = cache.key("matrix", "movie", False, None)
+    cache.set(error, {"source": "error", "data": None})
+    cache.set(partial, {**FOUND, "partial": True})
+    assert cache.get(error) is None
+    assert cache.get(partial) is None
+
+
+def test_not_found_expires_sooner(clock):
+    cache = SearchResultCache(ttl=300, not_found_ttl=30)
+    found = cache.key("matrix", None, False, None)
+    missing = cache.key("no such film", None, False, None)
+    cache.set(found, FOUND)
+    cache.set(missing, NOT_FOUND)
+
+    clock.now += 31
+    assert cache.get(missing) is None
+    assert cache.get(found) == FOUND
+
+
+def test_lru_eviction():
+    cache = SearchResultCache(max_entries=2)
+    first, second, third = (cache.key(title, None, False, None) for title in ("a", "b", "c"))
+    cache.set(first, FOUND)
+    cache.set(second, FOUND)
+    cache.get(first)
+    cache.set(third, FOUND)
+
+    assert cache.get(second) is None
+    assert cache.get(first) == FOUND
+    assert cache.stats()["evictions"] == 1
+
+
+def test_set_skips_response_older_than_invalidate():
+    cache = SearchResultCache()
+    movie = cache.key("matrix", "movie", False, None)
+    untyped = cache.key("matrix", None, False, None)
+    series = cache.key("matrix", "series", False, None)
+    generations = {key: cache.generation(key) for key in (movie, untyped, series)}
+
+    cache.invalidate(["movie"])
+    for key in (movie, untyped, series):
+        cache.set(key, NOT_FOUND, generations[key])
+
+    assert cache.get(movie) is None
+    assert cache.get(untyped) is None
+    # invalidate другого типа этот ключ не сбросил бы — ответ не устарел
+    assert cache.get(series) == NOT_FOUND
+    assert cache.stats()["stale_sets"] == 2
@@ -0,0 +1,123 @@
+# api/tests/test_serialization.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Tuple
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.models.content import Content
+from app.models.view_history import ViewHistory
+from app.models.watchlist import Watchlist
+from app.schemas.view_history import ViewHistoryWithContent
+from app.schemas.watchlist import WatchlistWithContent
+from app.serialization import FastJSONResponse, loads, trusted_response
+from app.services.view_history_service import ViewHistoryService
+from app.services.watchlist_service import WatchlistService
+
+UTC = timezone.utc
+
+
+class FakeSession:
+    """Сессия, отдающая заранее заданные строки select(..., Content)"""
+
+    def __init__(self, rows: List[Tuple[Any, Content]]):
+        self.rows = rows
+
+    async def execute(self, statement):
+        return list(self.rows)
+
+
+def content(index: int) -> Content:
+    return Content(
+        id=index,
+        title=f"Фильм {index}",
+        original_title=None if index % 2 else f"Movie {index}",
+        description="Описание",
+        content_type="series" if index % 2 else "movie",
+        release_year=1999,
+        duration_minutes=None,
+        total_seasons=3 if index % 2 else None,
+        total_episodes=None,
+        imdb_rating=8.7,
+        imdb_id=f"tt{index:07d}",
+        poster_url=None,
+        genre="Sci-Fi",
+        director="Режиссер",
+        actors_cast="Актер Один, Актер Два",
+        language="English",
+        country=None,
+        category_id=None,
+        created_at=datetime(2024, 1, 1, 12, 0, tzinfo=UTC),
+        updated_at=datetime(2024, 6, 1, 8, 30, 15, 120000, tzinfo=UTC) if index % 2 else None,
+        is_active=True,
+    )
+
+
+def response_model_output(model: Any, rows: List[dict]) -> Any:
+    """Что отдал бы маршрут с response_model: валидация, dump в JSON-режиме, рендер по умолчанию"""
+    adapter = TypeAdapter(List[model])
+    return loads(FastJSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json")).body)
+
+
+def test_view_history_trusted_response_matches_response_model():
+    rows = [
+        (
+            ViewHistory(
+                id=index,
+                user_id=1,
+                content_id=index,
+                watched_at=datetime(2025, 1, 1, tzinfo=UTC) - timedelta(hours=index, microseconds=index),
+                rating=7.5 if index % 2 else None,
+                season=1 if index % 2 else None,
+                episode=index,
+                episode_title=None,
+                duration_watched=95,
+                rewatch=index % 3 == 0,
+                notes="Заметка" if index % 2 else None,
+                created_at=datetime(2025, 1, 2, tzinfo=timezone(timedelta(hours=3))),
+                updated_at=None,
+            ),
+            content(index),
+        )
+        for index in range(1, 5)
+    ]
+    history = asyncio.run(
+        ViewHistoryService(FakeSession(rows)).get_user_view_history_with_content(1)
+    )
+
+    assert loads(trusted_response(history).body) == response_model_output(ViewHistoryWithContent, history)
+
+
+def test_watchlist_trusted_response_matches_response_model():
+    rows = [
+        (
+            Watchlist(
+                id=index,
+                user_id=1,
+                content_id=index,
+                added_at=datetime(2025, 1, 1, 9, 15, tzinfo=UTC) - timedelta(days=index),
+                priority=index % 5 + 1,
+                notes=None,
+            ),
+            content(index),
+        )
+        for index in range(1, 5)
+    ]
+    watchlist = asyncio.run(WatchlistService(FakeSession(rows)).get_user_watchlist_with_content(1))
+
+    assert loads(trusted_response(watchlist).body) == response_model_output(WatchlistWithContent, watchlist)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (datetime(2025, 1, 1, tzinfo=UTC), "2025-01-01T00:00:00Z"),
+        (datetime(2025, 1, 1, 0, 0, 0, 500, tzinfo=UTC), "2025-01-01T00:00:00.000500Z"),
+        (datetime(2025, 1, 1, tzinfo=timezone(timedelta(hours=3))), "2025-01-01T00:00:00+03:00"),
+        (datetime(2025, 1, 1), "2025-01-01T00:00:00"),
+    ],
+)
+def test_datetimes_render_like_pydantic(value, expected):
+    assert loads(trusted_response({"at": value}).body)["at"] == expected
+    assert TypeAdapter(datetime).dump_python(value, mode="json") == expected
@@ -0,0 +1,114 @@
+# api/tests/test_title_index.py
+import asyncio
+
+import pytest
+
+from app.services.title_index import TitleIndex
+
+ROWS = [
+    (1, "Матрица", "The Matrix", "movie"),
+    (2, "Матрица: Перезагрузка", "The Matrix Reloaded", "movie"),
+    (3, "Игра престолов", "Game of Thrones", "series"),
+    (4, "Начало", "Inception", "movie"),
+    (5, "Темный рыцарь", "The Dark Knight", "movie"),
+]
+
+
+@pytest.fixture
+def index():
+    title_index = TitleIndex(max_candidates=100)
+    asyncio.run(title_index.build(ROWS))
+    return title_index
+
+
+def ids(results):
+    return [content_id for content_id, _ in results]
+
+
+def test_not_ready_returns_nothing():
+    assert TitleIndex().search("matrix") == []
+
+
+def test_exact_title_first(index):
+    assert ids(index.search("The Matrix"))[0] == 1
+
+
+def test_typos_are_corrected(index):
+    assert ids(index.search("matirx reloded"))[0] == 2
+    assert ids(index.search("Game of Throns"))[0] == 3
+
+
+def test_russian_and_original_titles(index):
+    assert ids(index.search("игра престолов"))[0] == 3
+    assert ids(index.search("inception"))[0] == 4
+
+
+def test_content_type_filter(index):
+    assert ids(index.search("matrix", content_type="series")) == []
+    assert set(ids(index.search("the", content_type="series"))) <= {3}
+
+
+def test_content_type_filter_applies_before_candidate_cut():
+    # Кандидатов больше max_candidates, и все лучшие — фильмы
+    rows = [(content_id, f"Star Story {content_id}", None, "movie") for content_id in range(1, 51)]
+    rows.append((100, "Star Story", None, "series"))
+    title_index = TitleIndex(max_candidates=5)
+    asyncio.run(title_index.build(rows))
+
+    assert ids(title_index.search("star story", content_type="series")) == [100]
+
+
+def test_add_and_remove(index):
+    index.add(6, "Бегущий по лезвию", "Blade Runner", "movie")
+    assert ids(index.search("blade runner"))[0] == 6
+
+    index.remove(6)
+    assert 6 not in ids(index.search("blade runner"))
+
+
+def test_edits_during_build_are_applied_after_swap():
+    title_index = TitleIndex()
+
+    async def run() -> None:
+        title_index._building = True
+        title_index.add(7, "Интерстеллар", "Interstellar", "movie")
+        await title_index.build(ROWS)
+
+    asyncio.run(run())
+    assert ids(title_index.search("interstellar"))[0] == 7
+
+
+def test_limit(index):
+    assert len(index.search("the", limit=2)) <= 2
+
+
+def test_snapshot_is_taken_before_write_thread(tmp_path, monkeypatch):
+    path = str(tmp_path / "title_index.pickle")
+    title_index = TitleIndex(snapshot_path=path)
+    asyncio.run(title_index.build(ROWS))
+    real_to_thread = asyncio.to_thread
+
+    async def mutate_during_write(func, *args):
+        # Цикл событий меняет индекс, пока файл пишется в отдельном потоке
+        title_index.add(6, "Интерстеллар", "Interstellar", "movie")
+        return await real_to_thread(func, *args)
+
+    monkeypatch.setattr(asyncio, "to_thread", mutate_during_write)
+    asyncio.run(title_index.save_snapshot())
+    monkeypatch.setattr(asyncio, "to_thread", real_to_thread)
+
+    restored = TitleIndex(snapshot_path=path)
+    assert asyncio.run(restored._load_snapshot())
+    assert set(restored._state.docs) == {1, 2, 3, 4, 5}
+
+
+def test_snapshot_errors_are_not_raised(tmp_path, monkeypatch):
+    title_index = TitleIndex(snapshot_path=str(tmp_path / "title_index.pickle"))
+    asyncio.run(title_index.build(ROWS))
+
+    def broken_dumps(*args, **kwargs):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr("app.services.title_index.pickle.dumps", broken_dumps)
+    asyncio.run(title_index.save_snapshot())
+    assert not (tmp_path / "title_index.pickle").exists()
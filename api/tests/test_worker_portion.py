@@ -0,0 +1,359 @@
+# api/tests/test_worker_portion.py
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.services import content_service as content_service_module
+from app.services.content_service import ContentService, _WorkerPortion
+from app.services.search_cache import SearchResultCache
+
+
+def card(imdb_id: str) -> Dict[str, Any]:
+    return {"imdb_id": imdb_id, "title": imdb_id}
+
+
+class FakeWorker:
+    """Подмена worker_adapter: заранее заданные события потока и ответ порции"""
+
+    def __init__(
+        self,
+        events: Optional[List[Dict[str, Any]]] = None,
+        page: Optional[Dict[str, Any]] = None,
+        hang: bool = False,
+    ):
+        self.events = events or []
+        self.page = page
+        self.hang = hang
+        self.opened = asyncio.Event()
+
+    async def search_omdb_stream(self, title, content_type=None, summary_only=False):
+        self.opened.set()
+        for event in self.events:
+            yield event
+        if self.hang:
+            await asyncio.sleep(10)
+
+    async def search_omdb_page(self, title, content_type=None, cursor=None, limit=5, summary_only=True):
+        return self.page
+
+    @staticmethod
+    def page_cursor(offset: int) -> str:
+        return str(offset)
+
+
+@pytest.fixture(autouse=True)
+def fresh_search_cache(monkeypatch):
+    cache = SearchResultCache()
+    monkeypatch.setattr(content_service_module, "search_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def use_worker(monkeypatch):
+    def install(worker: FakeWorker) -> FakeWorker:
+        monkeypatch.setattr(content_service_module, "worker_adapter", worker)
+        return worker
+
+    return install
+
+
+@pytest.fixture
+def service(monkeypatch):
+    async def no_database_match(self, title, content_type=None):
+        return None
+
+    monkeypatch.setattr(ContentService, "_find_in_database", no_database_match)
+    return ContentService(db=None)
+
+
+def collect(portion: _WorkerPortion, title: str = "matrix") -> _WorkerPortion:
+    asyncio.run(portion.collect(title, None, False))
+    return portion
+
+
+def test_stream_error_marks_portion_failed(use_worker):
+    use_worker(FakeWorker(events=[{"type": "error", "error": "OMDB недоступен"}]))
+    portion = collect(_WorkerPortion(None))
+    assert portion.failed
+    assert portion.error == "OMDB недоступен"
+
+
+def test_not_found_is_not_a_failure(use_worker):
+    use_worker(FakeWorker(events=[{"type": "not_found", "error": "не найден"}]))
+    portion = collect(_WorkerPortion(None))
+    assert not portion.failed
+    assert portion.items == {}
+
+
+def test_failed_page_marks_portion_failed(use_worker):
+    use_worker(FakeWorker(page=None))
+    assert collect(_WorkerPortion("5")).failed
+
+
+def test_empty_page_is_not_a_failure(use_worker):
+    use_worker(FakeWorker(page={"data": [], "next_cursor": None}))
+    assert not collect(_WorkerPortion("5")).failed
+
+
+def test_received_stops_at_first_gap(use_worker):
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "item", "index": 2, "data": card("tt2")},
+            ]
+        )
+    )
+    portion = collect(_WorkerPortion(None))
+    assert [item["imdb_id"] for item in portion.received()] == ["tt0"]
+    assert portion.resume_cursor() == "1"
+
+
+def test_search_maps_worker_failure_to_error(use_worker, service):
+    use_worker(FakeWorker(events=[{"type": "error", "error": "timeout"}]))
+    response = asyncio.run(service._search_omdb_direct("matrix", None, False, None, 1.0))
+    assert response["source"] == "error"
+    assert response["data"] is None
+
+
+def test_search_maps_empty_result_to_not_found(use_worker, service):
+    use_worker(FakeWorker(events=[{"type": "not_found"}]))
+    response = asyncio.run(service._search_omdb_direct("matrix", None, False, None, 1.0))
+    assert response["source"] == "not_found"
+
+
+def test_search_failure_after_some_items_is_partial(use_worker, service):
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "item", "index": 2, "data": card("tt2")},
+                {"type": "error", "error": "connection reset"},
+            ]
+        )
+    )
+    response = asyncio.run(service._search_omdb_direct("matrix", None, False, None, 1.0))
+    assert response["partial"]
+    assert [item["imdb_id"] for item in response["data"]] == ["tt0"]
+    assert response["next_cursor"] == "1"
+
+
+def test_budget_exhausted_returns_partial(use_worker, service):
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "item", "index": 1, "data": card("tt1")},
+                {"type": "item", "index": 3, "data": card("tt3")},
+            ],
+            hang=True,
+        )
+    )
+
+    async def run() -> Dict[str, Any]:
+        response = await service._search_omdb_direct("matrix", None, False, None, 0.05)
+        for task in list(content_service_module._background_tasks):
+            task.cancel()
+        return response
+
+    response = asyncio.run(run())
+    assert response["partial"]
+    # tt3 пришел после дыры — его отдаст следующая порция с resume_cursor
+    assert [item["imdb_id"] for item in response["data"]] == ["tt0", "tt1"]
+    assert response["next_cursor"] == "2"
+
+
+def test_complete_response_keeps_items_after_gap(use_worker, service):
+    # Поток завершился: дыра — это карточка без деталей, а не недошедшая
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "item", "index": 2, "data": card("tt2")},
+                {"type": "done", "count": 2, "next_cursor": "5"},
+            ]
+        )
+    )
+    response = asyncio.run(service._search_omdb_direct("matrix", None, False, None, 1.0))
+    assert not response["partial"]
+    assert [item["imdb_id"] for item in response["data"]] == ["tt0", "tt2"]
+    assert response["next_cursor"] == "5"
+
+
+def stream(service: ContentService, budget: float = 1.0) -> List[Dict[str, Any]]:
+    async def run() -> List[Dict[str, Any]]:
+        events = [event async for event in service.search_omdb_direct_stream("matrix", budget=budget)]
+        for task in list(content_service_module._background_tasks):
+            task.cancel()
+        return events
+
+    return asyncio.run(run())
+
+
+def test_stream_opens_worker_before_database_answers(use_worker, monkeypatch):
+    worker = use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "done", "count": 1, "next_cursor": None},
+            ]
+        )
+    )
+
+    async def database_after_worker(self, title, content_type=None):
+        # Последовательная реализация здесь зависла бы: поток Worker еще не открыт
+        await asyncio.wait_for(worker.opened.wait(), timeout=1)
+        return {**card("tt9"), "source": "database"}
+
+    monkeypatch.setattr(ContentService, "_find_in_database", database_after_worker)
+    events = stream(ContentService(db=None))
+    assert [event["data"]["imdb_id"] for event in events if event["type"] == "item"] == ["tt9", "tt0"]
+    assert events[-1] == {
+        "type": "done", "count": 2, "next_cursor": None, "partial": False, "cached": False
+    }
+
+
+def test_stream_budget_exhausted_ends_partial(use_worker, service):
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "item", "index": 2, "data": card("tt2")},
+            ],
+            hang=True,
+        )
+    )
+    events = stream(service, budget=0.05)
+    assert [event["data"]["imdb_id"] for event in events if event["type"] == "item"] == ["tt0"]
+    assert events[-1] == {
+        "type": "done", "count": 1, "next_cursor": "1", "partial": True, "cached": False
+    }
+
+
+def test_stream_failure_after_some_items_is_partial(use_worker, service):
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "error", "error": "connection reset"},
+            ]
+        )
+    )
+    events = stream(service)
+    assert events[-1] == {
+        "type": "done", "count": 1, "next_cursor": "1", "partial": True, "cached": False
+    }
+
+
+def test_stream_failure_without_items_is_error(use_worker, service):
+    use_worker(FakeWorker(events=[{"type": "error", "error": "timeout"}]))
+    assert [event["type"] for event in stream(service)] == ["error"]
+
+
+def test_stream_complete_keeps_items_after_gap(use_worker, service):
+    use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 2, "data": card("tt2")},
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "done", "count": 2, "next_cursor": "5"},
+            ]
+        )
+    )
+    events = stream(service)
+    assert [event["data"]["imdb_id"] for event in events if event["type"] == "item"] == ["tt0", "tt2"]
+    assert events[-1]["next_cursor"] == "5"
+
+
+def test_stream_first_portion_is_cached_and_shared(use_worker, service):
+    worker = use_worker(
+        FakeWorker(
+            events=[
+                {"type": "item", "index": 0, "data": card("tt0")},
+                {"type": "done", "count": 1, "next_cursor": "5"},
+            ]
+        )
+    )
+    first = stream(service)
+    worker.events = [{"type": "error", "error": "не должен вызываться"}]
+    second = stream(service)
+
+    assert [event["type"] for event in second] == ["item", "done"]
+    assert second[0] == first[0]
+    assert second[-1]["cached"] and second[-1]["next_cursor"] == "5"
+    # Тот же ключ, что у search_omdb_direct без курсора
+    response = asyncio.run(service.search_omdb_direct("matrix"))
+    assert response["cached"] and [item["imdb_id"] for item in response["data"]] == ["tt0"]
+
+
+def test_invalidate_during_stream_search_is_not_cached(use_worker, monkeypatch, fresh_search_cache):
+    use_worker(FakeWorker(events=[{"type": "not_found"}]))
+
+    async def database_changed_meanwhile(self, title, content_type=None):
+        # Пока шел поиск, фильм добавили в базу (create_content → invalidate)
+        self._invalidate_search_cache("movie")
+        return None
+
+    monkeypatch.setattr(ContentService, "_find_in_database", database_changed_meanwhile)
+    service = ContentService(db=None)
+    assert [event["type"] for event in stream(service)] == ["not_found"]
+
+    key = fresh_search_cache.key("matrix", None, False, None)
+    assert fresh_search_cache.get(key) is None
+    assert fresh_search_cache.stats()["stale_sets"] == 1
+
+
+def five_rows() -> List[Dict[str, Any]]:
+    return [{"type": "item", "index": index, "data": card(f"tt{index}")} for index in range(5)] + [
+        {"type": "done", "count": 5, "next_cursor": "5"}
+    ]
+
+
+@pytest.fixture
+def database_match(monkeypatch):
+    def install(imdb_id: str) -> None:
+        async def find(self, title, content_type=None):
+            return {**card(imdb_id), "source": "database"}
+
+        monkeypatch.setattr(ContentService, "_find_in_database", find)
+
+    return install
+
+
+def test_first_portion_with_database_match_is_capped(use_worker, database_match):
+    use_worker(FakeWorker(events=five_rows()))
+    database_match("tt9")
+    response = asyncio.run(ContentService(db=None)._search_omdb_direct("matrix", None, False, None, 1.0))
+    assert [item["imdb_id"] for item in response["data"]] == ["tt9", "tt0", "tt1", "tt2", "tt3"]
+    # tt4 не показан — следующая порция начинается с него
+    assert response["next_cursor"] == "4"
+    assert not response["partial"]
+
+
+def test_duplicate_of_database_match_does_not_take_a_slot(use_worker, database_match):
+    use_worker(FakeWorker(events=five_rows()))
+    database_match("tt2")
+    response = asyncio.run(ContentService(db=None)._search_omdb_direct("matrix", None, False, None, 1.0))
+    assert [item["imdb_id"] for item in response["data"]] == ["tt2", "tt0", "tt1", "tt3", "tt4"]
+    assert response["next_cursor"] == "5"
+
+
+def test_stream_first_portion_with_database_match_is_capped(use_worker, database_match):
+    use_worker(FakeWorker(events=five_rows()))
+    database_match("tt9")
+    events = stream(ContentService(db=None))
+    assert [event["data"]["imdb_id"] for event in events if event["type"] == "item"] == [
+        "tt9", "tt0", "tt1", "tt2", "tt3"
+    ]
+    assert events[-1]["count"] == 5 and events[-1]["next_cursor"] == "4"
+
+
+def test_full_portion_is_not_partial_even_if_worker_is_still_running(use_worker, database_match):
+    # Порция заполнена раньше, чем Worker закончил поток
+    use_worker(FakeWorker(events=five_rows()[:5], hang=True))
+    database_match("tt9")
+    events = stream(ContentService(db=None), budget=1.0)
+    assert events[-1] == {
+        "type": "done", "count": 5, "next_cursor": "4", "partial": False, "cached": False
+    }
@@ -3,6 +3,9 @@
 -- Автоматически выполняется при первом запуске PostgreSQL
 -- ============================================
 
+-- Триграммы для поиска по подстроке и похожим названиям
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 
 -- ============================================
 -- Таблица пользователей (Telegram)
@@ -82,6 +85,32 @@ CREATE INDEX IF NOT EXISTS idx_content_imdb_rating ON content(imdb_rating);
 CREATE INDEX IF NOT EXISTS idx_content_category_id ON content(category_id);
 CREATE INDEX IF NOT EXISTS idx_content_is_active ON content(is_active);
 
+-- Блок поиска ниже повторяет api/app/schema_upgrade.py (его API выполняет на
+-- старте для уже существующих баз) — менять оба места вместе
+
+-- Поиск по названию: ILIKE '%...%' и похожесть (%) через триграммы,
+-- слова из названий и описания — через tsvector (конфигурация simple:
+-- названия бывают и на русском, и на английском, без стемминга)
+ALTER TABLE content ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(original_title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_content_title_trgm ON content USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_content_original_title_trgm ON content USING GIN (original_title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_content_search_vector ON content USING GIN (search_vector);
+
+-- Список каталога (/content/) с фильтром по типу или категории, новые первыми
+CREATE INDEX IF NOT EXISTS idx_content_type_id ON content(content_type, id DESC);
+CREATE INDEX IF NOT EXISTS idx_content_category_id_id ON content(category_id, id DESC);
+
+-- Очередь фонового обновления (GET /content/refresh/candidates): давно не обновлявшиеся первыми
+CREATE INDEX IF NOT EXISTS idx_content_refresh_queue
+    ON content ((coalesce(updated_at, created_at)) ASC NULLS FIRST, id)
+    WHERE imdb_id IS NOT NULL;
+
 -- Проверка для content_type
 ALTER TABLE content ADD CONSTRAINT check_content_type 
     CHECK (content_type IN ('movie', 'series'));
@@ -1,6 +1,7 @@
 # telegram_bot/app/handlers/search.py
 import logging
 from datetime import date, datetime, timedelta
+from typing import Any, Dict
 
 from aiogram import F, Router, types
 from aiogram.filters import Command
@@ -9,6 +10,7 @@ from aiogram.fsm.context import FSMContext
 from app.keyboards.main_menu import get_main_menu_keyboard
 from app.keyboards.search_keyboards import get_search_results_keyboard
 from app.services.history_service import HistoryService
+from app.services.poster_service import poster_service
 from app.services.watchlist_service import WatchlistService
 from app.states.search_state import SearchState
 from app.utils.message_helpers import send_content_card, update_content_card
@@ -18,6 +20,61 @@ router = Router()
 logger = logging.getLogger(__name__)
 
 
+async def _ensure_details(
+    state: FSMContext, results: list, index: int
+) -> Dict[str, Any]:
+    """Догрузить детали карточки, если поиск вернул только краткую строку OMDB"""
+    item = results[index]
+    if item.get("details_loaded") is not False or not item.get("imdb_id"):
+        return item
+
+    from app.services.content_service import ContentService
+
+    details = await ContentService().get_details(item["imdb_id"])
+    if not details:
+        return item
+
+    results[index] = {**item, **details, "details_loaded": True}
+    await state.update_data(search_results=results)
+    return results[index]
+
+
+async def _load_more_results(state: FSMContext, results: list) -> list:
+    """Догрузить следующую порцию выдачи, когда пользователь листает дальше загруженного"""
+    data = await state.get_data()
+    cursor = data.get("search_cursor")
+    if not cursor:
+        return results
+
+    from app.services.content_service import ContentService
+
+    response = await ContentService().search_content(
+        data.get("search_query", ""), summary=True, cursor=cursor
+    )
+    seen = {item.get("imdb_id") for item in results if item.get("imdb_id")}
+    new_items = [
+        item
+        for item in (response.get("data") or [])
+        if not item.get("imdb_id") or item["imdb_id"] not in seen
+    ]
+
+    results = results + new_items
+    poster_service.prefetch_in_background(
+        {item.get("imdb_id"): item.get("poster_url") for item in new_items}
+    )
+    await state.update_data(
+        search_results=results,
+        total_results=len(results),
+        # partial: порция еще догружается в Worker — курсор оставляем для повторной попытки
+        search_cursor=(
+            response.get("next_cursor")
+            if response.get("data") or response.get("partial")
+            else None
+        ),
+    )
+    return results
+
+
 @router.message(Command("search"))
 @router.message(F.text == "🔍 Поиск")
 async def cmd_search(message: types.Message, state: FSMContext):
@@ -41,81 +98,70 @@ async def process_search_query(message: types.Message, state: FSMContext):
         from app.services.content_service import ContentService
 
         content_service = ContentService()
-        raw_result = await content_service.search_content(query)
-
-        # Приводим ответ API (dict) к списку результатов для пагинации
         results = []
+        card = None
         error_message = None
-
-        if isinstance(raw_result, list):
-            results = raw_result
-        elif isinstance(raw_result, dict):
-            source = raw_result.get("source")
-
-            # Стандартная схема API для бота
-            if source in {"database", "omdb", "mixed"}:
-                data = raw_result.get("data")
-                if isinstance(data, list):
-                    results = data
-                elif data:
-                    results = [data]
-                else:
-                    error_message = raw_result.get("message")
-            # Явные статусы ошибок
-            elif source in {"not_found", "error"}:
-                error_message = raw_result.get("message")
-            # Фолбэк для произвольных структур (success/error)
-            elif raw_result.get("success") is False:
-                error_message = raw_result.get("error") or raw_result.get("detail")
-            else:
-                data = raw_result.get("data")
-                if isinstance(data, list):
-                    results = data
-                elif data:
-                    results = [data]
-
-        if error_message:
-            await search_message.edit_text(
-                f"❌ {error_message}", reply_markup=get_main_menu_keyboard()
-            )
-            await state.clear()
-            return
-
-        if not results:
+        next_cursor = None
+
+        # Карточки приходят потоком (детали догружаются только для открываемых):
+        # первую показываем сразу вместо "Ищем...", остальные копим для пагинации.
+        # Дальше первой порции выдача догружается по курсору при листании
+        await state.update_data(search_cursor=None)
+        async for event in content_service.search_content_stream(query, summary=True):
+            event_type = event.get("type")
+
+            if event_type == "item":
+                results.append(event["data"])
+                await state.update_data(search_results=results, total_results=len(results))
+
+                if card is None:
+                    await state.update_data(current_page=0, search_query=query)
+                    await _ensure_details(state, results, 0)
+
+                    try:
+                        await search_message.delete()
+                    except Exception:
+                        pass
+
+                    card = await send_content_card(
+                        message,
+                        get_search_results_message(results, 0),
+                        keyboard=get_search_results_keyboard(results, 0),
+                        poster_url=results[0].get("poster_url"),
+                        imdb_id=results[0].get("imdb_id"),
+                    )
+                    await state.set_state(SearchState.waiting_for_selection)
+            elif event_type == "done":
+                next_cursor = event.get("next_cursor")
+                await state.update_data(search_cursor=next_cursor)
+            elif event_type in {"not_found", "error"}:
+                error_message = event.get("message")
+
+        if card is None:
             await search_message.edit_text(
-                "❌ Ничего не найдено. Попробуйте другой запрос.",
+                f"❌ {error_message}" if error_message else "❌ Ничего не найдено. Попробуйте другой запрос.",
                 reply_markup=get_main_menu_keyboard(),
             )
             await state.clear()
             return
 
-        # ограничиваем список пятью записями
-        results = results[:5]
-
-        # Сохраняем результаты
-        await state.update_data(
-            search_results=results,
-            current_page=0,
-            search_query=query,
-            total_results=len(results),
+        # Поток завершен: постеры остальных карточек готовим в фоне
+        poster_service.prefetch_in_background(
+            {item.get("imdb_id"): item.get("poster_url") for item in results[1:]}
         )
 
-        # Показываем первую страницу результатов
-        text = get_search_results_message(results, 0)
-        keyboard = get_search_results_keyboard(results, 0)
-
-        try:
-            await search_message.delete()
-        except Exception:
-            pass
+        # Обновляем навигацию первой карточки с учетом всех результатов
+        data = await state.get_data()
+        if (len(results) > 1 or next_cursor) and data.get("current_page", 0) == 0:
+            try:
+                await card.edit_reply_markup(
+                    reply_markup=get_search_results_keyboard(
+                        data.get("search_results", results), 0, has_more=bool(next_cursor)
+                    )
+                )
+            except Exception:
+                pass
 
-        await send_content_card(
-            message,
-            text,
-            keyboard=keyboard,
-            poster_url=results[0].get("poster_url"),
-        )
-        await state.set_state(SearchState.waiting_for_selection)
         logger.info(f"✅ Поиск завершен, найдено {len(results)} результатов")
 
     except Exception as e:
@@ -135,15 +181,23 @@ async def change_search_page(callback: types.CallbackQuery, state: FSMContext):
         return
 
     current_page = int(callback.data.split("_")[2])
+    if current_page >= len(results):
+        results = await _load_more_results(state, results)
     max_page = max(len(results) - 1, 0)
     current_page = max(0, min(current_page, max_page))
+    await _ensure_details(state, results, current_page)
 
-    text = get_search_results_message(results, current_page)
-    keyboard = get_search_results_keyboard(results, current_page)
+    has_more = bool((await state.get_data()).get("search_cursor"))
+    text = get_search_results_message(results, current_page, has_more=has_more)
+    keyboard = get_search_results_keyboard(results, current_page, has_more=has_more)
 
     poster_url = results[current_page].get("poster_url")
     await update_content_card(
-        callback.message, text, keyboard=keyboard, poster_url=poster_url
+        callback.message,
+        text,
+        keyboard=keyboard,
+        poster_url=poster_url,
+        imdb_id=results[current_page].get("imdb_id"),
     )
     await state.update_data(current_page=current_page)
     await callback.answer()
@@ -169,7 +223,7 @@ async def start_add_to_history(callback: types.CallbackQuery, state: FSMContext)
         await callback.answer("Элемент вне диапазона", show_alert=True)
         return
 
-    selected = results[index]
+    selected = await _ensure_details(state, results, index)
     if selected.get("already_watched"):
         await callback.answer("Фильм уже просмотрен", show_alert=True)
         return
@@ -420,7 +474,7 @@ async def add_to_watchlist(callback: types.CallbackQuery, state: FSMContext):
         await callback.answer("Элемент вне диапазона", show_alert=True)
         return
 
-    selected = results[index]
+    selected = await _ensure_details(state, results, index)
     if selected.get("already_watched"):
         await callback.answer("Фильм уже просмотрен", show_alert=True)
         return
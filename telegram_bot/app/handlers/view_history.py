@@ -1,3 +1,4 @@
+
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
@@ -5,6 +6,7 @@ from aiogram.fsm.context import FSMContext
 from app.keyboards.history_keyboards import get_history_results_keyboard, get_rating_keyboard
 from app.keyboards.main_menu import get_main_menu_keyboard
 from app.services.history_service import HistoryService
+from app.services.poster_service import poster_service
 from app.states.history_state import HistoryState
 from app.utils.formatters import format_history_record
 from app.utils.message_helpers import send_content_card, update_content_card
@@ -46,13 +48,25 @@ async def cmd_history(message: types.Message, state: FSMContext):
 
     await state.update_data(history_records=history, history_page=0)
     await state.set_state(HistoryState.viewing)
+    # Постеры остальных записей готовим в фоне, пока пользователь смотрит первую
+    poster_service.prefetch_in_background(
+        {
+            content.get("imdb_id"): content.get("poster_url")
+            for content in ((record.get("content") or {}) for record in history)
+        }
+    )
 
     text = get_history_results_message(history, 0)
     keyboard = get_history_results_keyboard(history, 0)
-    poster_url = (history[0].get("content") or {}).get("poster_url")
+    content = history[0].get("content") or {}
+    poster_url = content.get("poster_url")
 
     await send_content_card(
-        message, text, keyboard=keyboard, poster_url=poster_url
+        message,
+        text,
+        keyboard=keyboard,
+        poster_url=poster_url,
+        imdb_id=content.get("imdb_id"),
     )
 
 
@@ -80,10 +94,15 @@ async def paginate_history(callback: types.CallbackQuery, state: FSMContext):
 
     text = get_history_results_message(history, safe_page)
     keyboard = get_history_results_keyboard(history, safe_page)
-    poster_url = (history[safe_page].get("content") or {}).get("poster_url")
+    content = history[safe_page].get("content") or {}
+    poster_url = content.get("poster_url")
 
     await update_content_card(
-        callback.message, text, keyboard=keyboard, poster_url=poster_url
+        callback.message,
+        text,
+        keyboard=keyboard,
+        poster_url=poster_url,
+        imdb_id=content.get("imdb_id"),
     )
     await state.update_data(history_page=safe_page)
     await callback.answer()
@@ -108,9 +127,14 @@ async def show_history_detail(callback: types.CallbackQuery):
 
     text = format_history_record(record)
     keyboard = get_rating_keyboard(record_id)
-    poster_url = (record.get("content") or {}).get("poster_url")
+    content = record.get("content") or {}
+    poster_url = content.get("poster_url")
 
     await update_content_card(
-        callback.message, text, keyboard=keyboard, poster_url=poster_url
+        callback.message,
+        text,
+        keyboard=keyboard,
+        poster_url=poster_url,
+        imdb_id=content.get("imdb_id"),
     )
     await callback.answer()
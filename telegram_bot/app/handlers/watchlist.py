@@ -7,6 +7,7 @@ from aiogram.fsm.context import FSMContext
 from app.keyboards.watchlist_keyboards import get_watchlist_results_keyboard
 from app.keyboards.main_menu import get_main_menu_keyboard
 from app.services.history_service import HistoryService
+from app.services.poster_service import poster_service
 from app.services.watchlist_service import WatchlistService
 from app.states.watchlist_state import WatchlistState
 from app.utils.message_helpers import send_content_card, update_content_card
@@ -36,13 +37,25 @@ async def cmd_watchlist(message: types.Message, state: FSMContext):
         return
 
     await state.update_data(watchlist_results=watchlist, watchlist_page=0)
+    # Постеры остальных записей готовим в фоне, пока пользователь смотрит первую
+    poster_service.prefetch_in_background(
+        {
+            content.get("imdb_id"): content.get("poster_url")
+            for content in ((item.get("content") or {}) for item in watchlist)
+        }
+    )
 
     text = get_watchlist_message(watchlist, 0)
     keyboard = get_watchlist_results_keyboard(watchlist, 0)
-    poster_url = (watchlist[0].get("content") or {}).get("poster_url")
+    content = watchlist[0].get("content") or {}
+    poster_url = content.get("poster_url")
 
     await send_content_card(
-        message, text, keyboard=keyboard, poster_url=poster_url
+        message,
+        text,
+        keyboard=keyboard,
+        poster_url=poster_url,
+        imdb_id=content.get("imdb_id"),
     )
     await state.set_state(WatchlistState.viewing)
 
@@ -64,10 +77,15 @@ async def change_watchlist_page(callback: types.CallbackQuery, state: FSMContext
     safe_page = max(0, min(page, len(results) - 1))
     text = get_watchlist_message(results, safe_page)
     keyboard = get_watchlist_results_keyboard(results, safe_page)
-    poster_url = (results[safe_page].get("content") or {}).get("poster_url")
+    content = results[safe_page].get("content") or {}
+    poster_url = content.get("poster_url")
 
     await update_content_card(
-        callback.message, text, keyboard=keyboard, poster_url=poster_url
+        callback.message,
+        text,
+        keyboard=keyboard,
+        poster_url=poster_url,
+        imdb_id=content.get("imdb_id"),
     )
     await state.update_data(watchlist_page=safe_page)
     await callback.answer()
@@ -240,7 +258,7 @@ async def watchlist_rating(message: types.Message, state: FSMContext):
     watched_at = data.get("watched_at")
     review = data.get("review")
 
-    content = (selected.get("content") or {})
+    content = selected.get("content") or {}
     content_id = content.get("id")
     watchlist_id = selected.get("id")
 
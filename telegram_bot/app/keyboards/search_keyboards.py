@@ -4,8 +4,13 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 __all__ = ["get_search_results_keyboard"]
 
 
-def get_search_results_keyboard(results: list, current_page: int) -> InlineKeyboardMarkup:
-    """Клавиатура для результатов поиска"""
+def get_search_results_keyboard(
+    results: list, current_page: int, has_more: bool = False
+) -> InlineKeyboardMarkup:
+    """Клавиатура для результатов поиска
+
+    has_more — у API есть следующая порция выдачи (кнопка "Вперед" на последней карточке).
+    """
     builder = InlineKeyboardBuilder()
 
     if not results:
@@ -33,7 +38,7 @@ def get_search_results_keyboard(results: list, current_page: int) -> InlineKeybo
         navigation_buttons.append(
             InlineKeyboardButton(text="⬅️ Назад", callback_data=f"search_page_{safe_page-1}")
         )
-    if safe_page < len(results) - 1:
+    if safe_page < len(results) - 1 or has_more:
         navigation_buttons.append(
             InlineKeyboardButton(text="Вперед ➡️", callback_data=f"search_page_{safe_page+1}")
         )
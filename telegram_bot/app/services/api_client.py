@@ -1,7 +1,8 @@
 # telegram_bot/app/services/api_client.py
 import httpx
 import logging
-from typing import Optional, Dict, Any
+import orjson
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 import os
 
 logger = logging.getLogger(__name__)
@@ -20,10 +21,10 @@ class APIClient:
             if response.is_success:
                 if response.status_code == 204:
                     return {"success": True}
-                return response.json()
+                return orjson.loads(response.content)
 
             try:
-                error_body = response.json()
+                error_body = orjson.loads(response.content)
             except Exception:
                 error_body = {"detail": response.text}
 
@@ -55,6 +56,37 @@ class APIClient:
         """DELETE запрос"""
         return await self.request("DELETE", endpoint)
 
+    async def get_bytes(
+        self, endpoint: str, params: Optional[Dict] = None
+    ) -> Tuple[int, Optional[bytes]]:
+        """GET запрос с бинарным ответом: (статус, тело); статус 0 — API недоступен"""
+        try:
+            response = await self.client.get(endpoint, params=params)
+            return response.status_code, response.content if response.is_success else None
+        except httpx.HTTPError as e:
+            logger.error(f"API request failed: {e}")
+            return 0, None
+
+    async def stream(
+        self, endpoint: str, params: Optional[Dict] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """GET запрос с потоковым NDJSON ответом: отдает события по одному"""
+        try:
+            async with self.client.stream("GET", endpoint, params=params) as response:
+                if not response.is_success:
+                    yield {"type": "error", "message": f"API error: {response.status_code}"}
+                    return
+
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        yield orjson.loads(line)
+        except httpx.HTTPError as e:
+            logger.error(f"API stream failed: {e}")
+            yield {"type": "error", "message": str(e)}
+        except Exception as e:
+            logger.error(f"Unexpected error in API stream: {e}")
+            yield {"type": "error", "message": str(e)}
+
     async def close(self):
         """Закрыть клиент"""
         await self.client.aclose()
@@ -1,6 +1,6 @@
 # telegram_bot/app/services/content_service.py
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 from app.services.api_client import api_client
 
 logger = logging.getLogger(__name__)
@@ -9,11 +9,29 @@ class ContentService:
     def __init__(self):
         self.api_client = api_client
     
-    async def search_content(self, title: str, content_type: str = None) -> Dict[str, Any]:
-        """Поиск для бота через API: возвращаем ответ API как есть"""
+    async def search_content(
+        self,
+        title: str,
+        content_type: str = None,
+        summary: bool = False,
+        cursor: Optional[str] = None,
+        budget: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Поиск для бота через API: возвращаем ответ API как есть
+
+        summary=True — результаты OMDB без деталей, детали подгружает get_details.
+        cursor — next_cursor из предыдущего ответа (следующая порция выдачи).
+        budget — сколько секунд API ждет OMDB; не успевший ответ помечен partial.
+        """
         params = {"title": title}
         if content_type:
             params["content_type"] = content_type
+        if summary:
+            params["summary"] = "true"
+        if cursor:
+            params["cursor"] = cursor
+        if budget:
+            params["budget"] = budget
 
         response = await self.api_client.get("/api/v1/bot/search", params=params)
 
@@ -22,6 +40,27 @@ class ContentService:
 
         return response
     
+    async def search_content_stream(
+        self, title: str, content_type: str = None, summary: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Потоковый поиск через API: события item/done/not_found/error по мере готовности"""
+        params = {"title": title}
+        if content_type:
+            params["content_type"] = content_type
+        if summary:
+            params["summary"] = "true"
+
+        async for event in self.api_client.stream("/api/v1/bot/search/stream", params=params):
+            yield event
+
+    async def get_details(self, imdb_id: str) -> Optional[Dict[str, Any]]:
+        """Полная карточка по IMDb ID (для результатов, найденных в режиме summary)"""
+        response = await self.api_client.get(f"/api/v1/bot/details/{imdb_id}")
+
+        if isinstance(response, dict) and response.get("data"):
+            return response["data"]
+        return None
+
     async def add_from_omdb(self, title: str, content_type: str = "movie") -> Optional[Dict[str, Any]]:
         """Добавить контент из OMDB через API"""
         data = {
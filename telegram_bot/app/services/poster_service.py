@@ -0,0 +1,116 @@
+# telegram_bot/app/services/poster_service.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Set, Union
+
+from aiogram import types
+from aiogram.types import BufferedInputFile
+
+from app.services.api_client import api_client
+
+logger = logging.getLogger(__name__)
+
+
+class PosterService:
+    """Постеры для карточек: миниатюры из кэша API/Worker вместо исходных ссылок OMDB
+
+    После первой отправки Telegram возвращает file_id — дальше фото
+    отправляется по нему без повторной загрузки. Для постеров, которых нет,
+    бот сразу шлет текстовую карточку, не пытаясь отправить фото.
+    """
+
+    def __init__(self, max_entries: int = 5000, missing_ttl: float = 3600):
+        self.api_client = api_client
+        self.max_entries = max_entries
+        self.missing_ttl = missing_ttl
+        self._file_ids: "OrderedDict[str, str]" = OrderedDict()
+        self._missing: Dict[str, float] = {}
+        # Фоновые prefetch (держим ссылки до завершения, иначе задачу может собрать GC)
+        self._tasks: Set[asyncio.Task] = set()
+
+    def is_missing(self, imdb_id: str) -> bool:
+        marked_at = self._missing.get(imdb_id)
+        return marked_at is not None and time.monotonic() - marked_at < self.missing_ttl
+
+    def _mark_missing(self, imdb_id: str) -> None:
+        if len(self._missing) >= self.max_entries:
+            self._missing.clear()
+        self._missing[imdb_id] = time.monotonic()
+
+    async def get_photo(
+        self, imdb_id: str, fallback_url: Optional[str] = None
+    ) -> Optional[Union[str, BufferedInputFile]]:
+        """Что передать в answer_photo: file_id, миниатюру или None (постера нет)
+
+        Если сервис постеров недоступен, возвращается исходная ссылка fallback_url.
+        Она же передается сервису, чтобы тот не искал ссылку в деталях OMDB.
+        """
+        file_id = self._file_ids.get(imdb_id)
+        if file_id:
+            self._file_ids.move_to_end(imdb_id)
+            return file_id
+
+        if self.is_missing(imdb_id):
+            return None
+
+        status, content = await self.api_client.get_bytes(
+            f"/api/v1/bot/posters/{imdb_id}",
+            params={"source_url": fallback_url} if fallback_url else None,
+        )
+        if content:
+            return BufferedInputFile(content, filename=f"{imdb_id}.jpg")
+        if status in (400, 404):
+            self._mark_missing(imdb_id)
+            return None
+        return fallback_url
+
+    def remember(self, imdb_id: str, message: Union[types.Message, bool, None]) -> None:
+        """Сохранить file_id отправленного фото, чтобы не загружать его снова"""
+        if not isinstance(message, types.Message) or not message.photo:
+            return
+        self._file_ids[imdb_id] = message.photo[-1].file_id
+        self._file_ids.move_to_end(imdb_id)
+        while len(self._file_ids) > self.max_entries:
+            self._file_ids.popitem(last=False)
+
+    async def prefetch(self, posters: Mapping[Optional[str], Optional[str]]) -> None:
+        """Заранее подготовить постеры списка {imdb_id: poster_url} и запомнить, каких нет
+
+        Ссылки из карточек передаются сервису: без них он запрашивал бы
+        детали OMDB за каждым постером.
+        """
+        ids = [
+            imdb_id
+            for imdb_id in posters
+            if imdb_id and imdb_id not in self._file_ids and not self.is_missing(imdb_id)
+        ]
+        if not ids:
+            return
+
+        response = await self.api_client.post(
+            "/api/v1/bot/posters/check",
+            data={
+                "imdb_ids": ids,
+                "poster_urls": {imdb_id: posters[imdb_id] for imdb_id in ids if posters[imdb_id]},
+            },
+        )
+        if not isinstance(response, dict) or "missing" not in response:
+            return
+        for imdb_id in response["missing"]:
+            self._mark_missing(imdb_id)
+
+    def prefetch_in_background(self, posters: Mapping[Optional[str], Optional[str]]) -> None:
+        """prefetch в фоне: обработчик не ждет проверки постеров"""
+        task = asyncio.create_task(self.prefetch(dict(posters)))
+        self._tasks.add(task)
+        task.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ Не удалось подготовить постеры: {task.exception()}")
+
+
+poster_service = PosterService()
@@ -3,6 +3,8 @@ from typing import Optional
 from aiogram import types
 from aiogram.types import InputMediaPhoto
 
+from app.services.poster_service import poster_service
+
 
 def _safe_delete_message(message: types.Message) -> None:
     try:
@@ -14,22 +16,34 @@ def _safe_delete_message(message: types.Message) -> None:
         pass
 
 
+async def _resolve_poster(imdb_id: Optional[str], poster_url: Optional[str]):
+    """Постер из кэша (file_id или миниатюра), если известен imdbID, иначе исходная ссылка"""
+    if imdb_id:
+        return await poster_service.get_photo(imdb_id, fallback_url=poster_url)
+    return poster_url
+
+
 async def send_content_card(
     message: types.Message,
     text: str,
     keyboard: Optional[types.InlineKeyboardMarkup] = None,
     poster_url: Optional[str] = None,
     parse_mode: str = "HTML",
+    imdb_id: Optional[str] = None,
 ) -> types.Message:
     """Отправить карточку с постером, если он доступен."""
-    if poster_url:
+    photo = await _resolve_poster(imdb_id, poster_url)
+    if photo:
         try:
-            return await message.answer_photo(
-                poster_url,
+            sent = await message.answer_photo(
+                photo,
                 caption=text,
                 reply_markup=keyboard,
                 parse_mode=parse_mode,
             )
+            if imdb_id:
+                poster_service.remember(imdb_id, sent)
+            return sent
         except Exception:
             # Если отправка фото не удалась (битая ссылка или ограничения), падаем на текст
             pass
@@ -43,18 +57,22 @@ async def update_content_card(
     keyboard: Optional[types.InlineKeyboardMarkup] = None,
     poster_url: Optional[str] = None,
     parse_mode: str = "HTML",
+    imdb_id: Optional[str] = None,
 ) -> types.Message:
     """Обновить карточку, при необходимости пересоздав сообщение с постером."""
-    if poster_url:
+    photo = await _resolve_poster(imdb_id, poster_url)
+    if photo:
         # Если текущее сообщение без фото, создаем новое с постером
         if message.content_type != "photo":
             try:
                 sent = await message.answer_photo(
-                    poster_url,
+                    photo,
                     caption=text,
                     reply_markup=keyboard,
                     parse_mode=parse_mode,
                 )
+                if imdb_id:
+                    poster_service.remember(imdb_id, sent)
                 _safe_delete_message(message)
                 return sent
             except Exception:
@@ -63,9 +81,11 @@ async def update_content_card(
         else:
             try:
                 media = InputMediaPhoto(
-                    media=poster_url, caption=text, parse_mode=parse_mode
+                    media=photo, caption=text, parse_mode=parse_mode
                 )
-                await message.edit_media(media, reply_markup=keyboard)
+                edited = await message.edit_media(media, reply_markup=keyboard)
+                if imdb_id:
+                    poster_service.remember(imdb_id, edited)
                 return message
             except Exception:
                 try:
@@ -129,7 +129,9 @@ def get_watchlist_message(results: List[Dict[str, Any]], page: int) -> str:
         f"Запись {safe_page + 1} из {len(results)}"
     )
 
-def get_search_results_message(results: List[Dict[str, Any]], page: int) -> str:
+def get_search_results_message(
+    results: List[Dict[str, Any]], page: int, has_more: bool = False
+) -> str:
     """Шаблон сообщения детализированного результата поиска"""
     if not results:
         return "❌ По вашему запросу ничего не найдено."
@@ -161,7 +163,7 @@ def get_search_results_message(results: List[Dict[str, Any]], page: int) -> str:
         f"🎥 Режиссер: {director}\n"
         f"👥 В ролях: {cast}\n"
         f"📖 Описание: {description}\n\n"
-        f"Результат {index + 1} из {len(results)}"
+        f"Результат {index + 1} из {len(results)}{'+' if has_more else ''}"
     )
 
 def get_analytics_message(analytics: Dict[str, Any]) -> str:
@@ -0,0 +1,327 @@
+# worker/cache.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from normalization import NormalizedQuery, normalize_query
+from shared import SharedBackend
+
+logger = logging.getLogger(__name__)
+
+# Маркер отсутствия значения (None — валидное закэшированное значение)
+MISSING = object()
+
+
+class LRUCache:
+    """Ограниченный in-memory LRU кэш с TTL на каждую запись"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return MISSING
+
+        expires_at, value = item
+        # Просроченные записи не удаляем сразу: их можно отдать как stale,
+        # если OMDB недоступен; место освобождает обычное LRU-вытеснение
+        if expires_at <= time.time():
+            return MISSING
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def peek(self, key: str) -> Optional[Tuple[float, Any]]:
+        """(expires_at, value) без проверки срока и без изменения порядка LRU"""
+        return self._data.get(key)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteStore:
+    """Персистентное хранилище кэша на диске (переживает рестарт воркера)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS omdb_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, key: str, allow_expired: bool = False) -> Tuple[Any, float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM omdb_cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+
+        if row is None or (row[1] <= time.time() and not allow_expired):
+            return MISSING, 0.0
+        return json.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO omdb_cache (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), expires_at),
+            )
+            self._conn.commit()
+
+    def purge_expired(self, grace: float = 0) -> int:
+        """Удалить записи, просроченные больше чем на grace секунд"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM omdb_cache WHERE expires_at <= ?", (time.time() - grace,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class OMDBCache:
+    """Кэш ответов OMDB: LRU в памяти + общее хранилище реплик (если есть) + SQLite на диске
+
+    Списки поиска (s=) и детали по imdbID (i=) хранятся в разных пространствах
+    имен с собственными TTL.
+    """
+
+    SEARCH = "search"
+    DETAILS = "details"
+
+    def __init__(
+        self,
+        memory_size: int = 1000,
+        path: Optional[str] = None,
+        search_ttl: float = 6 * 3600,
+        details_ttl: float = 7 * 24 * 3600,
+        negative_size: int = 5000,
+        negative_ttl: float = 600,
+        stale_ttl: float = 7 * 24 * 3600,
+        shared: Optional[SharedBackend] = None,
+    ):
+        self.memory = LRUCache(memory_size)
+        # Промахи OMDB ("Movie not found!") храним отдельно и недолго, без записи на диск
+        self.negative = LRUCache(negative_size)
+        self.negative_ttl = negative_ttl
+        self.negative_counters = {"hits": 0, "stored": 0}
+        self.store: Optional[SQLiteStore] = None
+        # Общий для реплик уровень: ответ, полученный одной репликой, видят все
+        self.shared = shared
+        self.ttls = {self.SEARCH: search_ttl, self.DETAILS: details_ttl}
+        # Сколько просроченные записи еще можно отдавать, когда OMDB недоступен
+        self.stale_ttl = stale_ttl
+        self.counters: Dict[str, Dict[str, int]] = {
+            namespace: {
+                "memory_hits": 0, "shared_hits": 0, "disk_hits": 0, "misses": 0, "stale_hits": 0
+            }
+            for namespace in self.ttls
+        }
+
+        if path:
+            try:
+                self.store = SQLiteStore(path)
+                purged = self.store.purge_expired(grace=stale_ttl)
+                logger.info(f"💾 OMDB disk cache: {path} (удалено устаревших: {purged})")
+            except Exception as e:
+                logger.error(f"💥 Не удалось открыть дисковый кэш {path}: {e}")
+                self.store = None
+
+    @classmethod
+    def from_env(cls, shared: Optional[SharedBackend] = None) -> "OMDBCache":
+        return cls(
+            memory_size=int(os.getenv("OMDB_CACHE_MEMORY_SIZE", "1000")),
+            path=os.getenv("OMDB_CACHE_PATH", "data/omdb_cache.sqlite3") or None,
+            search_ttl=float(os.getenv("OMDB_CACHE_SEARCH_TTL", str(6 * 3600))),
+            details_ttl=float(os.getenv("OMDB_CACHE_DETAILS_TTL", str(7 * 24 * 3600))),
+            negative_size=int(os.getenv("OMDB_NEGATIVE_CACHE_SIZE", "5000")),
+            negative_ttl=float(os.getenv("OMDB_NEGATIVE_CACHE_TTL", "600")),
+            stale_ttl=float(os.getenv("OMDB_CACHE_STALE_TTL", str(7 * 24 * 3600))),
+            shared=shared,
+        )
+
+    @staticmethod
+    def search_key(title: str, content_type: Optional[str] = None) -> str:
+        return OMDBCache.query_key(normalize_query(title), content_type)
+
+    @staticmethod
+    def query_key(query: NormalizedQuery, content_type: Optional[str] = None) -> str:
+        return f"{query.key}|{content_type or ''}"
+
+    async def _get_shared(self, namespace: str, key: str) -> Tuple[Any, float]:
+        """(значение, expires_at) из общего хранилища, в том числе просроченное"""
+        if self.shared is None:
+            return MISSING, 0.0
+        entry = await self.shared.get_json(f"{namespace}:{key}")
+        if entry is None:
+            return MISSING, 0.0
+        return entry["value"], entry["expires_at"]
+
+    async def get(self, namespace: str, key: str) -> Any:
+        """Вернуть значение из памяти, общего хранилища или с диска, либо MISSING"""
+        memory_key = f"{namespace}:{key}"
+        value = self.memory.get(memory_key)
+        if value is not MISSING:
+            self.counters[namespace]["memory_hits"] += 1
+            return value
+
+        value, expires_at = await self._get_shared(namespace, key)
+        if value is not MISSING and expires_at > time.time():
+            self.memory.set(memory_key, value, expires_at)
+            self.counters[namespace]["shared_hits"] += 1
+            return value
+
+        if self.store is not None:
+            try:
+                value, expires_at = await asyncio.to_thread(self.store.get, namespace, key)
+            except Exception as e:
+                logger.error(f"💥 Ошибка чтения дискового кэша: {e}")
+                value = MISSING
+
+            if value is not MISSING:
+                # Поднимаем запись в память, сохраняя исходный срок жизни
+                self.memory.set(memory_key, value, expires_at)
+                self.counters[namespace]["disk_hits"] += 1
+                return value
+
+        self.counters[namespace]["misses"] += 1
+        return MISSING
+
+    async def get_stale(self, namespace: str, key: str) -> Any:
+        """Вернуть значение, даже просроченное (не старше stale_ttl), либо MISSING"""
+        oldest_allowed = time.time() - self.stale_ttl
+
+        item = self.memory.peek(f"{namespace}:{key}")
+        if item is not None and item[0] > oldest_allowed:
+            self.counters[namespace]["stale_hits"] += 1
+            return item[1]
+
+        value, expires_at = await self._get_shared(namespace, key)
+        if value is not MISSING and expires_at > oldest_allowed:
+            self.counters[namespace]["stale_hits"] += 1
+            return value
+
+        if self.store is not None:
+            try:
+                value, expires_at = await asyncio.to_thread(
+                    self.store.get, namespace, key, True
+                )
+            except Exception as e:
+                logger.error(f"💥 Ошибка чтения дискового кэша: {e}")
+                value, expires_at = MISSING, 0.0
+
+            if value is not MISSING and expires_at > oldest_allowed:
+                self.counters[namespace]["stale_hits"] += 1
+                return value
+
+        return MISSING
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttls[namespace]
+        self.memory.set(f"{namespace}:{key}", value, expires_at)
+
+        if self.shared is not None:
+            # Храним дольше TTL, чтобы реплики могли отдать запись как stale
+            await self.shared.set_json(
+                f"{namespace}:{key}",
+                {"value": value, "expires_at": expires_at},
+                self.ttls[namespace] + self.stale_ttl,
+            )
+
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.set, namespace, key, value, expires_at)
+            except Exception as e:
+                logger.error(f"💥 Ошибка записи дискового кэша: {e}")
+
+    async def get_negative(self, namespace: str, key: str, count: bool = True) -> Optional[str]:
+        """Вернуть сохраненную ошибку OMDB, если запрос недавно не дал результатов"""
+        negative_key = f"{namespace}:{key}"
+        error = self.negative.get(negative_key)
+        if error is MISSING and self.shared is not None:
+            entry = await self.shared.get_json(f"negative:{negative_key}")
+            if entry is not None:
+                error = entry["error"]
+                self.negative.set(negative_key, error, entry["expires_at"])
+        if error is MISSING:
+            return None
+
+        if count:
+            self.negative_counters["hits"] += 1
+        return error
+
+    async def set_negative(self, namespace: str, key: str, error: Optional[str]) -> None:
+        error = error or "Not found"
+        expires_at = time.time() + self.negative_ttl
+        self.negative.set(f"{namespace}:{key}", error, expires_at)
+        self.negative_counters["stored"] += 1
+
+        if self.shared is not None:
+            await self.shared.set_json(
+                f"negative:{namespace}:{key}",
+                {"error": error, "expires_at": expires_at},
+                self.negative_ttl,
+            )
+
+    async def delete_negative(self, namespace: str, key: str) -> None:
+        """Забыть промах: запрос все-таки дал результат (например, транслитом)"""
+        self.negative.delete(f"{namespace}:{key}")
+        if self.shared is not None:
+            await self.shared.delete(f"negative:{namespace}:{key}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **{namespace: dict(counters) for namespace, counters in self.counters.items()},
+            "memory_entries": len(self.memory),
+            "memory_evictions": self.memory.evictions,
+            "negative": {
+                **self.negative_counters,
+                "entries": len(self.negative),
+                "evictions": self.negative.evictions,
+            },
+            "disk_enabled": self.store is not None,
+            "shared_enabled": self.shared is not None,
+        }
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
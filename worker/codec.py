@@ -0,0 +1,82 @@
+# worker/codec.py
+from typing import Any, Dict, List, Optional
+
+import msgspec
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OMDBSearchItem(msgspec.Struct):
+    """Строка списка OMDB (s=)"""
+
+    Title: Optional[str] = None
+    Year: Optional[str] = None
+    imdbID: Optional[str] = None
+    Type: Optional[str] = None
+    Poster: Optional[str] = None
+
+
+class OMDBSearchPayload(msgspec.Struct):
+    """Ответ OMDB на поиск списком; лишние поля пропускаются без разбора"""
+
+    Response: str = "False"
+    Search: List[OMDBSearchItem] = []
+    totalResults: Optional[str] = None
+    Error: Optional[str] = None
+
+
+class OMDBDetailsPayload(msgspec.Struct):
+    """Ответ OMDB по imdbID: только поля, которые попадают в карточку"""
+
+    Response: str = "False"
+    Title: Optional[str] = None
+    Year: Optional[str] = None
+    Plot: Optional[str] = None
+    Type: Optional[str] = None
+    imdbRating: Optional[str] = None
+    imdbID: Optional[str] = None
+    Poster: Optional[str] = None
+    Genre: Optional[str] = None
+    Director: Optional[str] = None
+    Actors: Optional[str] = None
+    totalSeasons: Optional[str] = None
+    Error: Optional[str] = None
+
+
+# Держать в согласии с api/app/serialization.py (API и воркер собираются из разных каталогов)
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+_search_decoder = msgspec.json.Decoder(OMDBSearchPayload)
+_details_decoder = msgspec.json.Decoder(OMDBDetailsPayload)
+
+DecodeError = (msgspec.DecodeError, msgspec.ValidationError)
+
+
+def decode_search(raw: bytes) -> OMDBSearchPayload:
+    return _search_decoder.decode(raw)
+
+
+def decode_details(raw: bytes) -> OMDBDetailsPayload:
+    return _details_decoder.decode(raw)
+
+
+def search_items(payload: OMDBSearchPayload) -> List[Dict[str, Any]]:
+    """Строки списка в виде словарей — в таком виде они лежат в кэше"""
+    return msgspec.to_builtins(payload.Search)
+
+
+def details_fields(payload: OMDBDetailsPayload) -> Dict[str, Any]:
+    """Поля деталей словарем в формате OMDB — вход для OMDBService._parse_response"""
+    return msgspec.structs.asdict(payload)
+
+
+def ndjson_line(event: Dict[str, Any]) -> bytes:
+    """Строка NDJSON-потока (UTF-8 без экранирования кириллицы)"""
+    return orjson.dumps(event, option=OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse, сериализуемый orjson (ответы воркера по умолчанию)"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=OPTIONS)
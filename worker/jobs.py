@@ -0,0 +1,275 @@
+# worker/jobs.py
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Чем меньше число, тем раньше задача берется в работу
+PRIORITIES = {
+    "interactive": 0,
+    "bulk": 10,
+    "enrichment": 20,
+    "refresh": 30,
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: str
+    callback_url: Optional[str] = None
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    finished: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobQueue:
+    """Асинхронные задачи воркера: приоритетная очередь и фиксированный пул исполнителей
+
+    Все задачи попадают в общую приоритетную очередь. Интерактивные задачи
+    дополнительно кладутся в отдельную очередь, которую читают только
+    зарезервированные исполнители, поэтому даже при полностью занятом пуле
+    (массовый импорт, обогащение) поиск из бота не ждет. Задачу выполняет
+    тот исполнитель, который взял ее первым.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        workers: int = 4,
+        reserved_interactive: int = 1,
+        result_ttl: float = 600,
+        max_jobs: int = 10000,
+        callback_allowlist: Optional[List[str]] = None,
+    ):
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.reserved_interactive = max(0, reserved_interactive)
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        # Callback отправляется только на эти адреса (схема, хост, порт), чтобы
+        # воркер нельзя было заставить слать POST на произвольный URL
+        self.callback_origins = {
+            origin for origin in (self._origin(url) for url in callback_allowlist or []) if origin
+        }
+
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._interactive_queue: Optional[asyncio.Queue] = None
+        self._seq = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        self.counters = {"submitted": 0, "done": 0, "failed": 0, "callbacks_failed": 0}
+
+    @classmethod
+    def from_env(cls, handlers: Dict[str, JobHandler]) -> "JobQueue":
+        return cls(
+            handlers=handlers,
+            workers=int(os.getenv("JOB_WORKERS", "4")),
+            reserved_interactive=int(os.getenv("JOB_RESERVED_INTERACTIVE", "1")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL", "600")),
+            max_jobs=int(os.getenv("JOB_MAX_JOBS", "10000")),
+            callback_allowlist=[
+                url.strip()
+                for url in os.getenv(
+                    "JOB_CALLBACK_ALLOWLIST", os.getenv("API_URL", "http://api:8000")
+                ).split(",")
+                if url.strip()
+            ],
+        )
+
+    @staticmethod
+    def _origin(url: str) -> Optional[Tuple[str, str, int]]:
+        try:
+            parts = urlsplit(url)
+            port = parts.port or {"http": 80, "https": 443}.get(parts.scheme)
+        except ValueError:
+            return None
+        if parts.scheme not in {"http", "https"} or not parts.hostname or parts.username:
+            return None
+        return parts.scheme, parts.hostname.lower(), port
+
+    def callback_allowed(self, url: str) -> bool:
+        origin = self._origin(url)
+        return origin is not None and origin in self.callback_origins
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._interactive_queue = asyncio.Queue()
+        self._client = httpx.AsyncClient(timeout=10.0)
+        self._tasks = [
+            asyncio.create_task(self._consume(self._queue, priority_queue=True))
+            for _ in range(self.workers)
+        ] + [
+            asyncio.create_task(self._consume(self._interactive_queue, priority_queue=False))
+            for _ in range(self.reserved_interactive)
+        ]
+        logger.info(
+            f"📬 Job queue started: {self.workers} workers + {self.reserved_interactive} interactive"
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: str = "interactive",
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        if callback_url and not self.callback_allowed(callback_url):
+            raise ValueError(f"Callback URL is not allowed: {callback_url}")
+        if self._queue is None:
+            raise RuntimeError("Job queue is not started")
+
+        self._cleanup()
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            payload=payload,
+            priority=priority,
+            callback_url=callback_url,
+        )
+        self.jobs[job.id] = job
+        self.counters["submitted"] += 1
+
+        self._queue.put_nowait((PRIORITIES[priority], next(self._seq), job.id))
+        if priority == "interactive" and self.reserved_interactive:
+            self._interactive_queue.put_nowait(job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Long-poll: дождаться завершения задачи, но не дольше timeout"""
+        job = self.jobs.get(job_id)
+        if job is None or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(job.finished.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _consume(self, queue: asyncio.Queue, priority_queue: bool) -> None:
+        while True:
+            item = await queue.get()
+            job_id = item[2] if priority_queue else item
+            job = self.jobs.get(job_id)
+            # Задачу уже взял другой исполнитель (или она удалена)
+            if job is None or job.status != QUEUED:
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await self.handlers[job.kind](job.payload)
+            job.status = DONE
+            self.counters["done"] += 1
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"💥 Job {job.id} ({job.kind}) failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+            self.counters["failed"] += 1
+        finally:
+            job.finished_at = time.time()
+            job.finished.set()
+
+        if job.callback_url:
+            await self._notify(job)
+
+    async def _notify(self, job: Job) -> None:
+        try:
+            response = await self._client.post(job.callback_url, json=job.to_dict())
+            if response.status_code >= 400:
+                raise RuntimeError(f"status {response.status_code}")
+        except Exception as e:
+            self.counters["callbacks_failed"] += 1
+            logger.warning(f"⚠️ Callback для задачи {job.id} не доставлен: {e}")
+
+    def _cleanup(self) -> None:
+        """Удалить завершенные задачи старше result_ttl и ограничить общее число"""
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+        if len(self.jobs) >= self.max_jobs:
+            finished = sorted(
+                (job for job in self.jobs.values() if job.finished_at is not None),
+                key=lambda job: job.finished_at,
+            )
+            for job in finished[: len(self.jobs) - self.max_jobs + 1]:
+                del self.jobs[job.id]
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self.jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            **self.counters,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "jobs": by_status,
+            "workers": self.workers,
+            "reserved_interactive": self.reserved_interactive,
+        }
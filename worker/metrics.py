@@ -0,0 +1,167 @@
+# worker/metrics.py
+from typing import Any, Iterator, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Отдельный реестр: в /metrics только метрики воркера, без дублей при перезагрузке модуля
+REGISTRY = CollectorRegistry()
+
+# call: search — списки (s=), details — детали по imdbID (i=)
+UPSTREAM_LATENCY = Histogram(
+    "omdb_upstream_request_seconds",
+    "Latency of HTTP requests to OMDb",
+    ["call"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 15.0),
+    registry=REGISTRY,
+)
+UPSTREAM_RESPONSES = Counter(
+    "omdb_upstream_responses_total",
+    "HTTP responses from OMDb by status code",
+    ["call", "status"],
+    registry=REGISTRY,
+)
+UPSTREAM_ERRORS = Counter(
+    "omdb_upstream_errors_total",
+    "Failed OMDb calls: transport errors and OMDb error payloads",
+    ["call", "reason"],
+    registry=REGISTRY,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "omdb_upstream_in_flight",
+    "HTTP requests to OMDb currently in flight",
+    ["call"],
+    registry=REGISTRY,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "worker_http_requests_in_flight",
+    "Requests to the worker currently being served",
+    registry=REGISTRY,
+)
+
+# Тексты ошибок OMDB → короткие метки (ограничиваем кардинальность)
+_OMDB_ERRORS = {
+    "movie not found!": "not_found",
+    "series not found!": "not_found",
+    "incorrect imdb id.": "not_found",
+    "error getting data.": "not_found",
+    "too many results.": "too_many_results",
+    "request limit reached!": "limit_reached",
+    "invalid api key!": "invalid_key",
+    "no api key provided.": "invalid_key",
+}
+
+
+def call_type(params: dict) -> str:
+    return "search" if "s" in params else "details"
+
+
+def record_omdb_error(call: str, error: Optional[str]) -> None:
+    """Учесть ответ OMDB с Response=False"""
+    reason = _OMDB_ERRORS.get((error or "").strip().lower(), "other")
+    UPSTREAM_ERRORS.labels(call, reason).inc()
+
+
+class WorkerCollector:
+    """Снимает счетчики, которые компоненты воркера уже ведут сами (кэш, квота, ...)
+
+    Значения читаются в момент запроса /metrics, поэтому их не нужно дублировать
+    в отдельных Counter и держать синхронными.
+    """
+
+    def __init__(self, omdb_service: Any, job_queue: Any = None):
+        self.omdb_service = omdb_service
+        self.job_queue = job_queue
+
+    def collect(self) -> Iterator[Any]:
+        service = self.omdb_service
+        cache = service.cache.stats()
+
+        hits = CounterMetricFamily(
+            "omdb_cache_hits", "OMDb cache hits by namespace and tier", labels=["namespace", "tier"]
+        )
+        misses = CounterMetricFamily(
+            "omdb_cache_misses", "OMDb cache misses by namespace", labels=["namespace"]
+        )
+        for namespace in (service.cache.SEARCH, service.cache.DETAILS):
+            counters = cache[namespace]
+            for tier in ("memory", "shared", "disk", "stale"):
+                hits.add_metric([namespace, tier], counters[f"{tier}_hits"])
+            misses.add_metric([namespace], counters["misses"])
+        hits.add_metric(["negative", "memory"], cache["negative"]["hits"])
+        yield hits
+        yield misses
+
+        evictions = CounterMetricFamily(
+            "omdb_cache_evictions", "LRU evictions from in-memory caches", labels=["cache"]
+        )
+        evictions.add_metric(["memory"], cache["memory_evictions"])
+        evictions.add_metric(["negative"], cache["negative"]["evictions"])
+        yield evictions
+
+        entries = GaugeMetricFamily(
+            "omdb_cache_entries", "Entries in in-memory caches", labels=["cache"]
+        )
+        entries.add_metric(["memory"], cache["memory_entries"])
+        entries.add_metric(["negative"], cache["negative"]["entries"])
+        yield entries
+
+        singleflight = service.singleflight.stats()
+        yield CounterMetricFamily(
+            "omdb_singleflight_calls", "Calls that actually executed", value=singleflight["calls"]
+        )
+        yield CounterMetricFamily(
+            "omdb_singleflight_coalesced",
+            "Requests that joined an identical in-flight call",
+            value=singleflight["coalesced"],
+        )
+        yield CounterMetricFamily(
+            "omdb_singleflight_remote_waits",
+            "Calls that waited for another worker replica",
+            value=singleflight["remote_waits"],
+        )
+        yield GaugeMetricFamily(
+            "omdb_singleflight_in_flight", "Distinct calls in flight", value=singleflight["in_flight"]
+        )
+
+        quota = service.quota.stats()
+        yield GaugeMetricFamily(
+            "omdb_quota_remaining", "Remaining OMDb daily budget", value=quota["remaining"]
+        )
+        yield GaugeMetricFamily(
+            "omdb_quota_used_today", "OMDb requests spent today (UTC)", value=quota["used_today"]
+        )
+        yield GaugeMetricFamily(
+            "omdb_quota_daily_limit", "OMDb daily request limit", value=quota["daily_limit"]
+        )
+        yield CounterMetricFamily(
+            "omdb_quota_rejected", "Requests rejected by the rate limiter or budget", value=quota["rejected"]
+        )
+        mode = GaugeMetricFamily("omdb_quota_mode", "Current quota mode (1 = active)", labels=["mode"])
+        for name in ("normal", "low", "cache_only"):
+            mode.add_metric([name], 1 if quota["mode"] == name else 0)
+        yield mode
+
+        breaker = service.breaker.stats()
+        state = GaugeMetricFamily(
+            "omdb_breaker_state", "Circuit breaker state (1 = active)", labels=["state"]
+        )
+        for name in (service.breaker.CLOSED, service.breaker.OPEN, service.breaker.HALF_OPEN):
+            state.add_metric([name], 1 if breaker["state"] == name else 0)
+        yield state
+        yield CounterMetricFamily(
+            "omdb_breaker_rejected", "Calls rejected by the open circuit breaker", value=breaker["rejected"]
+        )
+        yield CounterMetricFamily(
+            "omdb_hedged_requests", "Hedged duplicate requests sent to OMDb", value=service.hedged_requests
+        )
+
+        if self.job_queue is not None:
+            jobs = self.job_queue.stats()
+            yield GaugeMetricFamily("worker_jobs_queued", "Jobs waiting in the queue", value=jobs["queued"])
+            processed = CounterMetricFamily(
+                "worker_jobs_processed", "Jobs by outcome", labels=["outcome"]
+            )
+            processed.add_metric(["done"], jobs["done"])
+            processed.add_metric(["failed"], jobs["failed"])
+            yield processed
@@ -0,0 +1,92 @@
+# worker/normalization.py
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+# ГОСТ-подобная транслитерация: OMDB знает в основном латинские названия
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    "і": "i", "ї": "yi", "є": "ye", "ґ": "g",
+}
+
+# Извлекать ли год из запроса ("Dune 2021" → s=Dune, y=2021)
+EXTRACT_YEAR = os.getenv("OMDB_EXTRACT_YEAR", "true").lower() in {"1", "true", "yes"}
+
+# "Dune 2021", "Dune (2021)", "Dune [2021]" — год в конце запроса
+_YEAR_RE = re.compile(r"^(?P<title>.+?)[\s,]*[\(\[]?(?P<year>(?:18[89]|19\d|20\d)\d)[\)\]]?$")
+_APOSTROPHES_RE = re.compile(r"['’`ʼ]")
+_NON_WORD_RE = re.compile(r"[\W_]+", re.UNICODE)
+_CYRILLIC_RE = re.compile(r"[а-яёіїєґ]", re.IGNORECASE)
+_EDGE_PUNCTUATION = " \t\n\"'«»“”„‚‘’!?¡¿.,;:…-–—()[]{}*#"
+
+
+@dataclass(frozen=True)
+class NormalizedQuery:
+    """Результат нормализации поискового запроса
+
+    title — очищенное название для запроса в OMDB (s=),
+    year — год, извлеченный из запроса (y=),
+    key — канонический ключ для кэша и объединения запросов.
+    """
+
+    title: str
+    year: Optional[int]
+    key: str
+
+    @property
+    def has_cyrillic(self) -> bool:
+        return bool(_CYRILLIC_RE.search(self.title))
+
+    def transliterated(self) -> "NormalizedQuery":
+        """Тот же запрос латиницей: "Интерстеллар" → "interstellar" """
+        title = transliterate(self.title)
+        key = canonical(title) or title
+        if self.year:
+            key = f"{key}|y{self.year}"
+        return NormalizedQuery(title=title, year=self.year, key=key)
+
+
+def canonical(text: str) -> str:
+    """Каноническая форма: NFKC, casefold, без пунктуации, одиночные пробелы"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _APOSTROPHES_RE.sub("", text)
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+def transliterate(text: str) -> str:
+    """Кириллица → латиница, остальные символы без изменений"""
+    return "".join(CYRILLIC_TO_LATIN.get(char, char) for char in text.casefold())
+
+
+def normalize_query(raw: str, extract_year: Optional[bool] = None) -> NormalizedQuery:
+    """Нормализовать запрос пользователя: "  INTERSTELLAR! " и "interstellar" дают один ключ"""
+    title = " ".join(unicodedata.normalize("NFKC", raw).split())
+    if extract_year is None:
+        extract_year = EXTRACT_YEAR
+
+    year = None
+    if extract_year:
+        match = _YEAR_RE.match(title)
+        # Запрос из одного года ("1917", "2012") — это название, а не фильтр;
+        # "далекий" год ("Blade Runner 2049") — тоже часть названия
+        if (
+            match
+            and canonical(match.group("title"))
+            and int(match.group("year")) <= date.today().year + 3
+        ):
+            title = match.group("title")
+            year = int(match.group("year"))
+
+    title = title.strip(_EDGE_PUNCTUATION) or title.strip()
+    key = canonical(title) or title.casefold()
+    if year:
+        key = f"{key}|y{year}"
+
+    return NormalizedQuery(title=title, year=year, key=key)
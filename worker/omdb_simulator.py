@@ -0,0 +1,154 @@
+# worker/omdb_simulator.py
+"""Локальный заменитель OMDB API для нагрузочного и регрессионного тестирования
+
+Режимы (SIM_MODE):
+- replay (по умолчанию): отвечает на s= и i= из записанных фикстур;
+- record: проксирует запросы в настоящий OMDB (SIM_UPSTREAM_URL) и сохраняет
+  ответы в фикстуры.
+
+Помехи настраиваются переменными окружения или на лету через POST /_sim/config:
+SIM_LATENCY_MS, SIM_LATENCY_JITTER_MS, SIM_ERROR_RATE, SIM_RATE_LIMIT_RATE.
+
+Запуск: OMDB_API_URL=http://localhost:8002/ у воркера и
+    python omdb_simulator.py
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = os.getenv(
+    "SIM_FIXTURES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+)
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+LIMIT_REACHED = {"Response": "False", "Error": "Request limit reached!"}
+
+
+class SimulatorConfig(BaseModel):
+    mode: str = os.getenv("SIM_MODE", "replay")
+    upstream_url: str = os.getenv("SIM_UPSTREAM_URL", "http://www.omdbapi.com/")
+    latency_ms: float = float(os.getenv("SIM_LATENCY_MS", "0"))
+    latency_jitter_ms: float = float(os.getenv("SIM_LATENCY_JITTER_MS", "0"))
+    error_rate: float = float(os.getenv("SIM_ERROR_RATE", "0"))
+    rate_limit_rate: float = float(os.getenv("SIM_RATE_LIMIT_RATE", "0"))
+
+
+app = FastAPI(title="OMDB Simulator")
+config = SimulatorConfig()
+counters: Dict[str, int] = {"requests": 0, "hits": 0, "misses": 0, "errors": 0, "rate_limited": 0, "recorded": 0}
+
+
+def fixture_path(params: Dict[str, str]) -> Optional[str]:
+    """Путь к фикстуре для запроса (apikey и прочие служебные параметры не учитываются)"""
+    if params.get("i"):
+        return os.path.join(FIXTURES_DIR, "details", f"{params['i'].strip()}.json")
+
+    if params.get("s"):
+        key = "|".join(
+            [
+                " ".join(params["s"].split()).casefold(),
+                params.get("type", ""),
+                params.get("y", ""),
+                params.get("page", "1"),
+            ]
+        )
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(FIXTURES_DIR, "search", f"{digest}.json")
+
+    return None
+
+
+def load_fixture(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["response"]
+
+
+def save_fixture(path: str, params: Dict[str, str], response: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    query = {key: value for key, value in params.items() if key != "apikey"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"query": query, "response": response}, f, ensure_ascii=False, indent=2)
+
+
+async def record(params: Dict[str, str], path: Optional[str]) -> JSONResponse:
+    upstream_params = dict(params)
+    upstream_params["apikey"] = os.getenv("OMDB_API_KEY") or params.get("apikey", "")
+
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.get(config.upstream_url, params=upstream_params)
+
+    data = response.json()
+    # Ошибки лимита и авторизации не записываем, чтобы не испортить фикстуры
+    if response.status_code == 200 and path:
+        save_fixture(path, params, data)
+        counters["recorded"] += 1
+
+    return JSONResponse(data, status_code=response.status_code)
+
+
+@app.get("/")
+async def omdb(request: Request):
+    """Эмуляция GET http://www.omdbapi.com/?s=...|i=..."""
+    params = dict(request.query_params)
+    counters["requests"] += 1
+
+    delay = config.latency_ms + random.uniform(0, config.latency_jitter_ms)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+    if random.random() < config.rate_limit_rate:
+        counters["rate_limited"] += 1
+        return JSONResponse(LIMIT_REACHED, status_code=401)
+
+    if random.random() < config.error_rate:
+        counters["errors"] += 1
+        return JSONResponse({"Response": "False", "Error": "Simulated upstream error"}, status_code=503)
+
+    path = fixture_path(params)
+    if config.mode == "record":
+        return await record(params, path)
+
+    data = load_fixture(path) if path else None
+    if data is None:
+        counters["misses"] += 1
+        return JSONResponse(NOT_FOUND)
+
+    counters["hits"] += 1
+    return JSONResponse(data)
+
+
+@app.get("/_sim/config")
+async def get_config():
+    return {"config": config.model_dump(), "counters": counters, "fixtures_dir": FIXTURES_DIR}
+
+
+@app.post("/_sim/config")
+async def update_config(update: Dict[str, Any]):
+    """Изменить параметры помех без перезапуска (например, посреди нагрузочного прогона)"""
+    global config
+    config = config.model_copy(update={k: v for k, v in update.items() if k in SimulatorConfig.model_fields})
+    return {"config": config.model_dump()}
+
+
+@app.post("/_sim/reset")
+async def reset_counters():
+    for key in counters:
+        counters[key] = 0
+    return {"counters": counters}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("SIM_PORT", "8002")))
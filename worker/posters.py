@@ -0,0 +1,233 @@
+# worker/posters.py
+import asyncio
+import io
+import logging
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from PIL import Image, UnidentifiedImageError
+
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_IMDB_ID_RE = re.compile(r"^tt\d{5,10}$")
+# Откуда OMDB отдает постеры: ссылки из строк списка принимаем только с этих хостов
+DEFAULT_SOURCE_HOSTS = ("m.media-amazon.com", "images-na.ssl-images-amazon.com", "ia.media-imdb.com")
+
+
+class PosterStore:
+    """Постеры OMDB, скачанные один раз и сохраненные миниатюрой на диске
+
+    Файл {imdb_id}.jpg — проверенная и уменьшенная копия постера. Если постера
+    нет или он битый, рядом создается метка {imdb_id}.missing, и повторная
+    попытка делается не раньше чем через missing_ttl.
+
+    Ссылку на постер вызывающий обычно уже знает (Poster из строки списка
+    OMDB) и передает ее как source_url; resolve_url (запрос деталей i=)
+    нужен, только когда ссылки нет.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        resolve_url: Callable[[str], Awaitable[Optional[str]]],
+        thumb_width: int = 300,
+        max_bytes: int = 5 * 1024 * 1024,
+        missing_ttl: float = 24 * 3600,
+        concurrency: int = 4,
+        timeout: float = 10.0,
+        source_hosts: Iterable[str] = DEFAULT_SOURCE_HOSTS,
+    ):
+        self.directory = directory
+        # imdb_id → URL постера из деталей OMDB: "" — постера нет, None — детали недоступны
+        self.resolve_url = resolve_url
+        self.thumb_width = thumb_width
+        self.max_bytes = max_bytes
+        self.missing_ttl = missing_ttl
+        self.timeout = timeout
+        self.source_hosts = frozenset(host.strip().lower() for host in source_hosts if host.strip())
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._singleflight = SingleFlight()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.counters = {"hits": 0, "downloaded": 0, "missing": 0, "invalid": 0, "resolved": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, resolve_url: Callable[[str], Awaitable[Optional[str]]]) -> "PosterStore":
+        return cls(
+            directory=os.getenv("POSTER_DIR", "data/posters"),
+            resolve_url=resolve_url,
+            thumb_width=int(os.getenv("POSTER_THUMB_WIDTH", "300")),
+            max_bytes=int(os.getenv("POSTER_MAX_BYTES", str(5 * 1024 * 1024))),
+            missing_ttl=float(os.getenv("POSTER_MISSING_TTL", str(24 * 3600))),
+            concurrency=int(os.getenv("POSTER_CONCURRENCY", "4")),
+            timeout=float(os.getenv("POSTER_TIMEOUT", "10")),
+            source_hosts=os.getenv("POSTER_SOURCE_HOSTS", ",".join(DEFAULT_SOURCE_HOSTS)).split(","),
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def is_valid_id(imdb_id: str) -> bool:
+        return bool(_IMDB_ID_RE.match(imdb_id))
+
+    def source_allowed(self, url: Optional[str]) -> bool:
+        """Можно ли качать постер по ссылке от клиента (http(s) и хост OMDB)"""
+        if not url:
+            return False
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return False
+        return parts.scheme in ("http", "https") and (parts.hostname or "") in self.source_hosts
+
+    def path(self, imdb_id: str) -> str:
+        return os.path.join(self.directory, f"{imdb_id}.jpg")
+
+    def _missing_path(self, imdb_id: str) -> str:
+        return os.path.join(self.directory, f"{imdb_id}.missing")
+
+    @staticmethod
+    def etag(path: str) -> str:
+        stat = os.stat(path)
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def _recently_missing(self, imdb_id: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self._missing_path(imdb_id)) < self.missing_ttl
+        except OSError:
+            return False
+
+    async def get(self, imdb_id: str, source_url: Optional[str] = None) -> Optional[str]:
+        """Путь к миниатюре постера (скачивается при первом обращении) или None"""
+        if not self.is_valid_id(imdb_id):
+            return None
+
+        path = self.path(imdb_id)
+        if os.path.exists(path):
+            self.counters["hits"] += 1
+            return path
+
+        if self._recently_missing(imdb_id):
+            return None
+
+        if not self.source_allowed(source_url):
+            source_url = None
+        return await self._singleflight.do(imdb_id, lambda: self._load(imdb_id, source_url))
+
+    async def check(
+        self, imdb_ids: List[str], source_urls: Optional[Dict[str, str]] = None
+    ) -> Dict[str, List[str]]:
+        """Подготовить постеры заранее: какие есть, а каких нет
+
+        source_urls — известные вызывающему ссылки {imdb_id: poster_url}.
+        """
+        source_urls = source_urls or {}
+        unique = list(dict.fromkeys([*imdb_ids, *source_urls]))
+        paths = await asyncio.gather(
+            *(self.get(imdb_id, source_urls.get(imdb_id)) for imdb_id in unique)
+        )
+        return {
+            "available": [imdb_id for imdb_id, path in zip(unique, paths) if path],
+            "missing": [imdb_id for imdb_id, path in zip(unique, paths) if not path],
+        }
+
+    async def _load(self, imdb_id: str, source_url: Optional[str]) -> Optional[str]:
+        async with self._semaphore:
+            url = source_url
+            if not url:
+                self.counters["resolved"] += 1
+                url = await self.resolve_url(imdb_id)
+            if url is None:
+                return None
+            if not url:
+                self._mark_missing(imdb_id)
+                return None
+
+            try:
+                data = await self._download(url)
+            except httpx.HTTPError as e:
+                # Сетевой сбой — не повод считать постер отсутствующим
+                logger.warning(f"🖼 Не удалось скачать постер {url}: {e!r}")
+                return None
+            if data is None:
+                self._mark_missing(imdb_id)
+                return None
+
+            try:
+                thumbnail = await asyncio.to_thread(self._make_thumbnail, data)
+            except (UnidentifiedImageError, OSError, ValueError) as e:
+                logger.warning(f"🖼 Битый постер {imdb_id}: {e}")
+                self.counters["invalid"] += 1
+                self._mark_missing(imdb_id)
+                return None
+
+            path = self.path(imdb_id)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(thumbnail)
+            os.replace(tmp_path, path)
+            try:
+                os.remove(self._missing_path(imdb_id))
+            except OSError:
+                pass
+
+            self.counters["downloaded"] += 1
+            logger.info(f"🖼 Постер сохранен: {imdb_id}")
+            return path
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        """Байты изображения или None, если по ссылке не картинка (httpx.HTTPError — сбой сети)"""
+        if self._client is None:
+            await self.start()
+        async with self._client.stream("GET", url) as response:
+            content_type = response.headers.get("content-type", "")
+            if response.status_code != 200 or not content_type.startswith("image/"):
+                logger.warning(f"🖼 Постер недоступен ({response.status_code}, {content_type}): {url}")
+                return None
+
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_bytes:
+                    logger.warning(f"🖼 Постер больше {self.max_bytes} байт: {url}")
+                    return None
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+    def _make_thumbnail(self, data: bytes) -> bytes:
+        """Проверить изображение и уменьшить до thumb_width по ширине (JPEG)"""
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+
+        # После verify() изображение нужно открыть заново
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            if image.width > self.thumb_width:
+                height = round(image.height * self.thumb_width / image.width)
+                image = image.resize((self.thumb_width, height), Image.LANCZOS)
+
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=85, optimize=True)
+            return output.getvalue()
+
+    def _mark_missing(self, imdb_id: str) -> None:
+        self.counters["missing"] += 1
+        with open(self._missing_path(imdb_id), "w"):
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.counters)
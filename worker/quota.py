@@ -0,0 +1,276 @@
+# worker/quota.py
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from shared import SharedBackend
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Классический token bucket: rate токенов в секунду, не больше capacity"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self) -> bool:
+        """Взять токен, если он есть прямо сейчас (без ожидания)"""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, timeout: float) -> bool:
+        """Взять токен, ожидая не дольше timeout секунд (timeout=0 — без ожидания)
+
+        Проверка и списание идут без await, поэтому блокировка не нужна: ждущий
+        запрос спит вне критической секции и не задерживает остальных.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire():
+                return True
+
+            wait = (1 - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class DailyBudget:
+    """Счетчик суточного лимита OMDB, сохраняемый на диск
+
+    Учет ведется по хэшу API-ключа, чтобы смена ключа начинала новый бюджет.
+    Сутки считаются по UTC.
+    """
+
+    def __init__(self, limit: int, api_key: Optional[str], path: Optional[str] = None):
+        self.limit = limit
+        self.key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+        self.day = self._today()
+        self.used = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if path:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS omdb_quota (
+                        key_hash TEXT NOT NULL,
+                        day TEXT NOT NULL,
+                        used INTEGER NOT NULL,
+                        PRIMARY KEY (key_hash, day)
+                    )
+                    """
+                )
+                self._conn.commit()
+                row = self._conn.execute(
+                    "SELECT used FROM omdb_quota WHERE key_hash = ? AND day = ?",
+                    (self.key_hash, self.day),
+                ).fetchone()
+                self.used = row[0] if row else 0
+            except Exception as e:
+                logger.error(f"💥 Не удалось открыть хранилище квоты {path}: {e}")
+                self._conn = None
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _rollover(self) -> None:
+        today = self._today()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    @property
+    def remaining(self) -> int:
+        self._rollover()
+        return max(self.limit - self.used, 0)
+
+    def consume(self, amount: int = 1) -> None:
+        self._rollover()
+        self.used += amount
+
+    @property
+    def shared_key(self) -> str:
+        """Ключ счетчика в общем хранилище реплик"""
+        self._rollover()
+        return f"quota:{self.key_hash}:{self.day}"
+
+    def sync(self, used: int) -> None:
+        """Принять значение общего счетчика (его ведут все реплики вместе)"""
+        self._rollover()
+        self.used = used
+
+    def persist(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO omdb_quota (key_hash, day, used) VALUES (?, ?, ?)",
+                    (self.key_hash, self.day, self.used),
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"💥 Ошибка записи квоты OMDB: {e}")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+class OMDBQuota:
+    """Ограничитель запросов к OMDB: скорость + суточный бюджет
+
+    Уровни деградации:
+    - normal: без ограничений;
+    - low: бюджета осталось меньше low_ratio — запрашиваем меньше деталей;
+    - cache_only: осталось не больше reserve — в OMDB не ходим, отдаем только кэш.
+
+    С общим хранилищем суточный бюджет списывается атомарно в одном счетчике
+    на все реплики; локальная копия используется, пока хранилище недоступно.
+    Token bucket остается локальным для каждой реплики.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        daily_limit: int = 1000,
+        rate_per_second: float = 5,
+        burst: float = 10,
+        wait_timeout: float = 2,
+        low_ratio: float = 0.1,
+        reserve: int = 20,
+        low_budget_details: int = 2,
+        path: Optional[str] = None,
+        shared: Optional[SharedBackend] = None,
+    ):
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.budget = DailyBudget(daily_limit, api_key, path)
+        self.wait_timeout = wait_timeout
+        self.low_ratio = low_ratio
+        self.reserve = reserve
+        self.low_budget_details = low_budget_details
+        self.shared = shared
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, api_key: Optional[str], shared: Optional[SharedBackend] = None) -> "OMDBQuota":
+        return cls(
+            api_key=api_key,
+            daily_limit=int(os.getenv("OMDB_DAILY_LIMIT", "1000")),
+            rate_per_second=float(os.getenv("OMDB_RATE_PER_SECOND", "5")),
+            burst=float(os.getenv("OMDB_RATE_BURST", "10")),
+            wait_timeout=float(os.getenv("OMDB_RATE_WAIT", "2")),
+            low_ratio=float(os.getenv("OMDB_BUDGET_LOW_RATIO", "0.1")),
+            reserve=int(os.getenv("OMDB_BUDGET_RESERVE", "20")),
+            low_budget_details=int(os.getenv("OMDB_LOW_BUDGET_DETAILS", "2")),
+            path=os.getenv("OMDB_QUOTA_PATH", "data/omdb_quota.sqlite3") or None,
+            shared=shared,
+        )
+
+    @property
+    def mode(self) -> str:
+        remaining = self.budget.remaining
+        if remaining <= self.reserve:
+            return "cache_only"
+        if remaining <= self.budget.limit * self.low_ratio:
+            return "low"
+        return "normal"
+
+    def details_limit(self, default: int) -> int:
+        """Сколько деталей (i=) можно запрашивать на один поиск"""
+        if self.mode == "normal":
+            return default
+        return min(default, self.low_budget_details)
+
+    async def acquire(self, wait: Optional[float] = None) -> bool:
+        """Разрешить один запрос к OMDB и списать его из бюджета
+
+        wait — сколько ждать свободный токен (по умолчанию wait_timeout).
+        """
+        if self.mode == "cache_only":
+            self.rejected += 1
+            return False
+
+        if not await self.bucket.acquire(self.wait_timeout if wait is None else wait):
+            self.rejected += 1
+            return False
+
+        if self.shared is not None and not await self._consume_shared():
+            self.rejected += 1
+            return False
+
+        if self.shared is None or not self.shared.available:
+            self.budget.consume()
+        await asyncio.to_thread(self.budget.persist)
+        return True
+
+    async def _consume_shared(self) -> bool:
+        """Списать запрос из общего счетчика; False — другие реплики уже исчерпали бюджет"""
+        key = self.budget.shared_key
+        used = await self.shared.incr(key, ttl=2 * 24 * 3600)
+        if used is None:
+            # Хранилище недоступно — считаем локально
+            return True
+
+        if self.budget.limit - used < self.reserve:
+            await self.shared.incr(key, amount=-1)
+            self.budget.sync(used - 1)
+            return False
+
+        self.budget.sync(used)
+        return True
+
+    async def sync(self) -> None:
+        """Подтянуть расход бюджета другими репликами (на старте воркера)"""
+        if self.shared is None:
+            return
+        used = await self.shared.get_int(self.budget.shared_key)
+        if used is not None:
+            self.budget.sync(max(used, self.budget.used))
+
+    def stats(self) -> Dict[str, Any]:
+        remaining = self.budget.remaining
+        return {
+            "mode": self.mode,
+            "daily_limit": self.budget.limit,
+            "used_today": self.budget.used,
+            "remaining": remaining,
+            "day": self.budget.day,
+            "rejected": self.rejected,
+            "shared": self.shared is not None,
+        }
+
+    def close(self) -> None:
+        self.budget.close()
@@ -0,0 +1,218 @@
+# worker/refresher.py
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Поля карточки, которые со временем меняются в OMDB и которые фоновое
+# обновление отправляет обратно в API (описание, жанр и состав не трогаем)
+REFRESH_FIELDS = (
+    "imdb_rating",
+    "poster_url",
+    "total_seasons",
+)
+
+
+class CatalogRefresher:
+    """Фоновое обновление каталога: перезапрашивает в OMDB давно не обновлявшиеся imdbID
+
+    Работает с низким приоритетом: только пока квота в режиме normal, в бакете
+    есть запас токенов для пользовательских запросов, и не больше budget_share
+    от суточного лимита. Состояние (расход за сутки, пауза, счетчики)
+    сохраняется в checkpoint-файл и переживает рестарт.
+    """
+
+    def __init__(
+        self,
+        omdb_service: Any,
+        api_url: str,
+        enabled: bool = False,
+        interval: float = 300,
+        batch_size: int = 20,
+        budget_share: float = 0.2,
+        item_delay: float = 1.0,
+        checkpoint_path: Optional[str] = None,
+    ):
+        self.omdb_service = omdb_service
+        self.api_url = api_url.rstrip("/")
+        self.enabled = enabled
+        self.interval = interval
+        self.batch_size = batch_size
+        self.budget_share = budget_share
+        self.item_delay = item_delay
+        self.checkpoint_path = checkpoint_path
+
+        self.state: Dict[str, Any] = {
+            "day": self._today(),
+            "used_today": 0,
+            "paused": False,
+            "refreshed_total": 0,
+            "last_imdb_id": None,
+            "last_run_at": None,
+        }
+        self._load_checkpoint()
+
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls, omdb_service: Any) -> "CatalogRefresher":
+        return cls(
+            omdb_service=omdb_service,
+            api_url=os.getenv("API_URL", "http://api:8000"),
+            enabled=os.getenv("REFRESH_ENABLED", "false").lower() in {"1", "true", "yes"},
+            interval=float(os.getenv("REFRESH_INTERVAL", "300")),
+            batch_size=int(os.getenv("REFRESH_BATCH_SIZE", "20")),
+            budget_share=float(os.getenv("REFRESH_BUDGET_SHARE", "0.2")),
+            item_delay=float(os.getenv("REFRESH_ITEM_DELAY", "1.0")),
+            checkpoint_path=os.getenv("REFRESH_CHECKPOINT_PATH", "data/refresher_state.json") or None,
+        )
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _load_checkpoint(self) -> None:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+        except Exception as e:
+            logger.error(f"💥 Не удалось прочитать checkpoint обновления каталога: {e}")
+
+    def _save_checkpoint(self) -> None:
+        if not self.checkpoint_path:
+            return
+        try:
+            directory = os.path.dirname(self.checkpoint_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.checkpoint_path)
+        except Exception as e:
+            logger.error(f"💥 Не удалось сохранить checkpoint обновления каталога: {e}")
+
+    @property
+    def daily_allowance(self) -> int:
+        return int(self.omdb_service.quota.budget.limit * self.budget_share)
+
+    def _rollover(self) -> None:
+        today = self._today()
+        if self.state["day"] != today:
+            self.state["day"] = today
+            self.state["used_today"] = 0
+
+    def _can_spend(self) -> bool:
+        """Можно ли сейчас потратить запрос OMDB на фоновое обновление"""
+        self._rollover()
+        quota = self.omdb_service.quota
+        if self.state["paused"] or quota.mode != "normal":
+            return False
+        # OMDB недоступен — не тратим попытки и не сдвигаем очередь
+        if self.omdb_service.breaker.is_open:
+            return False
+        if self.state["used_today"] >= self.daily_allowance:
+            return False
+        # Оставляем половину бакета интерактивным поискам
+        return quota.bucket.tokens >= quota.bucket.capacity / 2
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._client = httpx.AsyncClient(base_url=self.api_url, timeout=30.0)
+        self._task = asyncio.create_task(self._run())
+        logger.info("🔄 Catalog refresher started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._save_checkpoint()
+
+    def pause(self) -> None:
+        self.state["paused"] = True
+        self._save_checkpoint()
+
+    def resume(self) -> None:
+        self.state["paused"] = False
+        self._save_checkpoint()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"💥 Ошибка фонового обновления каталога: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        """Один проход: взять кандидатов из API, обновить их в OMDB, отправить обратно"""
+        if not self._can_spend():
+            return 0
+
+        response = await self._client.get(
+            "/api/v1/content/refresh/candidates", params={"limit": self.batch_size}
+        )
+        response.raise_for_status()
+        candidates: List[str] = response.json()
+
+        items = []
+        for imdb_id in candidates:
+            if not self._can_spend():
+                break
+
+            status, details, sent = await self.omdb_service.fetch_fresh_details(imdb_id)
+            self.state["used_today"] += sent
+            self.state["last_imdb_id"] = imdb_id
+
+            if status == "failed":
+                # Сбой OMDB (сеть, лимитер, breaker): запись остается в начале
+                # очереди, а проход заканчиваем — следующие упадут так же
+                logger.warning(f"⚠️ Обновление {imdb_id} не удалось, проход прерван")
+                break
+
+            # "not_found" — OMDB ответил, что imdbID нет: отправляем только imdbID,
+            # чтобы API сдвинул запись в конец очереди
+            item = {"imdb_id": imdb_id}
+            if details:
+                item.update({field: details.get(field) for field in REFRESH_FIELDS})
+            items.append(item)
+            await asyncio.sleep(self.item_delay)
+
+        if items:
+            push = await self._client.post("/api/v1/content/refresh", json={"items": items})
+            push.raise_for_status()
+            self.state["refreshed_total"] += push.json().get("updated", 0)
+
+        self.state["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        self._save_checkpoint()
+        if items:
+            logger.info(f"🔄 Обновлено из OMDB: {len(items)} записей каталога")
+        return len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        self._rollover()
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "daily_allowance": self.daily_allowance,
+            **self.state,
+        }
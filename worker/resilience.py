@@ -0,0 +1,124 @@
+# worker/resilience.py
+import logging
+import os
+import random
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Повторы идемпотентных GET с экспоненциальной задержкой и full jitter"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        hedge_delay: float = 0.0,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Через сколько секунд без ответа отправлять дублирующий запрос (0 — выключено)
+        self.hedge_delay = hedge_delay
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.getenv("OMDB_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("OMDB_RETRY_BASE_DELAY", "0.2")),
+            max_delay=float(os.getenv("OMDB_RETRY_MAX_DELAY", "2.0")),
+            hedge_delay=float(os.getenv("OMDB_HEDGE_DELAY", "0")),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Задержка перед повтором после попытки attempt (1, 2, ...)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Предохранитель для OMDB: closed → open после серии ошибок → half_open на пробу
+
+    В состоянии open запросы сразу отклоняются, пока не пройдет recovery_timeout;
+    затем пропускается один пробный запрос, и по его итогу breaker закрывается
+    или снова открывается.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.opened_count = 0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        return cls(
+            failure_threshold=int(os.getenv("OMDB_BREAKER_FAILURES", "5")),
+            recovery_timeout=float(os.getenv("OMDB_BREAKER_RECOVERY", "30")),
+        )
+
+    @property
+    def is_open(self) -> bool:
+        """Отклоняет ли breaker запросы прямо сейчас (без пробы и без учета отказа)"""
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.recovery_timeout
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+
+        return True
+
+    def release(self) -> None:
+        """Разрешенный вызов так и не дошел до OMDB (например, отказ лимитера)"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("🟢 OMDB снова доступен, circuit breaker закрыт")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened_count += 1
+                logger.warning(
+                    f"🔴 OMDB недоступен ({self.consecutive_failures} ошибок подряд), circuit breaker открыт"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1),
+        }
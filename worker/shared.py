@@ -0,0 +1,188 @@
+# worker/shared.py
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Атомарное снятие блокировки: удаляем ключ, только если он все еще наш
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class SharedBackend:
+    """Общее для всех реплик воркера хранилище (любой Redis-совместимый сервер)
+
+    Используется кэшем OMDB, счетчиком суточной квоты и блокировками
+    single-flight. Все методы не бросают исключений: при недоступности
+    сервера возвращают "пусто", и воркер продолжает работать на локальном
+    состоянии. После ошибки сервер не опрашивается retry_after секунд.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "omdb:",
+        socket_timeout: float = 0.5,
+        retry_after: float = 5.0,
+    ):
+        import redis.asyncio as redis
+
+        self.url = url
+        self.prefix = prefix
+        self.retry_after = retry_after
+        self._client = redis.from_url(
+            url,
+            decode_responses=True,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+        )
+        self._down_until = 0.0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedBackend"]:
+        url = os.getenv("REDIS_URL")
+        if not url:
+            return None
+        try:
+            return cls(
+                url,
+                prefix=os.getenv("SHARED_PREFIX", "omdb:"),
+                socket_timeout=float(os.getenv("SHARED_TIMEOUT", "0.5")),
+            )
+        except ImportError:
+            logger.warning("⚠️ REDIS_URL задан, но пакет redis не установлен — общее хранилище отключено")
+            return None
+
+    async def start(self) -> None:
+        try:
+            await self._client.ping()
+            logger.info(f"🗄 Общее хранилище воркеров: {self.url}")
+        except Exception as e:
+            self._failed(e)
+
+    async def close(self) -> None:
+        try:
+            await self._client.close()
+        except Exception:
+            pass
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, error: Exception) -> None:
+        self.errors += 1
+        if self.available:
+            logger.warning(f"⚠️ Общее хранилище недоступно, работаем локально: {error}")
+        self._down_until = time.monotonic() + self.retry_after
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def get_json(self, key: str) -> Any:
+        if not self.available:
+            return None
+        try:
+            raw = await self._client.get(self._key(key))
+        except Exception as e:
+            self._failed(e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set_json(self, key: str, value: Any, ttl: float) -> None:
+        if not self.available or ttl <= 0:
+            return
+        try:
+            await self._client.set(
+                self._key(key), json.dumps(value, ensure_ascii=False), px=int(ttl * 1000)
+            )
+        except Exception as e:
+            self._failed(e)
+
+    async def delete(self, key: str) -> None:
+        if not self.available:
+            return
+        try:
+            await self._client.delete(self._key(key))
+        except Exception as e:
+            self._failed(e)
+
+    async def get_int(self, key: str) -> Optional[int]:
+        if not self.available:
+            return None
+        try:
+            raw = await self._client.get(self._key(key))
+        except Exception as e:
+            self._failed(e)
+            return None
+        return int(raw) if raw is not None else 0
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> Optional[int]:
+        """Атомарно увеличить счетчик; None — хранилище недоступно"""
+        if not self.available:
+            return None
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.incrby(self._key(key), amount)
+                if ttl:
+                    pipe.expire(self._key(key), int(ttl))
+                result = await pipe.execute()
+            return int(result[0])
+        except Exception as e:
+            self._failed(e)
+            return None
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Взять блокировку: токен владельца или None, если ее держит другая реплика
+
+        Если хранилище недоступно, возвращается токен без блокировки —
+        вызов выполняется так же, как без общего хранилища.
+        """
+        token = uuid.uuid4().hex
+        if not self.available:
+            return token
+        try:
+            acquired = await self._client.set(
+                self._key(f"lock:{key}"), token, nx=True, px=int(ttl * 1000)
+            )
+        except Exception as e:
+            self._failed(e)
+            return token
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        if not self.available:
+            return
+        try:
+            await self._client.eval(_RELEASE_SCRIPT, 1, self._key(f"lock:{key}"), token)
+        except Exception as e:
+            self._failed(e)
+
+    async def wait_unlocked(self, key: str, timeout: float, interval: float = 0.05) -> None:
+        """Дождаться снятия чужой блокировки (не дольше timeout)"""
+        deadline = time.monotonic() + timeout
+        while self.available and time.monotonic() < deadline:
+            try:
+                if not await self._client.exists(self._key(f"lock:{key}")):
+                    return
+            except Exception as e:
+                self._failed(e)
+                return
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "available": self.available,
+            "errors": self.errors,
+        }
@@ -0,0 +1,75 @@
+# worker/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from shared import SharedBackend
+
+
+class SingleFlight:
+    """Объединение одинаковых запросов, выполняющихся одновременно
+
+    Первый вызов с ключом запускает задачу, остальные ждут тот же результат.
+    Задача защищена от отмены: если ожидающий отвалился по таймауту, остальные
+    вызовы (и запись в кэш) все равно получат ответ.
+
+    С общим хранилищем ключ дополнительно блокируется для всех реплик:
+    реплика, не получившая блокировку, ждет ее снятия и затем выполняет
+    вызов сама — к этому моменту ответ уже лежит в общем кэше.
+    """
+
+    def __init__(
+        self,
+        shared: Optional[SharedBackend] = None,
+        lock_ttl: float = 30.0,
+        lock_wait: float = 15.0,
+    ):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.shared = shared
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self.calls = 0
+        self.coalesced = 0
+        self.remote_waits = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.calls += 1
+        task = asyncio.ensure_future(self._run(key, fn))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.shared is None:
+            return await fn()
+
+        token = await self.shared.acquire_lock(key, self.lock_ttl)
+        if token is None:
+            # Тот же запрос уже выполняет другая реплика
+            self.remote_waits += 1
+            await self.shared.wait_unlocked(key, self.lock_wait)
+            return await fn()
+
+        try:
+            return await fn()
+        finally:
+            await self.shared.release_lock(key, token)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Помечаем исключение как полученное, даже если все ожидающие ушли
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "remote_waits": self.remote_waits,
+        }
@@ -0,0 +1,46 @@
+# worker/tests/conftest.py
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+# Модули воркера импортируются как top-level (from quota import ...), как в контейнере
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Без файлов на диске и без настоящего OMDB: модуль worker создает сервисы при импорте
+os.environ.setdefault("OMDB_API_KEY", "test-key")
+os.environ.setdefault("OMDB_API_URL", "http://omdb.invalid/")
+for variable in ("OMDB_CACHE_PATH", "OMDB_QUOTA_PATH", "REFRESH_CHECKPOINT_PATH", "REDIS_URL"):
+    os.environ[variable] = ""
+os.environ.setdefault("POSTER_DIR", tempfile.mkdtemp(prefix="posters-"))
+
+
+class FakeUpstream:
+    """Ответы s= по (название, год); все, чего нет в answers, — "Movie not found!" """
+
+    def __init__(self, answers: Dict[Tuple[str, Optional[int]], List[dict]]):
+        self.answers = answers
+        self.calls: List[Tuple[str, Optional[int]]] = []
+
+    async def __call__(self, client, query, content_type=None, page=1):
+        self.calls.append((query.title, query.year))
+        items = self.answers.get((query.title.casefold(), query.year))
+        if items:
+            return items, None
+        return [], "Movie not found!"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Фабрика OMDBService с подменой OMDB (ставится и в worker.omdb_service для эндпоинтов)"""
+    import worker
+
+    def build(answers) -> "worker.OMDBService":
+        omdb = worker.OMDBService()
+        monkeypatch.setattr(omdb, "_search_upstream", FakeUpstream(answers))
+        monkeypatch.setattr(worker, "omdb_service", omdb)
+        return omdb
+
+    return build
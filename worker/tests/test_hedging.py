@@ -0,0 +1,39 @@
+# worker/tests/test_hedging.py
+import asyncio
+
+import httpx
+
+import worker
+
+
+def test_hedged_duplicate_is_counted_as_sent(monkeypatch):
+    omdb = worker.OMDBService()
+    monkeypatch.setattr(omdb.retry, "hedge_delay", 0.01)
+
+    async def slow_get(client, params):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"Response": "True"})
+
+    monkeypatch.setattr(omdb, "_get", slow_get)
+    sent = {}
+    response = asyncio.run(omdb._request(None, {"i": "tt0816692"}, sent))
+
+    assert response.status_code == 200
+    assert omdb.hedged_requests == 1
+    # Основной запрос и дубль — оба ушли в OMDB и тратят суточную квоту
+    assert sent == {"sent": 2}
+
+
+def test_no_hedge_counts_single_request(monkeypatch):
+    omdb = worker.OMDBService()
+    monkeypatch.setattr(omdb.retry, "hedge_delay", 0.5)
+
+    async def fast_get(client, params):
+        return httpx.Response(200, json={"Response": "True"})
+
+    monkeypatch.setattr(omdb, "_get", fast_get)
+    sent = {}
+    asyncio.run(omdb._request(None, {"i": "tt0816692"}, sent))
+
+    assert omdb.hedged_requests == 0
+    assert sent == {"sent": 1}
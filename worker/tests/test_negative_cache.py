@@ -0,0 +1,62 @@
+# worker/tests/test_negative_cache.py
+import asyncio
+
+import pytest
+
+import cache as cache_module
+from cache import MISSING, OMDBCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake)
+    return fake
+
+
+def test_miss_is_remembered_until_ttl(clock):
+    omdb_cache = OMDBCache(negative_ttl=600)
+
+    async def run():
+        await omdb_cache.set_negative(OMDBCache.SEARCH, "no such film|", "Movie not found!")
+        assert await omdb_cache.get_negative(OMDBCache.SEARCH, "no such film|") == "Movie not found!"
+        clock.now += 601
+        assert await omdb_cache.get_negative(OMDBCache.SEARCH, "no such film|") is None
+
+    asyncio.run(run())
+    assert omdb_cache.stats()["negative"]["hits"] == 1
+    assert omdb_cache.stats()["negative"]["stored"] == 1
+
+
+def test_negative_entries_are_separate_from_values(clock):
+    omdb_cache = OMDBCache()
+
+    async def run():
+        await omdb_cache.set_negative(OMDBCache.SEARCH, "key|", None)
+        # Промах не выдается за значение и не пишется в основной кэш
+        assert await omdb_cache.get(OMDBCache.SEARCH, "key|") is MISSING
+        assert await omdb_cache.get_negative(OMDBCache.DETAILS, "key|") is None
+        assert await omdb_cache.get_negative(OMDBCache.SEARCH, "key|") == "Not found"
+
+    asyncio.run(run())
+
+
+def test_uncounted_lookup_and_delete(clock):
+    omdb_cache = OMDBCache()
+
+    async def run():
+        await omdb_cache.set_negative(OMDBCache.SEARCH, "key|", "Movie not found!")
+        assert await omdb_cache.get_negative(OMDBCache.SEARCH, "key|", count=False)
+        await omdb_cache.delete_negative(OMDBCache.SEARCH, "key|")
+        assert await omdb_cache.get_negative(OMDBCache.SEARCH, "key|") is None
+
+    asyncio.run(run())
+    assert omdb_cache.stats()["negative"]["hits"] == 0
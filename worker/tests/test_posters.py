@@ -0,0 +1,72 @@
+# worker/tests/test_posters.py
+import asyncio
+import io
+from typing import List, Optional
+
+from PIL import Image
+
+from posters import PosterStore
+
+POSTER_URL = "https://m.media-amazon.com/images/M/poster.jpg"
+
+
+def _jpeg() -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (600, 900), "navy").save(output, format="JPEG")
+    return output.getvalue()
+
+
+class Resolver:
+    """resolve_url, считающий обращения к деталям OMDB"""
+
+    def __init__(self, url: Optional[str] = POSTER_URL):
+        self.url = url
+        self.calls: List[str] = []
+
+    async def __call__(self, imdb_id: str) -> Optional[str]:
+        self.calls.append(imdb_id)
+        return self.url
+
+
+def _store(tmp_path, monkeypatch, resolver: Resolver) -> PosterStore:
+    store = PosterStore(str(tmp_path), resolver)
+    downloaded: List[str] = []
+
+    async def download(url: str) -> bytes:
+        downloaded.append(url)
+        return _jpeg()
+
+    monkeypatch.setattr(store, "_download", download)
+    store.downloaded = downloaded
+    return store
+
+
+def test_check_uses_known_urls_without_details(tmp_path, monkeypatch):
+    resolver = Resolver()
+    store = _store(tmp_path, monkeypatch, resolver)
+
+    result = asyncio.run(store.check(["tt0816692"], {"tt0816692": POSTER_URL}))
+
+    assert result == {"available": ["tt0816692"], "missing": []}
+    assert resolver.calls == []
+    assert store.downloaded == [POSTER_URL]
+
+
+def test_check_resolves_only_ids_without_url(tmp_path, monkeypatch):
+    resolver = Resolver()
+    store = _store(tmp_path, monkeypatch, resolver)
+
+    asyncio.run(store.check(["tt0816692", "tt1375666"], {"tt0816692": POSTER_URL}))
+
+    assert resolver.calls == ["tt1375666"]
+
+
+def test_foreign_source_url_is_ignored(tmp_path, monkeypatch):
+    resolver = Resolver()
+    store = _store(tmp_path, monkeypatch, resolver)
+
+    path = asyncio.run(store.get("tt0816692", "http://10.0.0.1/admin"))
+
+    assert path is not None
+    assert resolver.calls == ["tt0816692"]
+    assert store.downloaded == [POSTER_URL]
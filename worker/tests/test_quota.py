@@ -0,0 +1,66 @@
+# worker/tests/test_quota.py
+import asyncio
+import time
+
+from quota import TokenBucket
+
+
+def test_try_acquire_spends_burst():
+    bucket = TokenBucket(rate=0.001, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_acquire_zero_does_not_wait():
+    bucket = TokenBucket(rate=0.5, capacity=1)
+    bucket.try_acquire()
+
+    async def run() -> bool:
+        started = time.monotonic()
+        result = await bucket.acquire(0)
+        assert time.monotonic() - started < 0.05
+        return result
+
+    assert asyncio.run(run()) is False
+
+
+def test_acquire_waits_for_refill():
+    bucket = TokenBucket(rate=20, capacity=1)
+    bucket.try_acquire()
+
+    async def run() -> float:
+        started = time.monotonic()
+        assert await bucket.acquire(1)
+        return time.monotonic() - started
+
+    assert 0.02 <= asyncio.run(run()) < 0.5
+
+
+def test_acquire_gives_up_before_deadline():
+    bucket = TokenBucket(rate=0.5, capacity=1)
+    bucket.try_acquire()
+
+    async def run() -> float:
+        started = time.monotonic()
+        assert not await bucket.acquire(0.1)
+        return time.monotonic() - started
+
+    # Токен появится только через 2 с — ждать бессмысленно
+    assert asyncio.run(run()) < 0.05
+
+
+def test_try_acquire_not_blocked_by_waiter():
+    bucket = TokenBucket(rate=2, capacity=1)
+    bucket.try_acquire()
+
+    async def run() -> None:
+        # Ждущий запрос (до 1 с) не должен задерживать попытку без ожидания
+        waiter = asyncio.create_task(bucket.acquire(1))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        assert not await bucket.acquire(0)
+        assert time.monotonic() - started < 0.05
+        assert await waiter
+
+    asyncio.run(run())
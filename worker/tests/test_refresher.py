@@ -0,0 +1,114 @@
+# worker/tests/test_refresher.py
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from refresher import CatalogRefresher
+
+
+class FakeQuota:
+    mode = "normal"
+
+    class budget:
+        limit = 1000
+
+    class bucket:
+        tokens = 10
+        capacity = 10
+
+
+class FakeBreaker:
+    is_open = False
+
+
+class FakeOMDB:
+    """fetch_fresh_details по заранее заданным (статус, детали, отправлено)"""
+
+    def __init__(self, answers: Dict[str, Tuple[str, Optional[dict], int]]):
+        self.answers = answers
+        self.quota = FakeQuota()
+        self.breaker = FakeBreaker()
+        self.calls: List[str] = []
+
+    async def fetch_fresh_details(self, imdb_id: str):
+        self.calls.append(imdb_id)
+        return self.answers[imdb_id]
+
+
+class FakeResponse:
+    def __init__(self, data: Any):
+        self.data = data
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> Any:
+        return self.data
+
+
+class FakeAPI:
+    def __init__(self, candidates: List[str]):
+        self.candidates = candidates
+        self.pushed: List[dict] = []
+
+    async def get(self, path, params=None):
+        return FakeResponse(self.candidates)
+
+    async def post(self, path, json=None):
+        self.pushed.extend(json["items"])
+        return FakeResponse({"updated": len(json["items"])})
+
+
+def refresher(omdb: FakeOMDB, api: FakeAPI) -> CatalogRefresher:
+    catalog = CatalogRefresher(omdb, "http://api:8000", item_delay=0)
+    catalog._client = api
+    return catalog
+
+
+def test_statuses_and_spent_requests():
+    omdb = FakeOMDB(
+        {
+            "tt1": ("ok", {"imdb_rating": 8.1, "poster_url": "https://m.media-amazon.com/1.jpg", "total_seasons": None}, 1),
+            "tt2": ("not_found", None, 1),
+            # Повтор и дубль hedging — три запроса к OMDB
+            "tt3": ("ok", {"imdb_rating": 7.0, "poster_url": None, "total_seasons": 2}, 3),
+        }
+    )
+    api = FakeAPI(["tt1", "tt2", "tt3"])
+    catalog = refresher(omdb, api)
+
+    assert asyncio.run(catalog.run_once()) == 3
+    assert api.pushed == [
+        {"imdb_id": "tt1", "imdb_rating": 8.1, "poster_url": "https://m.media-amazon.com/1.jpg", "total_seasons": None},
+        # OMDB не знает imdbID — отправляем только его, чтобы API сдвинул запись в конец очереди
+        {"imdb_id": "tt2"},
+        {"imdb_id": "tt3", "imdb_rating": 7.0, "poster_url": None, "total_seasons": 2},
+    ]
+    assert catalog.state["used_today"] == 5
+    assert catalog.state["refreshed_total"] == 3
+
+
+def test_failed_details_stop_the_pass_and_are_not_pushed():
+    omdb = FakeOMDB(
+        {
+            "tt1": ("ok", {"imdb_rating": 8.1}, 1),
+            "tt2": ("failed", None, 2),
+            "tt3": ("ok", {"imdb_rating": 7.0}, 1),
+        }
+    )
+    api = FakeAPI(["tt1", "tt2", "tt3"])
+    catalog = refresher(omdb, api)
+
+    assert asyncio.run(catalog.run_once()) == 1
+    assert [item["imdb_id"] for item in api.pushed] == ["tt1"]
+    assert omdb.calls == ["tt1", "tt2"]
+    # Неудачные попытки тоже потрачены
+    assert catalog.state["used_today"] == 3
+
+
+def test_open_breaker_skips_the_pass():
+    omdb = FakeOMDB({})
+    omdb.breaker.is_open = True
+    api = FakeAPI(["tt1"])
+
+    assert asyncio.run(refresher(omdb, api).run_once()) == 0
+    assert omdb.calls == []
@@ -0,0 +1,38 @@
+# worker/tests/test_search_stream.py
+import asyncio
+from typing import Any, Dict, List
+
+import orjson
+
+import worker
+
+ROWS = [{"Title": f"Star {index}", "Year": "2000", "imdbID": f"tt{index:07d}", "Type": "movie"} for index in range(10)]
+
+
+def stream_events(request: worker.SearchRequest) -> List[Dict[str, Any]]:
+    async def run() -> List[Dict[str, Any]]:
+        response = await worker.search_omdb_stream(request)
+        return [orjson.loads(line) async for line in response.body_iterator]
+
+    return asyncio.run(run())
+
+
+def test_cursor_follows_rows_shown_when_details_are_limited(service, monkeypatch):
+    omdb = service({("star", None): ROWS})
+    # Квота на исходе: детали только для двух строк
+    monkeypatch.setattr(omdb.quota, "details_limit", lambda default: 2)
+
+    async def details(client, imdb_id, semaphore):
+        return {"imdb_id": imdb_id}
+
+    monkeypatch.setattr(omdb, "_fetch_details_bounded", details)
+
+    events = stream_events(worker.SearchRequest(title="Star"))
+    assert [event["index"] for event in events if event["type"] == "item"] == [0, 1]
+    assert events[-1] == {"type": "done", "count": 2, "next_cursor": "2"}
+
+
+def test_summary_cursor_after_first_five(service):
+    service({("star", None): ROWS})
+    events = stream_events(worker.SearchRequest(title="Star", summary_only=True))
+    assert events[-1] == {"type": "done", "count": 5, "next_cursor": "5"}
@@ -0,0 +1,68 @@
+# worker/tests/test_search_variants.py
+import asyncio
+
+import worker
+from normalization import normalize_query
+
+INTERSTELLAR = [{"Title": "Interstellar", "Year": "2014", "imdbID": "tt0816692", "Type": "movie"}]
+DEATH_RACE = [{"Title": "Death Race 2000", "Year": "1975", "imdbID": "tt0072856", "Type": "movie"}]
+
+
+def test_cyrillic_title_found_twice_via_translit(service):
+    omdb = service({("interstellar", None): INTERSTELLAR})
+
+    async def run() -> None:
+        for _ in range(2):
+            response = await worker.search_omdb(worker.SearchRequest(title="Интерстеллар", summary_only=True))
+            assert response.success, response.error
+            assert not response.cached_miss
+            assert response.data[0]["imdb_id"] == "tt0816692"
+
+    asyncio.run(run())
+    # Второй запрос — из кэша, без обращения к OMDB
+    assert omdb._search_upstream.calls == [("Интерстеллар", None), ("interstellar", None)]
+
+
+def test_stale_negative_entry_is_cleared_when_translit_hits(service):
+    omdb = service({("interstellar", None): INTERSTELLAR})
+    key = worker.OMDBCache.search_key("Интерстеллар")
+
+    async def run() -> None:
+        # Промах исходного варианта, оставшийся с прошлого раза
+        await omdb.cache.set_negative(worker.OMDBCache.SEARCH, key, "Movie not found!")
+        assert await omdb._search_list(None, "Интерстеллар") == INTERSTELLAR
+        assert await omdb.cache.get_negative(worker.OMDBCache.SEARCH, key) is None
+        assert not await omdb.is_cached_miss("Интерстеллар")
+
+    asyncio.run(run())
+
+
+def test_real_miss_is_negative_cached(service):
+    omdb = service({})
+
+    async def run() -> None:
+        assert await omdb._search_list(None, "Несуществующий фильм") == []
+        assert await omdb.is_cached_miss("Несуществующий фильм")
+        await omdb._search_list(None, "Несуществующий фильм")
+
+    asyncio.run(run())
+    # Оба варианта (кириллица и транслит) спрошены один раз, дальше — негативный кэш
+    assert len(omdb._search_upstream.calls) == 2
+
+
+def test_title_ending_in_year_retries_without_year_filter(service):
+    omdb = service({("death race 2000", None): DEATH_RACE})
+    assert normalize_query("Death Race 2000").year == 2000
+
+    async def run() -> None:
+        assert await omdb._search_list(None, "Death Race 2000") == DEATH_RACE
+        assert not await omdb.is_cached_miss("Death Race 2000")
+
+    asyncio.run(run())
+    assert omdb._search_upstream.calls == [("Death Race", 2000), ("Death Race 2000", None)]
+
+
+def test_year_filter_used_when_it_matches(service):
+    omdb = service({("dune", 2021): [{"Title": "Dune", "Year": "2021", "imdbID": "tt1160419"}]})
+    asyncio.run(omdb._search_list(None, "Dune 2021"))
+    assert omdb._search_upstream.calls == [("Dune", 2021)]
@@ -1,30 +1,217 @@
 # worker/app/main.py
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import asyncio
 import httpx
 import os
 import logging
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from pydantic import BaseModel
 
-app = FastAPI(title="OMDB Worker")
+from cache import MISSING, OMDBCache
+import codec
+from jobs import PRIORITIES, JobQueue
+import metrics
+from posters import PosterStore
+from normalization import NormalizedQuery, normalize_query
+from quota import OMDBQuota
+from refresher import CatalogRefresher
+from resilience import CircuitBreaker, RetryPolicy
+from shared import SharedBackend
+from singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# OMDB отдает выдачу s= страницами по 10 строк, не больше 100 страниц
+OMDB_PAGE_SIZE = 10
+OMDB_MAX_PAGES = 100
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Открываем общий HTTP-клиент к OMDB на старте и закрываем при остановке"""
+    await omdb_service.start()
+    await catalog_refresher.start()
+    await job_queue.start()
+    await poster_store.start()
+    try:
+        yield
+    finally:
+        await poster_store.close()
+        await job_queue.stop()
+        await catalog_refresher.stop()
+        await omdb_service.close()
+
+
+app = FastAPI(
+    title="OMDB Worker", lifespan=lifespan, default_response_class=codec.FastJSONResponse
+)
+
+
+@app.middleware("http")
+async def track_in_flight(request: Request, call_next):
+    """Сколько запросов воркер обслуживает прямо сейчас (для /metrics)"""
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    try:
+        return await call_next(request)
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+
 class SearchRequest(BaseModel):
     title: str
     content_type: Optional[str] = None
+    # Только строки списка OMDB (s=) без запросов деталей (i=)
+    summary_only: bool = False
 
 class SearchResponse(BaseModel):
     success: bool
     data: Optional[List[Dict[str, Any]]] = None
     error: Optional[str] = None
+    # True, если промах отдан из негативного кэша без обращения к OMDB
+    cached_miss: bool = False
+
+class SearchPageRequest(BaseModel):
+    title: str
+    content_type: Optional[str] = None
+    # Курсор из next_cursor предыдущей страницы (None — с начала выдачи)
+    cursor: Optional[str] = None
+    limit: int = 5
+    summary_only: bool = True
+
+class SearchPageResponse(BaseModel):
+    success: bool
+    data: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+    # None — выдача закончилась
+    next_cursor: Optional[str] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[SearchRequest]
+
+class BatchSearchItem(BaseModel):
+    title: str
+    content_type: Optional[str] = None
+    success: bool
+    data: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+class BatchSearchResponse(BaseModel):
+    success: bool
+    results: List[BatchSearchItem]
+
+class DetailsBatchRequest(BaseModel):
+    imdb_ids: List[str]
+
+class DetailsBatchResponse(BaseModel):
+    success: bool
+    data: Dict[str, Dict[str, Any]]
+    missing: List[str] = []
+
+class PosterCheckRequest(BaseModel):
+    imdb_ids: List[str] = []
+    # Уже известные ссылки (Poster из строк списка) — без запроса деталей i= за каждой
+    poster_urls: Dict[str, str] = {}
+
+class JobRequest(BaseModel):
+    # search | details | search_batch | details_batch
+    kind: str
+    payload: Dict[str, Any] = {}
+    # interactive | bulk | enrichment | refresh
+    priority: str = "interactive"
+    # Куда отправить POST с результатом по завершении (только адреса из JOB_CALLBACK_ALLOWLIST)
+    callback_url: Optional[str] = None
 
 class OMDBService:
     def __init__(self):
         self.api_key = os.getenv("OMDB_API_KEY")
-        self.base_url = "http://www.omdbapi.com/"
+        # Адрес OMDB настраивается, чтобы подменять его локальным симулятором (omdb_simulator.py)
+        self.base_url = os.getenv("OMDB_API_URL", "http://www.omdbapi.com/")
+        # Сколько запросов деталей (i=) выполняем параллельно и сколько ждем каждый
+        self.details_concurrency = max(1, int(os.getenv("OMDB_DETAILS_CONCURRENCY", "5")))
+        self.details_timeout = float(os.getenv("OMDB_DETAILS_TIMEOUT", "10"))
+        # Кириллический запрос без результатов повторяем транслитом
+        self.translit_fallback = os.getenv("OMDB_TRANSLIT_FALLBACK", "true").lower() in {"1", "true", "yes"}
+        # Пакетные запросы (импорт каталога, обогащение) делят общий лимит параллельности
+        self.batch_max_items = int(os.getenv("OMDB_BATCH_MAX_ITEMS", "500"))
+        # Порция /search/page: один запрос не должен обходить десятки страниц OMDB
+        self.page_max_items = max(1, int(os.getenv("OMDB_PAGE_MAX_ITEMS", "20")))
+        self.batch_semaphore = asyncio.Semaphore(
+            max(1, int(os.getenv("OMDB_BATCH_CONCURRENCY", "4")))
+        )
+        self.client: Optional[httpx.AsyncClient] = None
+        # Общее хранилище реплик (REDIS_URL): кэш, квота и блокировки на все реплики
+        self.shared = SharedBackend.from_env()
+        self.cache = OMDBCache.from_env(self.shared)
+        # Одинаковые одновременные запросы делят один вызов OMDB
+        self.singleflight = SingleFlight(
+            self.shared,
+            lock_ttl=float(os.getenv("SHARED_LOCK_TTL", "30")),
+            lock_wait=float(os.getenv("SHARED_LOCK_WAIT", "15")),
+        )
+        # Скорость запросов и суточный бюджет OMDB для текущего ключа
+        self.quota = OMDBQuota.from_env(self.api_key, self.shared)
+        # Повторы с jitter, hedged-запросы и предохранитель при сбоях OMDB
+        self.retry = RetryPolicy.from_env()
+        self.breaker = CircuitBreaker.from_env()
+        self.hedged_requests = 0
+        # Фоновые догрузки следующих страниц выдачи (держим ссылки до завершения)
+        self._prefetch_tasks: set = set()
         
         if not self.api_key:
             logger.error("❌ OMDB_API_KEY not configured in worker")
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Создать долгоживущий клиент с пулом keep-alive соединений"""
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("OMDB_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("OMDB_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("OMDB_KEEPALIVE_EXPIRY", "30")),
+        )
+        timeout = httpx.Timeout(
+            connect=float(os.getenv("OMDB_CONNECT_TIMEOUT", "5")),
+            read=float(os.getenv("OMDB_READ_TIMEOUT", "15")),
+            write=float(os.getenv("OMDB_WRITE_TIMEOUT", "5")),
+            pool=float(os.getenv("OMDB_POOL_TIMEOUT", "5")),
+        )
+
+        http2 = os.getenv("OMDB_HTTP2", "false").lower() in {"1", "true", "yes"}
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("⚠️ OMDB_HTTP2 включен, но пакет h2 не установлен — используем HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+    async def start(self) -> None:
+        """Открыть общий HTTP-клиент (вызывается из lifespan)"""
+        if self.client is None:
+            self.client = self._build_client()
+            logger.info("🔌 OMDB HTTP client started")
+        if self.shared is not None:
+            await self.shared.start()
+            await self.quota.sync()
+
+    async def close(self) -> None:
+        """Закрыть общий HTTP-клиент"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("🔌 OMDB HTTP client closed")
+        self.cache.close()
+        self.quota.close()
+        if self.shared is not None:
+            await self.shared.close()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Если сервис используется вне lifespan (скрипты, тесты), создаем клиент лениво
+        if self.client is None:
+            self.client = self._build_client()
+        return self.client
     
     async def search(self, title: str, content_type: str = None) -> Optional[List[Dict[str, Any]]]:
         """Поиск в OMDB API с возвратом до 5 результатов"""
@@ -32,71 +219,626 @@ class OMDBService:
             logger.error("OMDB API key not configured")
             return None
 
+        key = OMDBCache.search_key(title, content_type)
+        return await self.singleflight.do(
+            f"search:{key}", lambda: self._search(title, content_type)
+        )
+
+    async def search_summary(
+        self, title: str, content_type: str = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Быстрый поиск: только строки списка OMDB (один запрос s=), детали — по требованию"""
+        if not self.api_key:
+            logger.error("OMDB API key not configured")
+            return None
+
         try:
-            search_params = {
-                "apikey": self.api_key,
-                "s": title,
-                "plot": "short"
-            }
+            search_items = await self._search_list(self._get_client(), title, content_type)
+        except Exception as e:
+            logger.error(f"💥 Worker error: {e}")
+            return None
 
-            if content_type:
-                search_params["type"] = content_type
+        if not search_items:
+            return None
 
-            logger.info(f"🔍 Worker ищет в OMDB (list): {title}")
+        return [
+            self._parse_summary(item)
+            for item in search_items[:5]
+            if item.get("imdbID")
+        ]
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                search_resp = await client.get(self.base_url, params=search_params)
+    async def search_stream(
+        self, title: str, content_type: str = None, summary_only: bool = False
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """Поиск с выдачей результатов по мере готовности: (позиция в выдаче OMDB, карточка)
 
-                if search_resp.status_code != 200:
-                    logger.error(f"❌ OMDB API error: {search_resp.status_code}")
-                    return None
+        Пустой поток — OMDB ответил, что совпадений нет; недоступность OMDB
+        (сеть, лимитер, breaker) и потеря всех деталей — RuntimeError.
+        """
+        if not self.api_key:
+            raise RuntimeError("OMDB API key not configured in worker")
 
-                search_data = search_resp.json()
-                if search_data.get("Response") != "True" or not search_data.get("Search"):
-                    logger.warning(f"❌ Не найдено в OMDB: {search_data.get('Error')}")
-                    return None
+        client = self._get_client()
+        search_items = await self._search_list(client, title, content_type)
+        if search_items is None:
+            raise RuntimeError("OMDB недоступен")
+        if not search_items:
+            return
 
-                # Берем первые 5 результатов и запрашиваем подробности по imdbID
-                parsed_results: List[Dict[str, Any]] = []
-                for item in search_data.get("Search", [])[:5]:
-                    imdb_id = item.get("imdbID")
-                    if not imdb_id:
-                        continue
+        if summary_only:
+            for index, item in enumerate(search_items[:5]):
+                if item.get("imdbID"):
+                    yield index, self._parse_summary(item)
+            return
 
-                    details = await self._fetch_details(client, imdb_id)
-                    if details:
-                        parsed_results.append(details)
+        details_limit = self.quota.details_limit(5)
+        semaphore = asyncio.Semaphore(self.details_concurrency)
+
+        async def fetch(index: int, imdb_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+            return index, await self._fetch_details_bounded(client, imdb_id, semaphore)
+
+        tasks = [
+            asyncio.ensure_future(fetch(index, item["imdbID"]))
+            for index, item in enumerate(search_items[:details_limit])
+            if item.get("imdbID")
+        ]
+        delivered = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, details = await next_done
+                if details:
+                    delivered += 1
+                    yield index, details
+            if tasks and not delivered:
+                raise RuntimeError("OMDB не отдал детали ни по одной карточке")
+        finally:
+            # Клиент мог отключиться посреди потока — не оставляем висящих задач
+            for task in tasks:
+                task.cancel()
 
-                return parsed_results if parsed_results else None
+    async def search_page(
+        self,
+        title: str,
+        content_type: str = None,
+        cursor: Optional[str] = None,
+        limit: int = 5,
+        summary_only: bool = True,
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Порция выдачи по курсору: (карточки, курсор следующей порции или None)
 
+        Страницы OMDB (page=N) запрашиваются лениво — только когда порция
+        выходит за уже загруженные. Если следующая порция потребует новую
+        страницу, она догружается в фоне, пока пользователь смотрит текущую.
+        Пустой список — выдача кончилась, None — OMDB недоступен.
+        """
+        if not self.api_key:
+            logger.error("OMDB API key not configured")
+            return None, None
+
+        offset = self.decode_cursor(cursor)
+        limit = max(1, min(limit, self.page_max_items))
+        client = self._get_client()
+
+        page = offset // OMDB_PAGE_SIZE + 1
+        skip = offset % OMDB_PAGE_SIZE
+        loaded_until = (page - 1) * OMDB_PAGE_SIZE
+        last_full = True
+        rows: List[Dict[str, Any]] = []
+
+        try:
+            while len(rows) < limit and last_full and page <= OMDB_MAX_PAGES:
+                items = await self._search_list_page(client, title, content_type, page)
+                if items is None:
+                    if not rows:
+                        return None, None
+                    # Отдаем то, что успели собрать; курсор продолжит с этого места
+                    last_full = True
+                    break
+                rows.extend(items[skip:])
+                skip = 0
+                loaded_until += len(items)
+                last_full = len(items) >= OMDB_PAGE_SIZE
+                page += 1
         except Exception as e:
             logger.error(f"💥 Worker error: {e}")
+            return None, None
+
+        has_more = len(rows) > limit or (last_full and page <= OMDB_MAX_PAGES)
+        rows = rows[:limit]
+        if not rows:
+            return [], None
+
+        next_offset = offset + len(rows)
+        next_cursor = self.encode_cursor(next_offset) if has_more else None
+        if has_more and last_full and next_offset + limit > loaded_until:
+            self._prefetch_page(client, title, content_type, page)
+
+        if summary_only:
+            return [self._parse_summary(item) for item in rows if item.get("imdbID")], next_cursor
+
+        details_limit = self.quota.details_limit(limit)
+        imdb_ids = [item["imdbID"] for item in rows[:details_limit] if item.get("imdbID")]
+        details_list = await self._fetch_details_many(client, imdb_ids)
+        found = [details for details in details_list if details]
+        if imdb_ids and not found:
+            return None, None
+        return found, next_cursor
+
+    async def first_page_cursor(
+        self, title: str, content_type: str = None, shown: int = 5
+    ) -> Optional[str]:
+        """Курсор продолжения после первых shown строк (для /search и /search/stream)"""
+        items = await self._search_list_page(self._get_client(), title, content_type, 1) or []
+        if len(items) > shown or len(items) >= OMDB_PAGE_SIZE:
+            return self.encode_cursor(shown)
+        return None
+
+    @staticmethod
+    def encode_cursor(offset: int) -> str:
+        return str(offset)
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> int:
+        """Позиция в выдаче OMDB; ValueError для некорректного курсора"""
+        if not cursor:
+            return 0
+        offset = int(cursor)
+        if offset < 0 or offset >= OMDB_PAGE_SIZE * OMDB_MAX_PAGES:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return offset
+
+    async def _search_list_page(
+        self, client: httpx.AsyncClient, title: str, content_type: str, page: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Страница выдачи s= (одновременные запросы, в том числе фоновые, объединяются)"""
+        key = OMDBCache.search_key(title, content_type)
+        return await self.singleflight.do(
+            f"list:{key}|p{page}", lambda: self._search_list(client, title, content_type, page)
+        )
+
+    def _prefetch_page(
+        self, client: httpx.AsyncClient, title: str, content_type: str, page: int
+    ) -> None:
+        # Бюджет OMDB на исходе — тратим его только на явные запросы пользователя
+        if self.quota.mode != "normal":
+            return
+
+        async def prefetch() -> None:
+            try:
+                await self._search_list_page(client, title, content_type, page)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось догрузить страницу {page} для '{title}': {e}")
+
+        task = asyncio.ensure_future(prefetch())
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+
+    async def get_details(self, imdb_id: str) -> Optional[Dict[str, Any]]:
+        """Детали по одному imdbID (кэш, объединение запросов и квота общие с поиском)"""
+        if not self.api_key:
+            logger.error("OMDB API key not configured")
             return None
+        return await self._get_details(self._get_client(), imdb_id)
+
+    async def fetch_fresh_details(
+        self, imdb_id: str
+    ) -> Tuple[str, Optional[Dict[str, Any]], int]:
+        """Детали по imdbID напрямую из OMDB в обход кэша (для фонового обновления)
+
+        (статус, детали, сколько запросов ушло в OMDB); статус "ok",
+        "not_found" (OMDB ответил, что такого imdbID нет) или "failed".
+        """
+        if not self.api_key:
+            return "failed", None, 0
+
+        async def load() -> Tuple[str, Optional[Dict[str, Any]], int]:
+            sent: Dict[str, int] = {"sent": 0}
+            status, details = await self._fetch_details_status(self._get_client(), imdb_id, sent)
+            if details:
+                await self.cache.set(OMDBCache.DETAILS, imdb_id, details)
+            return status, details, sent["sent"]
+
+        return await self.singleflight.do(f"details-fresh:{imdb_id}", load)
+
+    async def _search(self, title: str, content_type: str = None) -> Optional[List[Dict[str, Any]]]:
+        try:
+            client = self._get_client()
+            search_items = await self._search_list(client, title, content_type)
+            if not search_items:
+                return None
+
+            # Берем первые 5 результатов (меньше, если бюджет OMDB на исходе)
+            # и параллельно запрашиваем подробности по imdbID
+            details_limit = self.quota.details_limit(5)
+            imdb_ids = [
+                item.get("imdbID")
+                for item in search_items[:details_limit]
+                if item.get("imdbID")
+            ]
+            details_list = await self._fetch_details_many(client, imdb_ids)
+
+            # gather сохраняет порядок, поэтому карточки идут в порядке выдачи OMDB
+            parsed_results = [details for details in details_list if details]
+            return parsed_results if parsed_results else None
+
+        except Exception as e:
+            logger.error(f"💥 Worker error: {e}")
+            return None
+
+    async def _search_list(
+        self, client: httpx.AsyncClient, title: str, content_type: str = None, page: int = 1
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Список совпадений (s=) из кэша или OMDB, page — страница выдачи OMDB
+
+        Запрос нормализуется (регистр, пробелы, пунктуация, год), поэтому
+        "Interstellar!" и "interstellar " делят одну запись кэша. Кириллический
+        запрос без результатов повторяется транслитом, запрос с годом в конце
+        ("Blade Runner 2049") — без фильтра y=, с годом в названии. Промахи
+        кэшируются только когда не помог ни один вариант, а при успехе
+        промахи предыдущих вариантов стираются.
+
+        Пустой список — OMDB ответил, что совпадений нет; None — ошибка сети,
+        лимитера или открытый breaker (и нет устаревшей записи).
+        """
+        query = normalize_query(title)
+        variants = [query]
+        if query.year:
+            variants.append(normalize_query(title, extract_year=False))
+        if self.translit_fallback and query.has_cyrillic:
+            variants.extend([variant.transliterated() for variant in variants])
+        variants = list({variant.key: variant for variant in variants}.values())
+
+        def page_key(variant: NormalizedQuery) -> str:
+            key = OMDBCache.query_key(variant, content_type)
+            return key if page == 1 else f"{key}|p{page}"
+
+        cache_key = page_key(query)
+        for variant in variants:
+            cached = await self.cache.get(OMDBCache.SEARCH, page_key(variant))
+            if cached is not MISSING:
+                logger.info(f"⚡ Кэш OMDB (list, page {page}): {variant.title}")
+                return cached
+
+        missed: List[Tuple[str, Optional[str]]] = []
+        for index, variant in enumerate(variants):
+            variant_key = page_key(variant)
+            if await self.cache.get_negative(OMDBCache.SEARCH, variant_key) is not None:
+                logger.info(f"⚡ Негативный кэш OMDB (list, page {page}): {variant.title}")
+                continue
+            # Вариант, не давший первой страницы, не даст и следующих
+            if page > 1 and await self.cache.get_negative(
+                OMDBCache.SEARCH, OMDBCache.query_key(variant, content_type), count=False
+            ) is not None:
+                continue
+
+            search_items, error = await self._search_upstream(client, variant, content_type, page)
+            if search_items is None:
+                # Ошибка сети, лимитера или открытый breaker — не кэшируем,
+                # но можем отдать устаревший список, если он есть
+                stale = await self.cache.get_stale(OMDBCache.SEARCH, cache_key)
+                if stale is not MISSING:
+                    logger.info(f"🕰 Устаревший кэш OMDB (list): {query.title}")
+                    return stale
+                return None
+
+            if search_items:
+                await self.cache.set(OMDBCache.SEARCH, variant_key, search_items)
+                if variant_key != cache_key:
+                    await self.cache.set(OMDBCache.SEARCH, cache_key, search_items)
+                # Иначе /search по исходному ключу отдал бы старый промах (is_cached_miss)
+                for previous in variants[:index]:
+                    await self.cache.delete_negative(OMDBCache.SEARCH, page_key(previous))
+                return search_items
+
+            missed.append((variant_key, error))
+
+        for variant_key, error in missed:
+            await self.cache.set_negative(OMDBCache.SEARCH, variant_key, error)
+        return []
+
+    async def _search_upstream(
+        self,
+        client: httpx.AsyncClient,
+        query: NormalizedQuery,
+        content_type: str = None,
+        page: int = 1,
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Запрос s= в OMDB: (список, None), ([], ошибка OMDB) или (None, None) при сбое"""
+        search_params = {
+            "apikey": self.api_key,
+            "s": query.title,
+            "plot": "short"
+        }
+
+        if query.year:
+            search_params["y"] = query.year
+
+        if content_type:
+            search_params["type"] = content_type
+
+        if page > 1:
+            search_params["page"] = page
+
+        logger.info(f"🔍 Worker ищет в OMDB (list, page {page}): {query.title}")
+
+        search_resp = await self._request(client, search_params)
+        if search_resp is None:
+            return None, None
+
+        if search_resp.status_code != 200:
+            logger.error(f"❌ OMDB API error: {search_resp.status_code}")
+            return None, None
+
+        try:
+            search_data = codec.decode_search(search_resp.content)
+        except codec.DecodeError as e:
+            logger.error(f"❌ Некорректный ответ OMDB (list): {e}")
+            return None, None
+
+        if search_data.Response != "True" or not search_data.Search:
+            logger.warning(f"❌ Не найдено в OMDB: {search_data.Error}")
+            metrics.record_omdb_error("search", search_data.Error)
+            return [], search_data.Error
+
+        return codec.search_items(search_data), None
+
+    async def _request(
+        self,
+        client: httpx.AsyncClient,
+        params: Dict[str, Any],
+        sent: Optional[Dict[str, int]] = None,
+    ) -> Optional[httpx.Response]:
+        """GET к OMDB: лимиты, повторы с jitter, hedging и circuit breaker
+
+        None означает, что ответа нет (лимитер, открытый breaker или исчерпаны
+        повторы) — вызывающий код может отдать устаревшие данные из кэша.
+        В sent["sent"] прибавляются запросы, которые действительно ушли в OMDB,
+        включая дубли hedging.
+        """
+        for attempt in range(1, self.retry.max_attempts + 1):
+            if not self.breaker.allow():
+                logger.warning("🔴 OMDB circuit breaker открыт — запрос не отправлен")
+                return None
+
+            try:
+                response = await self._send(client, params, sent)
+            except asyncio.CancelledError:
+                # Вызывающий ушел по таймауту — не оставляем breaker в ожидании пробы
+                self.breaker.release()
+                raise
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                logger.warning(f"⚠️ Сбой запроса к OMDB (попытка {attempt}): {e!r}")
+                response = None
+                failed = True
+            else:
+                if response is None:
+                    # Отказ лимитера: до OMDB не дошли, повтор только потратит бюджет
+                    self.breaker.release()
+                    return None
+                failed = response.status_code >= 500 or response.status_code == 429
+
+            if sent is not None:
+                sent["sent"] = sent.get("sent", 0) + 1
+
+            if not failed:
+                self.breaker.record_success()
+                return response
+
+            self.breaker.record_failure()
+            if attempt < self.retry.max_attempts:
+                await asyncio.sleep(self.retry.delay(attempt))
+
+        return response
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        params: Dict[str, Any],
+        sent: Optional[Dict[str, int]] = None,
+    ) -> Optional[httpx.Response]:
+        """Одна попытка; если ответа нет дольше hedge_delay, параллельно шлем дубль
+
+        Дубль учитывается в sent["sent"] сразу (основной запрос считает _request).
+        """
+        if not await self.quota.acquire():
+            logger.warning(f"🚦 Запрос к OMDB отклонен лимитером (режим: {self.quota.mode})")
+            return None
+
+        primary = asyncio.ensure_future(self._get(client, params))
+        if not self.retry.hedge_delay:
+            return await primary
+
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.retry.hedge_delay)
+            # Дубль только если есть свободный токен прямо сейчас — не ждем лимитер
+            if not done and await self.quota.acquire(wait=0):
+                self.hedged_requests += 1
+                if sent is not None:
+                    sent["sent"] = sent.get("sent", 0) + 1
+                tasks.add(asyncio.ensure_future(self._get(client, params)))
+
+            last_error: Optional[BaseException] = None
+            last_response: Optional[httpx.Response] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    last_response = task.result()
+                    if last_response.status_code < 500:
+                        return last_response
+
+            if last_response is not None:
+                return last_response
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _get(self, client: httpx.AsyncClient, params: Dict[str, Any]) -> httpx.Response:
+        """Один HTTP-запрос к OMDB с учетом в метриках (задержка, статус, ошибки, in-flight)"""
+        call = metrics.call_type(params)
+        started = time.perf_counter()
+        metrics.UPSTREAM_IN_FLIGHT.labels(call).inc()
+        try:
+            response = await client.get(self.base_url, params=params)
+        except httpx.TimeoutException:
+            metrics.UPSTREAM_LATENCY.labels(call).observe(time.perf_counter() - started)
+            metrics.UPSTREAM_ERRORS.labels(call, "timeout").inc()
+            raise
+        except httpx.TransportError:
+            metrics.UPSTREAM_ERRORS.labels(call, "transport").inc()
+            raise
+        finally:
+            metrics.UPSTREAM_IN_FLIGHT.labels(call).dec()
+
+        metrics.UPSTREAM_LATENCY.labels(call).observe(time.perf_counter() - started)
+        metrics.UPSTREAM_RESPONSES.labels(call, str(response.status_code)).inc()
+        return response
+
+    async def search_batch(
+        self, queries: List[SearchRequest]
+    ) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """Поиск по многим названиям: дубликаты схлопываются, результат по ключу запроса"""
+        unique: Dict[str, SearchRequest] = {}
+        for query in queries:
+            unique.setdefault(OMDBCache.search_key(query.title, query.content_type), query)
+
+        async def run(query: SearchRequest) -> Optional[List[Dict[str, Any]]]:
+            async with self.batch_semaphore:
+                return await self.search(query.title, query.content_type)
+
+        results = await asyncio.gather(*(run(query) for query in unique.values()))
+        return dict(zip(unique.keys(), results))
+
+    async def get_details_batch(self, imdb_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Детали по многим imdbID через общий кэш и общий лимит параллельности"""
+        unique_ids = list(dict.fromkeys(imdb_id.strip() for imdb_id in imdb_ids if imdb_id.strip()))
+        if not self.api_key or not unique_ids:
+            return {imdb_id: None for imdb_id in unique_ids}
+
+        details_list = await self._fetch_details_many(
+            self._get_client(), unique_ids, semaphore=self.batch_semaphore
+        )
+        return dict(zip(unique_ids, details_list))
+
+    async def _fetch_details_many(
+        self,
+        client: httpx.AsyncClient,
+        imdb_ids: List[str],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Параллельно получить детали по списку imdbID с ограничением конкурентности"""
+        semaphore = semaphore or asyncio.Semaphore(self.details_concurrency)
+        return await asyncio.gather(
+            *(self._fetch_details_bounded(client, imdb_id, semaphore) for imdb_id in imdb_ids)
+        )
+
+    async def _fetch_details_bounded(
+        self, client: httpx.AsyncClient, imdb_id: str, semaphore: asyncio.Semaphore
+    ) -> Optional[Dict[str, Any]]:
+        """Детали одного imdbID под семафором и с таймаутом на элемент"""
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._get_details(client, imdb_id),
+                    timeout=self.details_timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱ Таймаут деталей OMDB для {imdb_id}")
+                return None
+
+    async def _get_details(self, client: httpx.AsyncClient, imdb_id: str) -> Optional[Dict[str, Any]]:
+        """Детали по imdbID из кэша или OMDB (одновременные запросы объединяются)"""
+        return await self.singleflight.do(
+            f"details:{imdb_id}", lambda: self._load_details(client, imdb_id)
+        )
+
+    async def _load_details(self, client: httpx.AsyncClient, imdb_id: str) -> Optional[Dict[str, Any]]:
+        cached = await self.cache.get(OMDBCache.DETAILS, imdb_id)
+        if cached is not MISSING:
+            return cached
+
+        if await self.cache.get_negative(OMDBCache.DETAILS, imdb_id) is not None:
+            return None
+
+        details = await self._fetch_details(client, imdb_id)
+        if details:
+            await self.cache.set(OMDBCache.DETAILS, imdb_id, details)
+            return details
+
+        # Не "не найдено", а сбой OMDB — пробуем устаревшие детали
+        if await self.cache.get_negative(OMDBCache.DETAILS, imdb_id, count=False) is None:
+            stale = await self.cache.get_stale(OMDBCache.DETAILS, imdb_id)
+            if stale is not MISSING:
+                logger.info(f"🕰 Устаревший кэш OMDB (details): {imdb_id}")
+                return stale
+        return None
 
     async def _fetch_details(self, client: httpx.AsyncClient, imdb_id: str) -> Optional[Dict[str, Any]]:
         """Получить детальную информацию по imdbID"""
+        _, details = await self._fetch_details_status(client, imdb_id)
+        return details
+
+    async def _fetch_details_status(
+        self, client: httpx.AsyncClient, imdb_id: str, sent: Optional[Dict[str, int]] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Детали по imdbID и статус: ok, not_found (ответ OMDB) или failed"""
         try:
             params = {
                 "apikey": self.api_key,
                 "i": imdb_id,
                 "plot": "short"
             }
-            detail_resp = await client.get(self.base_url, params=params)
+            detail_resp = await self._request(client, params, sent)
+            if detail_resp is None:
+                return "failed", None
+
             if detail_resp.status_code != 200:
                 logger.error(f"❌ OMDB detail error for {imdb_id}: {detail_resp.status_code}")
-                return None
+                return "failed", None
 
-            detail_data = detail_resp.json()
-            if detail_data.get("Response") != "True":
-                logger.warning(f"❌ Не удалось получить детали для {imdb_id}: {detail_data.get('Error')}")
-                return None
+            detail_data = codec.decode_details(detail_resp.content)
+            if detail_data.Response != "True":
+                logger.warning(f"❌ Не удалось получить детали для {imdb_id}: {detail_data.Error}")
+                metrics.record_omdb_error("details", detail_data.Error)
+                await self.cache.set_negative(OMDBCache.DETAILS, imdb_id, detail_data.Error)
+                return "not_found", None
 
-            logger.info(f"✅ Детали OMDB: {detail_data.get('Title')}")
-            return self._parse_response(detail_data)
+            logger.info(f"✅ Детали OMDB: {detail_data.Title}")
+            return "ok", self._parse_response(codec.details_fields(detail_data))
         except Exception as e:
             logger.error(f"💥 Ошибка при получении деталей OMDB {imdb_id}: {e}")
-            return None
+            return "failed", None
         
+    async def is_cached_miss(self, title: str, content_type: str = None) -> bool:
+        """Был ли этот запрос недавно отвечен OMDB как "не найдено" (и с тех пор не найден)"""
+        key = OMDBCache.search_key(title, content_type)
+        if await self.cache.get_negative(OMDBCache.SEARCH, key, count=False) is None:
+            return False
+        # Промах мог остаться у другой реплики, хотя вариант запроса уже нашелся
+        if await self.cache.get(OMDBCache.SEARCH, key) is not MISSING:
+            return False
+        self.cache.negative_counters["hits"] += 1
+        return True
+
+    def _parse_summary(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Краткая карточка из строки списка OMDB (Title, Year, Type, Poster, imdbID)"""
+        summary = self._parse_response(item)
+        return {
+            "title": summary["title"],
+            "original_title": summary["original_title"],
+            "content_type": summary["content_type"],
+            "release_year": summary["release_year"],
+            "imdb_id": summary["imdb_id"],
+            "poster_url": summary["poster_url"],
+            "details_loaded": False,
+        }
+
     def _parse_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Парсинг ответа OMDB"""
         content_type = "movie"
@@ -141,6 +883,7 @@ class OMDBService:
 
 # Инициализация сервиса
 omdb_service = OMDBService()
+catalog_refresher = CatalogRefresher.from_env(omdb_service)
 
 @app.post("/search", response_model=SearchResponse)
 async def search_omdb(request: SearchRequest):
@@ -151,7 +894,17 @@ async def search_omdb(request: SearchRequest):
             error="OMDB API key not configured in worker"
         )
     
-    result = await omdb_service.search(request.title, request.content_type)
+    if await omdb_service.is_cached_miss(request.title, request.content_type):
+        return SearchResponse(
+            success=False,
+            error=f"Фильм '{request.title}' не найден в OMDB",
+            cached_miss=True,
+        )
+
+    if request.summary_only:
+        result = await omdb_service.search_summary(request.title, request.content_type)
+    else:
+        result = await omdb_service.search(request.title, request.content_type)
     
     if result:
         return SearchResponse(success=True, data=result)
@@ -161,10 +914,267 @@ async def search_omdb(request: SearchRequest):
             error=f"Фильм '{request.title}' не найден в OMDB"
         )
 
+@app.post("/search/stream")
+async def search_omdb_stream(request: SearchRequest):
+    """Потоковый поиск в OMDB (NDJSON): каждая карточка отправляется, как только готова
+
+    Строки потока: {"type": "item", "index": N, "data": {...}}, в конце
+    {"type": "done", "count": N}, {"type": "not_found"} (OMDB ответил, что
+    совпадений нет) либо {"type": "error", "error": "..."} (OMDB недоступен).
+    """
+
+    async def generate():
+        count = 0
+        # Строк выдачи OMDB, покрытых потоком: при урезанной квоте деталей их меньше пяти
+        shown = 0
+        try:
+            async for index, item in omdb_service.search_stream(
+                request.title, request.content_type, request.summary_only
+            ):
+                count += 1
+                shown = max(shown, index + 1)
+                yield codec.ndjson_line({"type": "item", "index": index, "data": item})
+        except Exception as e:
+            logger.error(f"💥 Worker stream error: {e}")
+            yield codec.ndjson_line({"type": "error", "error": str(e)})
+            return
+
+        if count:
+            next_cursor = await omdb_service.first_page_cursor(
+                request.title, request.content_type, shown=shown
+            )
+            yield codec.ndjson_line({"type": "done", "count": count, "next_cursor": next_cursor})
+        else:
+            yield codec.ndjson_line(
+                {"type": "not_found", "error": f"Фильм '{request.title}' не найден в OMDB"}
+            )
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.post("/search/page", response_model=SearchPageResponse)
+async def search_omdb_page(request: SearchPageRequest):
+    """Порция выдачи OMDB по курсору (без курсора — с начала)"""
+    if not omdb_service.api_key:
+        return SearchPageResponse(
+            success=False,
+            error="OMDB API key not configured in worker"
+        )
+
+    try:
+        data, next_cursor = await omdb_service.search_page(
+            request.title,
+            request.content_type,
+            cursor=request.cursor,
+            limit=min(request.limit, omdb_service.page_max_items),
+            summary_only=request.summary_only,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if data is None:
+        return SearchPageResponse(success=False, error="OMDB недоступен, повторите позже")
+
+    # Пустая порция — выдача закончилась (или совпадений нет), это не ошибка
+    return SearchPageResponse(success=True, data=data, next_cursor=next_cursor)
+
+@app.get("/details/{imdb_id}", response_model=SearchResponse)
+async def details_omdb(imdb_id: str):
+    """Детали OMDB по imdbID (вторая фаза ленивого поиска)"""
+    if not omdb_service.api_key:
+        return SearchResponse(
+            success=False,
+            error="OMDB API key not configured in worker"
+        )
+
+    details = await omdb_service.get_details(imdb_id)
+    if details:
+        return SearchResponse(success=True, data=[details])
+
+    return SearchResponse(
+        success=False,
+        error=f"'{imdb_id}' не найден в OMDB"
+    )
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def search_omdb_batch(request: BatchSearchRequest):
+    """Пакетный поиск в OMDB по многим названиям"""
+    if not omdb_service.api_key:
+        raise HTTPException(status_code=503, detail="OMDB API key not configured in worker")
+
+    if len(request.queries) > omdb_service.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много запросов в пакете (максимум {omdb_service.batch_max_items})",
+        )
+
+    found = await omdb_service.search_batch(request.queries)
+
+    results = []
+    for query in request.queries:
+        data = found.get(OMDBCache.search_key(query.title, query.content_type))
+        results.append(
+            BatchSearchItem(
+                title=query.title,
+                content_type=query.content_type,
+                success=bool(data),
+                data=data,
+                error=None if data else f"Фильм '{query.title}' не найден в OMDB",
+            )
+        )
+
+    return BatchSearchResponse(success=True, results=results)
+
+@app.post("/details/batch", response_model=DetailsBatchResponse)
+async def details_omdb_batch(request: DetailsBatchRequest):
+    """Пакетное получение деталей OMDB по imdbID"""
+    if not omdb_service.api_key:
+        raise HTTPException(status_code=503, detail="OMDB API key not configured in worker")
+
+    if len(request.imdb_ids) > omdb_service.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много imdbID в пакете (максимум {omdb_service.batch_max_items})",
+        )
+
+    found = await omdb_service.get_details_batch(request.imdb_ids)
+
+    return DetailsBatchResponse(
+        success=True,
+        data={imdb_id: details for imdb_id, details in found.items() if details},
+        missing=[imdb_id for imdb_id, details in found.items() if not details],
+    )
+
+async def _run_search_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return (await search_omdb(SearchRequest(**payload))).model_dump()
+
+async def _run_details_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return (await details_omdb(payload["imdb_id"])).model_dump()
+
+async def _run_search_batch_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return (await search_omdb_batch(BatchSearchRequest(**payload))).model_dump()
+
+async def _run_details_batch_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return (await details_omdb_batch(DetailsBatchRequest(**payload))).model_dump()
+
+job_queue = JobQueue.from_env(
+    {
+        "search": _run_search_job,
+        "details": _run_details_job,
+        "search_batch": _run_search_batch_job,
+        "details_batch": _run_details_batch_job,
+    }
+)
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", "30"))
+metrics.REGISTRY.register(metrics.WorkerCollector(omdb_service, job_queue))
+
+
+async def _resolve_poster_url(imdb_id: str) -> Optional[str]:
+    details = await omdb_service.get_details(imdb_id)
+    if details is None:
+        return None
+    return details.get("poster_url") or ""
+
+poster_store = PosterStore.from_env(_resolve_poster_url)
+POSTER_CACHE_CONTROL = f"public, max-age={int(os.getenv('POSTER_MAX_AGE', str(30 * 24 * 3600)))}"
+
+@app.get("/posters/{imdb_id}")
+async def get_poster(imdb_id: str, request: Request, source_url: Optional[str] = None):
+    """Миниатюра постера (JPEG) с ETag и долгим кэшированием; 404 — постера нет
+
+    source_url — ссылка на постер, если она уже известна (иначе берется из деталей OMDB).
+    """
+    if not poster_store.is_valid_id(imdb_id):
+        raise HTTPException(status_code=400, detail=f"Некорректный imdbID: {imdb_id}")
+
+    path = await poster_store.get(imdb_id, source_url)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Постер для {imdb_id} недоступен")
+
+    etag = poster_store.etag(path)
+    headers = {"ETag": etag, "Cache-Control": POSTER_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
+
+@app.post("/posters/check")
+async def check_posters(request: PosterCheckRequest):
+    """Заранее скачать постеры и сообщить, каких нет (чтобы не пытаться их отправлять)"""
+    if len(set(request.imdb_ids) | set(request.poster_urls)) > omdb_service.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Слишком много imdbID в пакете (максимум {omdb_service.batch_max_items})",
+        )
+    return await poster_store.check(request.imdb_ids, request.poster_urls)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Поставить задачу в очередь: ответ сразу, результат — через GET /jobs/{id} или callback"""
+    if not omdb_service.api_key:
+        raise HTTPException(status_code=503, detail="OMDB API key not configured in worker")
+    if request.callback_url and not job_queue.callback_allowed(request.callback_url):
+        raise HTTPException(
+            status_code=400,
+            detail="callback_url не входит в JOB_CALLBACK_ALLOWLIST; результат доступен через GET /jobs/{id}",
+        )
+
+    try:
+        job = job_queue.submit(request.kind, request.payload, request.priority, request.callback_url)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{e} (kinds: {sorted(job_queue.handlers)}, priorities: {sorted(PRIORITIES)})",
+        )
+
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Статус и результат задачи; wait > 0 — long-poll до завершения (не дольше JOB_MAX_WAIT)"""
+    job = await job_queue.wait(job_id, min(max(wait, 0), JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Задача {job_id} не найдена или устарела")
+    return job.to_dict()
+
+@app.get("/refresh/status")
+async def refresh_status():
+    """Состояние фонового обновления каталога"""
+    return catalog_refresher.stats()
+
+@app.post("/refresh/pause")
+async def refresh_pause():
+    """Приостановить фоновое обновление каталога"""
+    catalog_refresher.pause()
+    return catalog_refresher.stats()
+
+@app.post("/refresh/resume")
+async def refresh_resume():
+    """Возобновить фоновое обновление каталога"""
+    catalog_refresher.resume()
+    return catalog_refresher.stats()
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Метрики воркера в формате Prometheus"""
+    return Response(generate_latest(metrics.REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/health")
 async def health_check():
     """Проверка здоровья worker"""
-    return {"status": "healthy", "service": "omdb-worker"}
+    return {
+        # Сам worker жив, но OMDB за ним может быть недоступен
+        "status": "healthy" if omdb_service.breaker.state == CircuitBreaker.CLOSED else "degraded",
+        "service": "omdb-worker",
+        "cache": omdb_service.cache.stats(),
+        "shared": omdb_service.shared.stats() if omdb_service.shared else {"enabled": False},
+        "singleflight": omdb_service.singleflight.stats(),
+        "quota": omdb_service.quota.stats(),
+        "breaker": omdb_service.breaker.stats(),
+        "hedged_requests": omdb_service.hedged_requests,
+        "refresher": catalog_refresher.stats(),
+        "jobs": job_queue.stats(),
+        "posters": poster_store.stats(),
+    }
 
 if __name__ == "__main__":
     import uvicorn